@@ -2,6 +2,7 @@
 
 import { useState } from "react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import Link from "next/link";
 import { ArrowRight, ArrowUpRight, Check, Zap, Target, Layers, Users, Shield, Star, FileSearch, MessageSquare, Rocket, Handshake, Quote, ChevronLeft, ChevronRight, ChevronDown } from "lucide-react";
 import { cn } from "@/lib/utils";
@@ -220,7 +221,7 @@ export default function AboutPage() {
         <section className="relative py-20 lg:py-32 overflow-hidden min-h-[85vh] flex items-center">
           <div className="absolute inset-0">
             <Image
-              src="/images/about-workshop.jpg"
+              src={imageUrl("/images/about-workshop.jpg")}
               alt="LoopArt Studio"
               fill
               className="object-cover opacity-30"
@@ -302,7 +303,7 @@ export default function AboutPage() {
                 <div className="relative">
                   <div className="relative aspect-[4/3] rounded-2xl overflow-hidden">
                     <Image
-                      src="/images/about-story.jpg"
+                      src={imageUrl("/images/about-story.jpg")}
                       alt="Journey"
                       fill
                       className="object-cover"
@@ -3,6 +3,7 @@ import { prisma } from '@/lib/prisma';
 import { requireAdmin } from '@/lib/api/auth';
 import { handleApiError } from '@/lib/api/errors';
 import { ApiError } from '@/lib/api/errors';
+import { syncPreviewResults } from '@/lib/api/preview-queue';
 
 type RouteContext = { params: Promise<{ id: string }> };
 
@@ -62,11 +63,16 @@ export async function POST(request: NextRequest, context: RouteContext) {
       },
     });
 
+    // 新设置的原图地址如果已经处理完成，替换为处理后的地址
+    const preview = (await syncPreviewResults())
+      ? (await prisma.template.findUnique({ where: { id }, select: { preview: true } }))?.preview
+      : undefined;
+
     return NextResponse.json({
       success: true,
       data: {
         id: updated.id,
-        preview: updated.preview,
+        preview: preview ?? updated.preview,
         updatedAt: updated.updatedAt,
       },
       message: '模板预览图已更新',
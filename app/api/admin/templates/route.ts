@@ -8,6 +8,7 @@ import {
   validateTemplateListQuery,
   validateCreateTemplate,
 } from '@/lib/api/template-validation';
+import { syncPreviewResults } from '@/lib/api/preview-queue';
 import type { Prisma } from '@prisma/client';
 
 function parseListQuery(request: NextRequest): ReturnType<typeof validateTemplateListQuery> {
@@ -229,6 +230,8 @@ export async function POST(request: NextRequest) {
       });
     }
 
+    // 模板创建前上传、已处理完成的预览图，现在可以写回了
+    await syncPreviewResults();
     revalidatePath('/shop');
     revalidatePath(`/templates/${template.id}`);
     return NextResponse.json({
@@ -8,6 +8,11 @@ import {
   DESIGN_FILE_OPTIONS,
   PREVIEW_IMAGE_OPTIONS,
 } from '@/lib/api/file-upload';
+import {
+  applyPreviewResults,
+  enqueuePreviews,
+  getPreviewStatus,
+} from '@/lib/api/preview-queue';
 
 /**
  * POST /api/admin/templates/upload
@@ -17,8 +22,11 @@ import {
  * 字段：
  *   - type: "design" | "preview" （文件类型）
  *   - files: File[] （文件数组）
+ *   - templateId: string （可选，预览图所属的模板，处理完成后写回该模板）
  * 
  * 返回：上传后的文件 URL 列表
+ * 预览图同时加入后台处理队列（缩略图、响应式尺寸、去除 EXIF），
+ * 每个文件附带 previewJob，可用 GET 查询处理结果；入队失败（如只读文件系统）时不附带，上传结果不受影响
  */
 export async function POST(request: NextRequest) {
   try {
@@ -27,6 +35,7 @@ export async function POST(request: NextRequest) {
     const formData = await request.formData();
     const type = formData.get('type') as string;
     const files = formData.getAll('files') as File[];
+    const templateId = (formData.get('templateId') as string) || undefined;
 
     if (!type || (type !== 'design' && type !== 'preview')) {
       throw new ApiError(400, 'type 必须是 "design" 或 "preview"', 'INVALID_TYPE');
@@ -40,16 +49,26 @@ export async function POST(request: NextRequest) {
 
     // 上传文件
     const results = await uploadFiles(files, options);
+    // 图片处理不在请求内进行，批量上传时接口耗时只取决于写入速度
+    let previewJobs: string[] = [];
+    if (type === 'preview') {
+      try {
+        previewJobs = await enqueuePreviews(files, results, templateId);
+      } catch (e) {
+        console.error('预览图加入处理队列失败:', e);
+      }
+    }
 
     return NextResponse.json({
       success: true,
       data: {
         type,
-        files: results.map((r) => ({
+        files: results.map((r, i) => ({
           url: r.url,
           format: r.format,
           size: r.size,
           filename: r.filename,
+          ...(previewJobs[i] ? { previewJob: previewJobs[i] } : {}),
         })),
       },
       message: `成功上传 ${results.length} 个文件`,
@@ -58,3 +77,37 @@ export async function POST(request: NextRequest) {
     return handleApiError(e);
   }
 }
+
+/**
+ * GET /api/admin/templates/upload?jobs=id1,id2
+ * 查询预览图处理状态，并把已完成的结果写回模板（Template.preview 中的原图地址替换为处理后的地址）
+ * 仅 Admin
+ */
+export async function GET(request: NextRequest) {
+  try {
+    await requireAdmin(request);
+
+    const ids = (request.nextUrl.searchParams.get('jobs') || '').split(',').filter(Boolean);
+    if (ids.length === 0) {
+      throw new ApiError(400, '请提供 jobs 参数', 'NO_JOBS');
+    }
+
+    const applied = await applyPreviewResults();
+    const jobs = await Promise.all(
+      ids.map(async (id) => {
+        try {
+          return { id, ...(await getPreviewStatus(id)) };
+        } catch {
+          throw new ApiError(400, `无效的任务 id: ${id}`, 'INVALID_JOB_ID');
+        }
+      })
+    );
+
+    return NextResponse.json({
+      success: true,
+      data: { jobs, applied },
+    });
+  } catch (e) {
+    return handleApiError(e);
+  }
+}
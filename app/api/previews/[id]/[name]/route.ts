@@ -0,0 +1,24 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { readPreviewFile } from '@/lib/api/preview-queue';
+
+type RouteContext = { params: Promise<{ id: string; name: string }> };
+
+/**
+ * GET /api/previews/[id]/[name]
+ * 返回 worker 生成的模板预览图（缩略图、响应式衍生图）
+ * 公开访问；每个任务 id 只生成一次，内容不会改变，可以长期缓存
+ */
+export async function GET(_request: NextRequest, context: RouteContext) {
+  const { id, name } = await context.params;
+  const file = await readPreviewFile(id, name);
+  if (!file) {
+    return new NextResponse('Not Found', { status: 404 });
+  }
+  return new NextResponse(new Uint8Array(file.body), {
+    headers: {
+      'Content-Type': file.contentType,
+      'Content-Length': String(file.body.length),
+      'Cache-Control': 'public, max-age=31536000, immutable',
+    },
+  });
+}
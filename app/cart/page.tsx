@@ -2,6 +2,7 @@
 
 import { useState, useEffect } from "react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import Link from "next/link";
 import { 
   ShoppingCart, Heart, Trash2, Tag, ArrowLeft, ArrowRight, 
@@ -415,7 +416,7 @@ export default function CartPage() {
                       {/* Image */}
                       <div className="relative w-32 h-32 rounded-lg overflow-hidden flex-shrink-0 group">
                         <Image
-                          src={item.image || "/placeholder.svg"}
+                          src={imageUrl(item.image || "/placeholder.svg")}
                           alt={item.name}
                           fill
                           className="object-cover transition-transform duration-500 group-hover:scale-110"
@@ -577,7 +578,7 @@ export default function CartPage() {
                         <Checkbox disabled className="border-white/10" />
                       </div>
                       <div className="relative w-32 h-32 rounded-lg overflow-hidden flex-shrink-0 grayscale">
-                        <Image src={item.image || "/placeholder.svg"} alt={item.name} fill className="object-cover" />
+                        <Image src={imageUrl(item.image || "/placeholder.svg")} alt={item.name} fill className="object-cover" />
                       </div>
                       <div className="flex-1">
                         <div className="flex items-center gap-2">
@@ -619,7 +620,7 @@ export default function CartPage() {
                       className="group p-4 rounded-xl bg-white/[0.02] border border-white/5 hover:border-white/10 transition-all"
                     >
                       <div className="relative aspect-square rounded-lg overflow-hidden mb-3">
-                        <Image src={product.image || "/placeholder.svg"} alt={product.name} fill className="object-cover group-hover:scale-105 transition-transform duration-500" />
+                        <Image src={imageUrl(product.image || "/placeholder.svg")} alt={product.name} fill className="object-cover group-hover:scale-105 transition-transform duration-500" />
                       </div>
                       <h4 className="text-sm text-white/70 line-clamp-1 mb-1">{product.name}</h4>
                       <div className="flex items-center justify-between">
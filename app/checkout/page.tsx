@@ -3,6 +3,7 @@
 import { useState, useEffect } from "react";
 import Link from "next/link";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -618,7 +619,7 @@ export default function CheckoutPage() {
                       <div key={item.id} className="flex gap-3">
                         <div className="relative w-14 h-14 rounded-lg overflow-hidden bg-white/5 flex-shrink-0">
                           <Image
-                            src={item.image || "/placeholder.svg"}
+                            src={imageUrl(item.image || "/placeholder.svg")}
                             alt={item.name}
                             fill
                             className="object-cover"
@@ -3,6 +3,7 @@
 import { useState } from "react";
 import Link from "next/link";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import { 
   Home, FolderKanban, CreditCard, Headphones, FileText, Users, Settings,
   BookOpen, Gift, MessageCircle, ClipboardCheck, ShoppingBag,
@@ -326,7 +327,7 @@ export default function OrdersPage() {
                           {item.image ? (
                             <div className="w-16 h-16 rounded-lg bg-white/5 overflow-hidden shrink-0">
                               <Image
-                                src={item.image || "/placeholder.svg"}
+                                src={imageUrl(item.image || "/placeholder.svg")}
                                 alt={item.name}
                                 width={64}
                                 height={64}
@@ -460,7 +461,7 @@ export default function OrdersPage() {
                         {item.image ? (
                           <div className="w-20 h-20 rounded-lg bg-white/5 overflow-hidden shrink-0">
                             <Image
-                              src={item.image || "/placeholder.svg"}
+                              src={imageUrl(item.image || "/placeholder.svg")}
                               alt={item.name}
                               width={80}
                               height={80}
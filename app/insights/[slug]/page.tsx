@@ -18,6 +18,7 @@ import {
   ChevronUp
 } from "lucide-react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import Link from "next/link";
 import { useParams } from "next/navigation";
 import { Footer } from "@/components/sections/footer";
@@ -354,7 +355,7 @@ function ZoomableImage({ src, alt, caption }: { src: string; alt?: string; capti
           onClick={() => setIsZoomed(true)}
         >
           <Image
-            src={src || "/placeholder.svg"}
+            src={imageUrl(src || "/placeholder.svg")}
             alt={alt || ""}
             fill
             className="object-cover transition-transform duration-500 group-hover:scale-105"
@@ -376,7 +377,7 @@ function ZoomableImage({ src, alt, caption }: { src: string; alt?: string; capti
         >
           <div className="relative max-w-6xl w-full aspect-video">
             <Image
-              src={src || "/placeholder.svg"}
+              src={imageUrl(src || "/placeholder.svg")}
               alt={alt || ""}
               fill
               className="object-contain"
@@ -562,7 +563,7 @@ export default function ArticleDetailPage() {
         <section className="px-2 md:px-4 lg:px-8 xl:px-32 -mt-4">
           <div className="relative aspect-[21/9] rounded-2xl overflow-hidden border border-border/20">
             <Image
-              src={article.image || "/placeholder.svg"}
+              src={imageUrl(article.image || "/placeholder.svg")}
               alt={article.title}
               fill
               className="object-cover"
@@ -754,7 +755,7 @@ export default function ArticleDetailPage() {
                         >
                           <div className="relative w-20 h-16 rounded-lg overflow-hidden shrink-0">
                             <Image
-                              src={related.image || "/placeholder.svg"}
+                              src={imageUrl(related.image || "/placeholder.svg")}
                               alt={related.title}
                               fill
                               className="object-cover transition-transform duration-300 group-hover:scale-110"
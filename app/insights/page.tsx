@@ -7,6 +7,7 @@ import { useLang } from "@/components/providers/lang-provider";
 import { getT } from "@/lib/i18n";
 import { ArrowUpRight, Clock, Search, TrendingUp, Tag, Mail, ChevronRight, Loader2 } from "lucide-react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import { Footer } from "@/components/sections/footer";
 
 // Article categories
@@ -376,7 +377,7 @@ export default function InsightsPage() {
                       {/* Image */}
                       <div className="relative h-72 md:h-auto overflow-hidden">
                         <Image
-                          src={featuredArticle.image || "/placeholder.svg"}
+                          src={imageUrl(featuredArticle.image || "/placeholder.svg")}
                           alt={featuredArticle.title}
                           fill
                           className="object-cover transition-transform duration-700 group-hover:scale-105"
@@ -455,7 +456,7 @@ export default function InsightsPage() {
                         {/* Image */}
                         <div className="relative h-52 overflow-hidden">
                           <Image
-                            src={article.image || "/placeholder.svg"}
+                            src={imageUrl(article.image || "/placeholder.svg")}
                             alt={article.title}
                             fill
                             className="object-cover transition-transform duration-700 group-hover:scale-110"
@@ -2,6 +2,7 @@
 
 import { useState, useRef, useEffect } from "react";
 import Image from "next/image";
+import { imageUrl, spriteStyle } from "@/lib/image-assets";
 import Link from "next/link";
 import { 
   ArrowLeft, ArrowUpRight, Calendar, Clock, Check, 
@@ -329,7 +330,7 @@ export default function PortfolioDetailPage({ params }: { params: { slug: string
         <section className="px-2 md:px-4 lg:px-8 xl:px-32 -mt-4 mb-20">
           <div className="relative aspect-[21/9] rounded-2xl overflow-hidden border border-border/20">
             <Image
-              src={caseData.image || "/placeholder.svg"}
+              src={imageUrl(caseData.image || "/placeholder.svg")}
               alt={caseData.title}
               fill
               className="object-cover"
@@ -408,7 +409,7 @@ export default function PortfolioDetailPage({ params }: { params: { slug: string
                 {caseData.gallery.map((img, i) => (
                   <div key={i} className="relative aspect-[4/3] rounded-xl overflow-hidden border border-border/20">
                     <Image
-                      src={img || "/placeholder.svg"}
+                      src={imageUrl(img || "/placeholder.svg")}
                       alt={`${caseData.title} - ${i + 1}`}
                       fill
                       className="object-cover"
@@ -450,27 +451,41 @@ export default function PortfolioDetailPage({ params }: { params: { slug: string
             <div>
               <h2 className="text-2xl md:text-3xl lg:text-4xl font-light mb-8">相关案例</h2>
               <div className="grid md:grid-cols-2 gap-6">
-                {caseData.relatedCases.map((related) => (
-                  <Link
-                    key={related.id}
-                    href={`/portfolio/${toSlug(related.title)}`}
-                    className="group flex items-center gap-6 p-6 rounded-xl border border-border/30 hover:border-primary/30 transition-colors"
-                  >
-                    <div className="relative w-32 h-24 rounded-lg overflow-hidden shrink-0">
-                      <Image
-                        src={related.image || "/placeholder.svg"}
-                        alt={related.title}
-                        fill
-                        className="object-cover group-hover:scale-105 transition-transform"
-                      />
-                    </div>
-                    <div className="flex-1">
-                      <h3 className="font-medium mb-2 group-hover:text-primary transition-colors">{related.title}</h3>
-                      <p className="text-sm text-primary">{related.result}</p>
-                    </div>
-                    <ArrowUpRight className="w-5 h-5 text-muted-foreground group-hover:text-primary group-hover:translate-x-0.5 group-hover:-translate-y-0.5 transition-all" />
-                  </Link>
-                ))}
+                {caseData.relatedCases.map((related) => {
+                  // 缩略图在 thumbnails 图集中时，整组相关案例只需一次请求
+                  const sprite = spriteStyle(related.image, 128);
+                  return (
+                    <Link
+                      key={related.id}
+                      href={`/portfolio/${toSlug(related.title)}`}
+                      className="group flex items-center gap-6 p-6 rounded-xl border border-border/30 hover:border-primary/30 transition-colors"
+                    >
+                      <div className="relative w-32 h-24 rounded-lg overflow-hidden shrink-0">
+                        {/* 正方形小图垂直居中裁切，等同于 object-cover */}
+                        {sprite ? (
+                          <div
+                            role="img"
+                            aria-label={related.title}
+                            style={sprite}
+                            className="absolute left-0 top-1/2 -translate-y-1/2 group-hover:scale-105 transition-transform"
+                          />
+                        ) : (
+                          <Image
+                            src={imageUrl(related.image || "/placeholder.svg")}
+                            alt={related.title}
+                            fill
+                            className="object-cover group-hover:scale-105 transition-transform"
+                          />
+                        )}
+                      </div>
+                      <div className="flex-1">
+                        <h3 className="font-medium mb-2 group-hover:text-primary transition-colors">{related.title}</h3>
+                        <p className="text-sm text-primary">{related.result}</p>
+                      </div>
+                      <ArrowUpRight className="w-5 h-5 text-muted-foreground group-hover:text-primary group-hover:translate-x-0.5 group-hover:-translate-y-0.5 transition-all" />
+                    </Link>
+                  );
+                })}
               </div>
             </div>
           </div>
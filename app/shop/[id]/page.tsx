@@ -3,6 +3,7 @@
 import React from "react";
 import { useState } from "react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import Link from "next/link";
 import { 
   Star, Check, X, ChevronLeft, ChevronRight, ShoppingCart, 
@@ -302,7 +303,7 @@ export default function ProductDetailPage({ params }: { params: { id: string } }
               <div>
                 <div className="relative aspect-[4/3] rounded-2xl overflow-hidden mb-4 bg-card border border-border/30">
                   <Image
-                    src={product.images[currentImage] || "/placeholder.svg"}
+                    src={imageUrl(product.images[currentImage] || "/placeholder.svg")}
                     alt={product.name}
                     fill
                     className="object-cover"
@@ -330,7 +331,7 @@ export default function ProductDetailPage({ params }: { params: { id: string } }
                         currentImage === i ? "border-primary" : "border-transparent hover:border-border"
                       )}
                     >
-                      <Image src={img || "/placeholder.svg"} alt="" fill className="object-cover" />
+                      <Image src={imageUrl(img || "/placeholder.svg")} alt="" fill className="object-cover" />
                     </button>
                   ))}
                 </div>
@@ -633,7 +634,7 @@ export default function ProductDetailPage({ params }: { params: { id: string } }
                   className="group flex items-center gap-6 p-4 rounded-xl border border-border/30 hover:border-primary/30 transition-colors"
                 >
                   <div className="relative w-24 h-24 rounded-lg overflow-hidden shrink-0">
-                    <Image src={item.image || "/placeholder.svg"} alt={item.name} fill className="object-cover group-hover:scale-105 transition-transform" />
+                    <Image src={imageUrl(item.image || "/placeholder.svg")} alt={item.name} fill className="object-cover group-hover:scale-105 transition-transform" />
                   </div>
                   <div className="flex-1">
                     <h3 className="font-medium mb-2 group-hover:text-primary transition-colors">{item.name}</h3>
@@ -2,6 +2,7 @@
 
 import { useState, useEffect, useRef } from "react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import Link from "next/link";
 import { Search, ShoppingCart, Star, Sparkles, Clock, Zap, ArrowRight, Filter } from "lucide-react";
 import { cn } from "@/lib/utils";
@@ -270,7 +271,7 @@ function ProductCard({
           {/* Image */}
           <div className="relative aspect-[4/3] overflow-hidden">
             <Image
-              src={product.image || "/placeholder.svg"}
+              src={imageUrl(product.image || "/placeholder.svg")}
               alt={product.name}
               fill
               className={cn(
@@ -6,6 +6,7 @@ import { getT } from "@/lib/i18n";
 import { cn } from "@/lib/utils";
 import { ArrowUpRight, Clock } from "lucide-react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 
 const toSlug = (title: string) =>
   title
@@ -105,7 +106,7 @@ export function Articles() {
             {/* Image */}
             <div className="relative h-64 lg:h-80 overflow-hidden">
               <Image
-                src={articles[0].image || "/placeholder.svg"}
+                src={imageUrl(articles[0].image || "/placeholder.svg")}
                 alt={articles[0].title}
                 fill
                 className="object-cover transition-transform duration-700 group-hover:scale-105"
@@ -162,7 +163,7 @@ export function Articles() {
             {/* Image */}
             <div className="relative h-48 overflow-hidden">
               <Image
-                src={articles[1].image || "/placeholder.svg"}
+                src={imageUrl(articles[1].image || "/placeholder.svg")}
                 alt={articles[1].title}
                 fill
                 className="object-cover transition-transform duration-700 group-hover:scale-105"
@@ -7,6 +7,7 @@ import { getT } from "@/lib/i18n";
 import { cn } from "@/lib/utils";
 import { ArrowUpRight } from "lucide-react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 import Link from "next/link";
 
 const toSlug = (title: string) =>
@@ -123,7 +124,7 @@ export function Cases() {
           >
             {activeCase !== null && (
               <Image
-                src={cases.find(c => c.id === activeCase)?.image || "/placeholder.svg"}
+                src={imageUrl(cases.find(c => c.id === activeCase)?.image || "/placeholder.svg")}
                 alt=""
                 fill
                 className="object-cover"
@@ -6,6 +6,7 @@ import { getT } from "@/lib/i18n";
 import { cn } from "@/lib/utils";
 import { ArrowUpRight, Star, Download, Zap } from "lucide-react";
 import Image from "next/image";
+import { imageUrl } from "@/lib/image-assets";
 
 const products = [
   {
@@ -118,7 +119,7 @@ export function Products() {
               {/* Product image */}
               <div className="relative aspect-[16/10] overflow-hidden">
                 <Image
-                  src={product.image || "/placeholder.svg"}
+                  src={imageUrl(product.image || "/placeholder.svg")}
                   alt={product.title}
                   fill
                   className="object-cover transition-transform duration-700 group-hover:scale-105"
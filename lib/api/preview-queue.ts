@@ -0,0 +1,222 @@
+/**
+ * 模板预览图处理队列
+ *
+ * 上传接口只把预览图原样写入本地队列目录就返回，缩略图、响应式衍生图和去除 EXIF
+ * 由 Python worker 在请求之外处理（python3 scripts/assets.py previews --watch）
+ * 目录结构与 scripts/asset_pipeline/previews.py 保持一致：
+ *   files/{id}.{ext}    原图
+ *   new/{id}.json       待处理任务
+ *   done/{id}.json      处理结果，等待写回模板
+ *   applied/{id}.json   已写回 Template.preview
+ *   failed/{id}.json    处理失败
+ *
+ * 队列和输出目录都在本地文件系统上，需要 worker 与 Next.js 运行在同一台机器（自托管）。
+ * Vercel 等只读文件系统上无法入队，上传接口会跳过预览图处理，原图照常可用
+ */
+
+import { mkdir, readdir, readFile, rename, writeFile } from 'fs/promises';
+import { join } from 'path';
+import { randomUUID } from 'crypto';
+import { prisma } from '@/lib/prisma';
+import type { FileUploadResult } from './file-upload';
+
+export const PREVIEW_SPOOL_DIR =
+  process.env.PREVIEW_SPOOL_DIR || join(process.cwd(), '.cache', 'previews');
+
+/**
+ * worker 的输出目录。不放在 public/ 下：Next.js 只提供构建时就存在的 public 文件，
+ * 这里的文件由 app/api/previews/[id]/[name]/route.ts 读取返回（或同步到 CDN，见 PREVIEW_PUBLIC_URL）
+ */
+export const PREVIEW_OUTPUT_DIR =
+  process.env.PREVIEW_OUTPUT_DIR || join(process.cwd(), '.cache', 'preview-output');
+
+export interface PreviewJob {
+  id: string;
+  source: string; // 相对队列目录的原图路径
+  filename: string;
+  url: string; // uploadFile 返回的原图地址
+  templateId?: string; // 上传时已知所属模板时填写
+  createdAt: string;
+}
+
+export interface PreviewVariant {
+  src: string;
+  width: number;
+  height: number;
+  bytes: number;
+}
+
+export interface PreviewResult extends PreviewJob {
+  width: number;
+  height: number;
+  thumbnail: PreviewVariant;
+  sources: Record<string, PreviewVariant[]>;
+  srcset: Record<string, string>;
+  processed_at: string;
+}
+
+export type PreviewStatus =
+  | { status: 'pending' }
+  | { status: 'done'; result: PreviewResult }
+  | { status: 'failed'; error: string };
+
+/**
+ * 任务 id 以时间戳开头，worker 按文件名排序即为提交顺序
+ */
+function createJobId(): string {
+  return `${Date.now().toString(36).padStart(9, '0')}-${randomUUID().slice(0, 8)}`;
+}
+
+/**
+ * 把一张预览图加入处理队列，返回任务 id
+ * 原图先写入 files/，任务文件先写入 tmp/ 再 rename 到 new/，worker 不会读到写了一半的任务
+ */
+export async function enqueuePreview(
+  file: File,
+  upload: FileUploadResult,
+  templateId?: string
+): Promise<string> {
+  const id = createJobId();
+  const ext = file.name.substring(file.name.lastIndexOf('.') + 1).toLowerCase();
+  const source = `files/${id}.${ext}`;
+
+  await Promise.all(
+    ['files', 'tmp', 'new'].map((dir) => mkdir(join(PREVIEW_SPOOL_DIR, dir), { recursive: true }))
+  );
+  await writeFile(join(PREVIEW_SPOOL_DIR, source), Buffer.from(await file.arrayBuffer()));
+
+  const job: PreviewJob = {
+    id,
+    source,
+    filename: file.name,
+    url: upload.url,
+    ...(templateId ? { templateId } : {}),
+    createdAt: new Date().toISOString(),
+  };
+  const tmpPath = join(PREVIEW_SPOOL_DIR, 'tmp', `${id}.json`);
+  await writeFile(tmpPath, JSON.stringify(job));
+  await rename(tmpPath, join(PREVIEW_SPOOL_DIR, 'new', `${id}.json`));
+  return id;
+}
+
+/**
+ * 批量加入队列，返回与 files 顺序一致的任务 id
+ */
+export async function enqueuePreviews(
+  files: File[],
+  uploads: FileUploadResult[],
+  templateId?: string
+): Promise<string[]> {
+  return Promise.all(files.map((file, i) => enqueuePreview(file, uploads[i], templateId)));
+}
+
+/**
+ * 查询任务状态；worker 还没处理完时返回 pending
+ */
+export async function getPreviewStatus(id: string): Promise<PreviewStatus> {
+  if (!/^[0-9a-z]+-[0-9a-f]+$/.test(id)) {
+    throw new Error('无效的任务 id');
+  }
+  for (const queue of ['applied', 'done', 'failed'] as const) {
+    let content: string;
+    try {
+      content = await readFile(join(PREVIEW_SPOOL_DIR, queue, `${id}.json`), 'utf-8');
+    } catch {
+      continue;
+    }
+    const record = JSON.parse(content);
+    return queue === 'failed'
+      ? { status: 'failed', error: record.error }
+      : { status: 'done', result: record as PreviewResult };
+  }
+  return { status: 'pending' };
+}
+
+/**
+ * 写回模板的预览图地址：最大宽度的 JPEG（所有浏览器都支持），没有 JPEG 时取第一种格式
+ */
+export function processedPreviewUrl(result: PreviewResult): string {
+  const variants = result.sources.jpeg ?? Object.values(result.sources)[0] ?? [];
+  return variants.length > 0 ? variants[variants.length - 1].src : result.thumbnail.src;
+}
+
+/**
+ * 把处理完成的预览图写回模板：Template.preview 中的原图地址替换为处理后的地址，
+ * 上传时指定了模板但列表中还没有这张图时追加到末尾。写回后任务记录移到 applied/
+ * 上传时还没有创建模板的任务留在 done/，模板创建后再次调用时写回。返回写回的任务数
+ */
+export async function applyPreviewResults(): Promise<number> {
+  let names: string[];
+  try {
+    names = await readdir(join(PREVIEW_SPOOL_DIR, 'done'));
+  } catch {
+    return 0; // 队列目录不存在（还没有上传过，或运行在只读文件系统上）
+  }
+
+  let applied = 0;
+  for (const name of names.filter((n) => n.endsWith('.json')).sort()) {
+    const result = JSON.parse(
+      await readFile(join(PREVIEW_SPOOL_DIR, 'done', name), 'utf-8')
+    ) as PreviewResult;
+    const processed = processedPreviewUrl(result);
+    const templates = await prisma.template.findMany({
+      where: result.templateId
+        ? { id: result.templateId }
+        : { preview: { has: result.url } },
+      select: { id: true, preview: true },
+    });
+    if (templates.length === 0) {
+      continue;
+    }
+
+    for (const template of templates) {
+      const preview = template.preview.includes(result.url)
+        ? template.preview.map((url) => (url === result.url ? processed : url))
+        : template.preview.includes(processed)
+          ? template.preview
+          : [...template.preview, processed];
+      await prisma.template.update({ where: { id: template.id }, data: { preview } });
+    }
+    await mkdir(join(PREVIEW_SPOOL_DIR, 'applied'), { recursive: true });
+    await rename(join(PREVIEW_SPOOL_DIR, 'done', name), join(PREVIEW_SPOOL_DIR, 'applied', name));
+    applied++;
+  }
+  return applied;
+}
+
+/**
+ * 在模板写入之后调用：写回失败只记录日志（返回 0），不影响接口本身的结果
+ */
+export async function syncPreviewResults(): Promise<number> {
+  try {
+    return await applyPreviewResults();
+  } catch (e) {
+    console.error('预览图处理结果写回失败:', e);
+    return 0;
+  }
+}
+
+const PREVIEW_CONTENT_TYPES: Record<string, string> = {
+  jpg: 'image/jpeg',
+  webp: 'image/webp',
+  avif: 'image/avif',
+};
+
+/**
+ * 读取 worker 生成的文件（{任务 id}/thumb.jpg、{任务 id}/1280w.webp），路径不合法或文件不存在时返回 null
+ */
+export async function readPreviewFile(
+  id: string,
+  name: string
+): Promise<{ body: Buffer; contentType: string } | null> {
+  const match = /^(?:thumb|\d+w)\.(jpg|webp|avif)$/.exec(name);
+  if (!/^[0-9a-z]+-[0-9a-f]+$/.test(id) || !match) {
+    return null;
+  }
+  try {
+    const body = await readFile(join(PREVIEW_OUTPUT_DIR, id, name));
+    return { body, contentType: PREVIEW_CONTENT_TYPES[match[1]] };
+  } catch {
+    return null;
+  }
+}
@@ -0,0 +1,101 @@
+/**
+ * 图片的长期缓存地址和图集（雪碧图）坐标
+ *
+ * python3 scripts/assets.py fingerprint（npm run build / dev 之前自动运行）为 public/images 中的每张图片
+ * 生成带内容哈希的副本（public/images/hashed/{名称}.{哈希}.{扩展名}），并把 {文件名: 地址} 写入
+ * lib/image-manifest.json。两者都不提交，next.config.ts 在构建时把映射内联为 process.env.IMAGE_MANIFEST。
+ * hashed/ 下的文件内容永不改变，next.config.ts 为它们设置了一年的 immutable 缓存
+ *
+ * python3 scripts/assets.py atlas 把 scripts/assets.json 中配置的小图分组拼合成一张图集，
+ * 坐标写入 lib/image-atlases.json，同时生成 public/images/atlases/atlases.css。
+ * 列表页用 spriteStyle()（内联样式，自定义宽度）显示其中的小图，整组只需一次请求，例如案例详情页的相关案例；
+ * spriteClass() 按配置尺寸显示，使用它的组件需要自行引入 atlases.css（不再全局引入，避免每个页面都加载）
+ */
+
+import type { CSSProperties } from 'react';
+
+import imageAtlases from './image-atlases.json';
+
+const manifest: Record<string, string> = JSON.parse(process.env.IMAGE_MANIFEST || '{}');
+
+const MIME_TYPES: Record<string, string> = { webp: 'image/webp', avif: 'image/avif', jpeg: 'image/jpeg' };
+
+interface Atlas {
+  width: number;
+  height: number;
+  /** 图集像素 / CSS 像素 */
+  scale: number;
+  urls: Record<string, string>;
+  sprites: Record<string, { x: number; y: number; width: number; height: number }>;
+}
+
+const atlases: Record<string, Atlas> = imageAtlases;
+
+/**
+ * 把 public/images 下图片的地址换成带内容哈希的地址，例如 <Image src={imageUrl(item.image)} />
+ * 没有指纹的地址（没有运行 fingerprint，或不是 public/images 下的图片）原样返回
+ */
+export function imageUrl(src: string): string {
+  if (!src.startsWith('/images/')) {
+    return src;
+  }
+  return manifest[src.slice('/images/'.length)] ?? src;
+}
+
+function findSprite(src: string) {
+  const name = src.startsWith('/images/') ? src.slice('/images/'.length) : src;
+  for (const [group, atlas] of Object.entries(atlases)) {
+    const sprite = atlas.sprites[name];
+    if (sprite) {
+      return { group, name, atlas, sprite };
+    }
+  }
+  return undefined;
+}
+
+/**
+ * 图集中各格式的 image-set()，JPEG 排在最后作为不支持 WebP / AVIF 时的兜底
+ * 只有一种格式时直接返回 url()
+ */
+function backgroundImage(urls: Record<string, string>): string {
+  const formats = Object.keys(urls).sort((a, b) => Number(a === 'jpeg') - Number(b === 'jpeg'));
+  if (formats.length === 1) {
+    return `url("${urls[formats[0]]}")`;
+  }
+  return `image-set(${formats.map((fmt) => `url("${urls[fmt]}") type("${MIME_TYPES[fmt]}")`).join(', ')})`;
+}
+
+/**
+ * 图片在图集中时，返回 atlases.css 中对应的类名（按图集配置的尺寸显示），否则返回 undefined
+ * 样式表为不支持 image-set() 的浏览器额外声明了 JPEG 背景
+ */
+export function spriteClass(src: string): string | undefined {
+  const found = findSprite(src);
+  if (!found) {
+    return undefined;
+  }
+  const stem = found.name.replace(/\.[^.]+$/, '').replace(/[^\w-]/g, '-');
+  return `atlas-${found.group}--${stem}`;
+}
+
+/**
+ * 图片在图集中时，返回以背景图显示它的样式（宽高、背景位置和缩放），否则返回 undefined
+ * width 为显示宽度（CSS 像素），默认使用图集配置中的尺寸
+ * 背景图使用 image-set()，浏览器按支持的格式选择 WebP 或 JPEG
+ */
+export function spriteStyle(src: string, width?: number): CSSProperties | undefined {
+  const found = findSprite(src);
+  if (!found) {
+    return undefined;
+  }
+  const { atlas, sprite } = found;
+  const ratio = width ? width / sprite.width : 1 / atlas.scale;
+  return {
+    width: sprite.width * ratio,
+    height: sprite.height * ratio,
+    backgroundImage: backgroundImage(atlas.urls),
+    backgroundRepeat: 'no-repeat',
+    backgroundPosition: `${-sprite.x * ratio}px ${-sprite.y * ratio}px`,
+    backgroundSize: `${atlas.width * ratio}px ${atlas.height * ratio}px`,
+  };
+}
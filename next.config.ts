@@ -1,9 +1,29 @@
+import { existsSync, readFileSync } from "fs";
 import type { NextConfig } from "next";
 
+// scripts/assets.py fingerprint 生成的 {文件名: 带哈希的地址}（prebuild / predev 时生成，不提交）；
+// 没有生成时为空，lib/image-assets.ts 的 imageUrl() 原样返回原地址
+const imageManifestPath = "lib/image-manifest.json";
+const imageManifest = existsSync(imageManifestPath) ? readFileSync(imageManifestPath, "utf-8") : "{}";
+
 const nextConfig: NextConfig = {
   typescript: {
     ignoreBuildErrors: false,
   },
+  env: {
+    IMAGE_MANIFEST: imageManifest,
+  },
+  async headers() {
+    return [
+      {
+        // scripts/assets.py fingerprint 生成的带内容哈希的图片，内容变化时文件名也会变
+        source: "/images/hashed/:path*",
+        headers: [
+          { key: "Cache-Control", value: "public, max-age=31536000, immutable" },
+        ],
+      },
+    ];
+  },
 };
 
 export default nextConfig;
@@ -0,0 +1,10 @@
+"""
+图片资源流水线的共享模块
+scripts/ 下的脚本直接运行时 scripts/ 位于 sys.path 首位，
+因此可以通过 `from asset_pipeline.xxx import ...` 引用
+"""
+
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+IMAGES_DIR = ROOT_DIR / "public" / "images"
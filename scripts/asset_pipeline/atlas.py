@@ -0,0 +1,369 @@
+"""
+图片拼合（雪碧图）
+列表页上的小图（头像、案例缩略图、模板缩略图）每张都是一次单独的请求。
+这里把 scripts/assets.json 的 atlases 段中配置的每组小图缩小后用 skyline 算法装箱到一张大图中，
+输出 WebP / JPEG 两种格式，以及坐标清单：
+  public/images/atlases/{组名}.webp / .jpg
+  public/images/atlases/atlases.css    每张小图一个 .atlas-{组名}--{名称} 类
+  lib/image-atlases.json               供 lib/image-assets.ts 的 spriteStyle() 使用
+按成员内容哈希和组配置增量构建：只有成员变化（或增删）的组会重新拼合
+"""
+
+import fnmatch
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+from . import IMAGES_DIR, ROOT_DIR
+from .cache import CACHE_DIR
+from .planner import content_hash
+from .storage import atomic_write
+
+OUTPUT_DIRNAME = "atlases"
+URL_PREFIX = f"/images/{OUTPUT_DIRNAME}"
+CSS_NAME = "atlases.css"
+MAP_PATH = ROOT_DIR / "lib" / "image-atlases.json"
+STATE_PATH = CACHE_DIR / "atlas-state.json"
+
+MEMBER_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+DEFAULT_SETTINGS = {
+    "padding": 2,  # 相邻小图之间的间隔（图集像素），用边缘像素填充，缩放显示时不会混入邻居的颜色
+    "max_width": 2048,
+    "formats": ["webp", "jpeg"],
+    "quality": {"webp": 80, "jpeg": 82},
+    "groups": {},
+}
+
+# 每组的默认值：size 是显示时的最长边（CSS 像素），scale 为 2 时按两倍像素存储以适配高分屏
+GROUP_DEFAULTS = {"members": [], "size": 160, "scale": 2}
+
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+MIME_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+ENCODER_OPTIONS = {
+    "jpeg": {"progressive": True, "optimize": True},
+    "webp": {"method": 4},
+}
+
+
+class Placement(NamedTuple):
+    x: int
+    y: int
+
+
+def skyline_pack(sizes: List[Tuple[int, int]], width: int) -> Tuple[List[Placement], int]:
+    """
+    skyline bottom-left 装箱：按顺序放置每个矩形，选择顶边最低（其次最靠左）的位置
+    返回各矩形的位置（与 sizes 顺序一致）和用到的高度；有矩形比 width 宽时抛出 ValueError
+    """
+    # 天际线：[(x, y, 宽)]，从左到右覆盖 [0, width)
+    skyline = [(0, 0, width)]
+    placements = []
+    used = 0
+    for w, h in sizes:
+        if w > width:
+            raise ValueError(f"{w}px 宽的图片放不进 {width}px 宽的图集")
+        best = None
+        for i, (x, _, _) in enumerate(skyline):
+            if x + w > width:
+                break
+            # 跨过的各段中最高的那段决定放置高度
+            top, covered, j = 0, 0, i
+            while covered < w:
+                top = max(top, skyline[j][1])
+                covered += skyline[j][2]
+                j += 1
+            if best is None or (top + h, x) < (best[1] + h, best[0]):
+                best = (x, top, i)
+        x, top, i = best
+        placements.append(Placement(x, top))
+        used = max(used, top + h)
+
+        # 新的一段覆盖 [x, x+w)，裁掉被它盖住的部分
+        rest = []
+        for sx, sy, sw in skyline[i:]:
+            end = sx + sw
+            if end <= x + w:
+                continue
+            start = max(sx, x + w)
+            rest.append((start, sy, end - start))
+        merged = skyline[:i] + [(x, top + h, w)] + rest
+        skyline = []
+        for segment in merged:
+            if skyline and skyline[-1][1] == segment[1]:
+                px, py, pw = skyline[-1]
+                skyline[-1] = (px, py, pw + segment[2])
+            else:
+                skyline.append(segment)
+    return placements, used
+
+
+def pack(sizes: List[Tuple[int, int]], max_width: int) -> Tuple[List[Placement], int, int]:
+    """在几种图集宽度中选面积最小的装箱结果，返回 (位置, 宽, 高)"""
+    if not sizes:
+        return [], 0, 0
+    # 按高度从高到低放置，skyline 的空隙最少
+    order = sorted(range(len(sizes)), key=lambda k: (-sizes[k][1], -sizes[k][0], k))
+    ordered = [sizes[k] for k in order]
+    widest = max(w for w, _ in sizes)
+    area = sum(w * h for w, h in sizes)
+    candidates = {min(max_width, max(widest, math.ceil(math.sqrt(area) * f))) for f in (1.0, 1.2, 1.5, 2.0)}
+    candidates.add(min(max_width, sum(w for w, _ in sizes)))
+    best = None
+    for width in sorted(c for c in candidates if c >= widest):
+        placed, height = skyline_pack(ordered, width)
+        # 实际用到的宽度可能比候选宽度小
+        used = max(p.x + w for p, (w, _) in zip(placed, ordered))
+        if best is None or (used * height, height) < (best[1] * best[2], best[2]):
+            best = (placed, used, height)
+    if best is None:
+        raise ValueError(f"{widest}px 宽的图片超过图集最大宽度 {max_width}px")
+    placed, used, height = best
+    positions: List[Placement] = [Placement(0, 0)] * len(sizes)
+    for k, p in zip(order, placed):
+        positions[k] = p
+    return positions, used, height
+
+
+def sprite_size(width: int, height: int, group: dict) -> Tuple[int, int]:
+    """小图在图集中的像素尺寸：最长边缩到 size × scale，不放大"""
+    longest = group["size"] * group["scale"]
+    ratio = min(1.0, longest / max(width, height))
+    return max(1, round(width * ratio)), max(1, round(height * ratio))
+
+
+def available_formats(formats: List[str]) -> List[str]:
+    """过滤掉当前 Pillow 不支持编码的格式"""
+    return [fmt for fmt in formats if fmt in EXTENSIONS and (fmt == "jpeg" or features.check(fmt))]
+
+
+def _load(path: Path, size: Tuple[int, int]) -> Image.Image:
+    with Image.open(path) as src:
+        # JPEG 用 draft 模式在 DCT 阶段直接缩小解码，400px 以上的原图只解码需要的部分
+        src.draft("RGB", (size[0] * 2, size[1] * 2))
+        img = ImageOps.exif_transpose(src).convert("RGB")
+    if img.size != size:
+        img = img.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    return img
+
+
+def _extrude(sheet: Image.Image, img: Image.Image, x: int, y: int, padding: int) -> None:
+    """把 img 贴到 (x, y)，并把四条边向外延伸 padding 像素"""
+    w, h = img.size
+    sheet.paste(img, (x, y))
+    if padding <= 0:
+        return
+    sheet.paste(img.crop((0, 0, w, 1)).resize((w, padding), Image.NEAREST), (x, y - padding))
+    sheet.paste(img.crop((0, h - 1, w, h)).resize((w, padding), Image.NEAREST), (x, y + h))
+    left = sheet.crop((x, y - padding, x + 1, y + h + padding))
+    right = sheet.crop((x + w - 1, y - padding, x + w, y + h + padding))
+    sheet.paste(left.resize((padding, h + 2 * padding), Image.NEAREST), (x - padding, y - padding))
+    sheet.paste(right.resize((padding, h + 2 * padding), Image.NEAREST), (x + w, y - padding))
+
+
+def render_atlas(name: str, members: List[Tuple[Path, Tuple[int, int]]], group: dict, settings: dict,
+                 output_dir: Path) -> dict:
+    """
+    解码并缩小每个成员、装箱、拼合并编码；members 为 [(原图路径, (原图宽, 原图高))]
+    返回该组在坐标清单中的条目（不含 url）
+    """
+    padding = settings["padding"]
+    sizes = [sprite_size(w, h, group) for _, (w, h) in members]
+    padded = [(w + 2 * padding, h + 2 * padding) for w, h in sizes]
+    positions, width, height = pack(padded, settings["max_width"])
+
+    sheet = Image.new("RGB", (width, height), (255, 255, 255))
+    sprites = {}
+    for (path, _), size, p in zip(members, sizes, positions):
+        x, y = p.x + padding, p.y + padding
+        _extrude(sheet, _load(path, size), x, y, padding)
+        sprites[path.name] = {"x": x, "y": y, "width": size[0], "height": size[1]}
+
+    files = {}
+    for fmt in settings["formats"]:
+        path = output_dir / f"{name}.{EXTENSIONS[fmt]}"
+        with atomic_write(path) as f:
+            sheet.save(f, fmt.upper(), quality=settings["quality"][fmt], **ENCODER_OPTIONS[fmt])
+        files[fmt] = path.name
+    return {"width": width, "height": height, "scale": group["scale"], "files": files, "sprites": sprites}
+
+
+def _render_job(job) -> Tuple[Optional[dict], Optional[str]]:
+    try:
+        return render_atlas(*job), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _image_size(path: Path) -> Tuple[int, int]:
+    """只读文件头，不解码像素"""
+    with Image.open(path) as img:
+        width, height = img.size
+        # EXIF 方向 5-8 需要旋转 90°，宽高互换（_load 解码时按 EXIF 方向旋转）
+        return (height, width) if img.getexif().get(0x0112, 1) > 4 else (width, height)
+
+
+def select_members(patterns: List[str], names: List[str]) -> List[str]:
+    """按配置中的文件名或通配符（case-*.jpg）选出成员，保持配置顺序、去重"""
+    selected: List[str] = []
+    for pattern in patterns:
+        for name in names:
+            if fnmatch.fnmatchcase(name, pattern) and name not in selected:
+                selected.append(name)
+    return selected
+
+
+def class_name(group: str, filename: str) -> str:
+    stem = os.path.splitext(filename)[0]
+    return f"atlas-{group}--{''.join(c if c.isalnum() or c in '-_' else '-' for c in stem)}"
+
+
+def stylesheet(atlases: Dict[str, dict]) -> str:
+    """每组一个带背景图的基础类，每张小图一个设置尺寸和偏移的类（CSS 像素 = 图集像素 / scale）"""
+    lines = ["/* 由 python3 scripts/assets.py atlas 生成，请勿手动修改 */"]
+    for group, atlas in atlases.items():
+        scale = atlas["scale"]
+        urls = atlas["urls"]
+        fallback = urls.get("jpeg") or next(iter(urls.values()))
+        image_set = ", ".join(f'url("{url}") type("{MIME_TYPES[fmt]}")' for fmt, url in urls.items())
+        lines += [
+            "",
+            f'[class*="atlas-{group}--"] {{',
+            f'  background-image: url("{fallback}");',
+            f"  background-image: image-set({image_set});",
+            "  background-repeat: no-repeat;",
+            f"  background-size: {atlas['width'] / scale:g}px {atlas['height'] / scale:g}px;",
+            "}",
+        ]
+        for filename, s in atlas["sprites"].items():
+            lines.append(
+                f".{class_name(group, filename)} {{ width: {s['width'] / scale:g}px; height: {s['height'] / scale:g}px; "
+                f"background-position: {-s['x'] / scale:g}px {-s['y'] / scale:g}px; }}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def _write_if_changed(path: Path, content: str) -> None:
+    try:
+        if path.read_text(encoding="utf-8") == content:
+            return
+    except OSError:
+        pass
+    with atomic_write(path) as f:
+        f.write(content.encode("utf-8"))
+
+
+def build_atlases(
+    images_dir: Path = IMAGES_DIR,
+    output_dir: Optional[Path] = None,
+    map_path: Path = MAP_PATH,
+    settings: Optional[dict] = None,
+    processes: Optional[int] = None,
+    force: bool = False,
+) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    增量构建各组图集并更新坐标清单，逐组产出 (组名, 状态, 说明)
+    状态: "built" / "fresh" / "failed" / "empty"（没有匹配到成员）/ "removed"（配置中已删除的组）
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    settings["formats"] = available_formats(settings["formats"])
+    output_dir = Path(output_dir or images_dir / OUTPUT_DIRNAME)
+    try:
+        state = json.loads(STATE_PATH.read_text())
+    except (OSError, ValueError):
+        state = {}
+    sources: Dict[str, dict] = state.get("sources", {})
+    previous: Dict[str, dict] = state.get("atlases", {})
+
+    names = sorted(p.name for p in images_dir.iterdir() if p.is_file() and p.suffix.lower() in MEMBER_SUFFIXES)
+    encoding = {key: settings[key] for key in ("padding", "max_width", "formats", "quality")}
+    atlases: Dict[str, dict] = {}
+    jobs = []
+    used_sources = set()
+    for group_name, group in settings["groups"].items():
+        group = {**GROUP_DEFAULTS, **group}
+        members = select_members(group["members"], names)
+        if not members:
+            yield group_name, "empty", "没有匹配到图片"
+            continue
+        digests = []
+        for name in members:
+            path = images_dir / name
+            st = path.stat()
+            entry = sources.get(name)
+            sha256 = content_hash(path, st, entry)
+            if entry is None or entry.get("sha256") != sha256 or "size_px" not in entry:
+                entry = {"size_px": list(_image_size(path))}
+            sources[name] = {**entry, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+            used_sources.add(name)
+            digests.append(f"{name}:{sha256}")
+        # 组的版本：成员（顺序和内容）+ 组配置 + 编码配置，任何一项变化都要重新拼合
+        version = hashlib.sha256(
+            json.dumps([digests, group, encoding], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        old = previous.get(group_name)
+        if (
+            not force
+            and old is not None
+            and old.get("version") == version
+            and all((output_dir / f).exists() for f in old["files"].values())
+        ):
+            atlases[group_name] = old
+            yield group_name, "fresh", None
+            continue
+        members_info = [(images_dir / name, tuple(sources[name]["size_px"])) for name in members]
+        jobs.append((group_name, version, (group_name, members_info, group, encoding, output_dir)))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    processes = min(processes or os.cpu_count() or 1, len(jobs) or 1)
+    if processes <= 1:
+        results = map(_render_job, (job for _, _, job in jobs))
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=processes)
+        results = pool.map(_render_job, [job for _, _, job in jobs])
+    try:
+        for (group_name, version, _), (entry, error) in zip(jobs, results):
+            if error:
+                # 保留上次成功的结果，页面不会因为一次失败丢失图集
+                if group_name in previous:
+                    atlases[group_name] = previous[group_name]
+                yield group_name, "failed", error
+                continue
+            entry["version"] = version
+            atlases[group_name] = entry
+            yield group_name, "built", f"{len(entry['sprites'])} 张，{entry['width']}x{entry['height']}"
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # 配置中删除的组、不再匹配到成员的组
+    for group_name in sorted(set(previous) - set(atlases)):
+        for filename in previous[group_name]["files"].values():
+            (output_dir / filename).unlink(missing_ok=True)
+        yield group_name, "removed", None
+
+    # 图集文件名固定，url 带上版本号，内容变化后浏览器会重新下载
+    for atlas in atlases.values():
+        atlas["urls"] = {fmt: f"{URL_PREFIX}/{filename}?v={atlas['version'][:8]}"
+                         for fmt, filename in atlas["files"].items()}
+    mapping = {
+        group: {key: atlas[key] for key in ("width", "height", "scale", "urls", "sprites")}
+        for group, atlas in atlases.items()
+    }
+    _write_if_changed(map_path, json.dumps(mapping, ensure_ascii=False, indent=2) + "\n")
+    _write_if_changed(output_dir / CSS_NAME, stylesheet(atlases))
+
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(STATE_PATH) as f:
+        state = {
+            "sources": {name: entry for name, entry in sources.items() if name in used_sources},
+            "atlases": atlases,
+        }
+        f.write(json.dumps(state, indent=2).encode())
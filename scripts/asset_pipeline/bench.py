@@ -0,0 +1,353 @@
+"""
+图片流水线基准测试
+micro: 按清单中的每种尺寸渲染占位图、按不同质量编码 JPEG
+macro: 把 scripts/ 复制到临时目录，对着本地假服务器（可注入延迟和错误）完整运行脚本
+结果追加到 JSON 历史文件，compare() 与历史中最近的结果对比找出退化项
+"""
+
+import hashlib
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import ROOT_DIR
+from .cache import CACHE_DIR
+from .storage import atomic_write
+
+HISTORY_PATH = CACHE_DIR / "bench-history.json"
+SCRIPTS_DIR = ROOT_DIR / "scripts"
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10  # 中位数变慢超过 10% 视为退化
+JPEG_QUALITIES = (60, 75, 85, 95)
+
+# 假服务器默认参数
+DEFAULT_LATENCY = 0.05
+DEFAULT_ERROR_RATE = 0.2
+
+
+@dataclass
+class BenchResult:
+    """单项基准的结果，时间单位为秒（每次操作）"""
+
+    name: str
+    samples: List[float]
+    median: float = 0.0
+    min: float = 0.0
+    stdev: float = 0.0
+
+    def __post_init__(self):
+        self.median = statistics.median(self.samples)
+        self.min = min(self.samples)
+        self.stdev = statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+
+def measure(name: str, fn: Callable[[], object], repeat: int = DEFAULT_REPEAT, number: int = 1,
+            setup: Optional[Callable[[], object]] = None) -> BenchResult:
+    """重复 repeat 轮，每轮调用 number 次 fn，记录每次调用的平均耗时"""
+    samples = []
+    for _ in range(repeat):
+        elapsed = 0.0
+        for _ in range(number):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            fn()
+            elapsed += time.perf_counter() - start
+        samples.append(elapsed / number)
+    return BenchResult(name, samples)
+
+
+# ---------------------------------------------------------------- micro
+
+
+def bench_render(sizes: List[Tuple[int, int]], repeat: int = DEFAULT_REPEAT) -> Iterator[BenchResult]:
+    """每种尺寸渲染一张占位图（每次都清空背景缓存，测的是冷渲染）"""
+    from . import render
+
+    for width, height in sizes:
+        yield measure(
+            f"render/{width}x{height}",
+            lambda: render.render_placeholder(width, height, "Benchmark"),
+            repeat=repeat,
+            number=3,
+            setup=render._background.cache_clear,
+        )
+
+
+def bench_jpeg(qualities=JPEG_QUALITIES, size: Tuple[int, int] = (1920, 1080),
+               repeat: int = DEFAULT_REPEAT) -> Iterator[BenchResult]:
+    """把同一张占位图按不同质量编码为 JPEG"""
+    from .render import render_placeholder
+
+    img = render_placeholder(size[0], size[1], "Benchmark")
+    for quality in qualities:
+        yield measure(
+            f"jpeg/q{quality}",
+            lambda: img.save(io.BytesIO(), "JPEG", quality=quality),
+            repeat=repeat,
+            number=3,
+        )
+
+
+def manifest_sizes() -> List[Tuple[int, int]]:
+    """清单中出现过的所有尺寸（去重后排序）"""
+    from .manifest import load_manifest
+
+    return sorted({(a["width"], a["height"]) for a in load_manifest().values()})
+
+
+# ---------------------------------------------------------------- macro
+
+
+# 请求路径中的尺寸：/unsplash/1600x900/?...、/placeholder/1600x900.jpg/...、/picsum/seed/名称/1600/900
+_SIZE_IN_PATH = re.compile(r"/(\d+)x(\d+)(?:[./?]|$)|/(\d+)/(\d+)(?:[/?]|$)")
+
+
+class FakeImageServer:
+    """
+    本地假图片服务器，代替 Unsplash / Picsum / placeholder.com
+    按请求路径中的尺寸返回 JPEG（同一尺寸只渲染一次），下载结果能通过尺寸校验；
+    每个请求先等待 latency 秒；按路径固定挑出 error_rate 比例的 URL，
+    第一次请求返回 503（带 Retry-After: 0），重试后成功，保证每次运行注入的错误相同
+    """
+
+    def __init__(self, latency: float = DEFAULT_LATENCY, error_rate: float = DEFAULT_ERROR_RATE):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._bodies: Dict[Tuple[int, int], bytes] = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def body(self, path: str) -> Optional[bytes]:
+        """路径中尺寸对应的图片，路径中没有尺寸时返回 None"""
+        from .render import render_placeholder
+
+        match = _SIZE_IN_PATH.search(path.split("?", 1)[0] + "?")
+        if not match:
+            return None
+        width, height = (int(g) for g in match.groups() if g is not None)
+        with self._lock:
+            body = self._bodies.get((width, height))
+        if body is None:
+            buf = io.BytesIO()
+            render_placeholder(width, height, "Benchmark").save(buf, "JPEG", quality=85)
+            body = buf.getvalue()
+            with self._lock:
+                self._bodies[(width, height)] = body
+        return body
+
+    def reset(self):
+        """清空已注入错误的记录，下一轮运行重新注入同一批错误"""
+        with self._lock:
+            self._failed.clear()
+
+    @property
+    def base(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def should_fail(self, path: str) -> bool:
+        """按路径哈希决定是否注入错误，每个路径只失败一次"""
+        bucket = int.from_bytes(hashlib.sha256(path.encode()).digest()[:4], "big") / 2**32
+        with self._lock:
+            self.requests += 1
+            if bucket < self.error_rate and path not in self._failed:
+                self._failed.add(path)
+                self.errors += 1
+                return True
+        return False
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                if server.should_fail(self.path):
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = server.body(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "FakeImageServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextmanager
+def sandbox() -> Iterator[Path]:
+    """把 scripts/ 复制到临时项目根目录，脚本的图片目录和缓存都落在临时目录中"""
+    with tempfile.TemporaryDirectory(prefix="asset-bench-") as tmp:
+        root = Path(tmp)
+        shutil.copytree(SCRIPTS_DIR, root / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+        (root / "public" / "images").mkdir(parents=True)
+        yield root
+
+
+def run_script(root: Path, script: str, *args: str, env: Optional[Dict[str, str]] = None) -> float:
+    """在沙盒中运行一个脚本，返回耗时；脚本失败时抛出 RuntimeError"""
+    full_env = {k: v for k, v in os.environ.items() if k != "ASSET_CACHE_DIR"}
+    full_env.update(env or {})
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(root / "scripts" / script), *args],
+        cwd=root, env=full_env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script} 退出码 {proc.returncode}: {proc.stderr.strip()[-500:]}")
+    return elapsed
+
+
+def bench_download(repeat: int = 3, latency: float = DEFAULT_LATENCY,
+                   error_rate: float = DEFAULT_ERROR_RATE) -> Iterator[BenchResult]:
+    """完整运行 download-placeholder-images.py：首次下载全部图片，以及全部已是最新的空运行"""
+    from .manifest import load_manifest
+
+    cold, noop = [], []
+    with FakeImageServer(latency, error_rate) as server:
+        env = {
+            "UNSPLASH_SOURCE_BASE": server.base + "/unsplash",
+            "PICSUM_BASE": server.base + "/picsum",
+            "PLACEHOLDER_BASE": server.base + "/placeholder",
+        }
+        for _ in range(repeat):
+            server.reset()
+            with sandbox() as root:
+                # 沙盒中没有源码，只构建被引用的图片时什么都不会下载
+                cold.append(run_script(root, "download-placeholder-images.py", "--all", env=env))
+                # 下载脚本部分失败时仍以 0 退出，这里检查图片是否全部落地
+                missing = set(load_manifest()) - {p.name for p in (root / "public" / "images").iterdir()}
+                if missing:
+                    raise RuntimeError(f"下载未完成: {', '.join(sorted(missing))}")
+                noop.append(run_script(root, "download-placeholder-images.py", "--all", env=env))
+    yield BenchResult("download/cold", cold)
+    yield BenchResult("download/noop", noop)
+
+
+def bench_placeholders(repeat: int = 3) -> Iterator[BenchResult]:
+    """完整运行 generate-placeholders.py（从空目录生成全部占位图）"""
+    samples = []
+    for _ in range(repeat):
+        with sandbox() as root:
+            samples.append(run_script(root, "generate-placeholders.py", "--all"))
+    yield BenchResult("placeholders/cold", samples)
+
+
+# ---------------------------------------------------------------- history
+
+
+def environment() -> dict:
+    """记录运行环境，跨机器的结果不具可比性"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_history(path: Path = HISTORY_PATH) -> List[dict]:
+    try:
+        return json.loads(path.read_text())["runs"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def append_history(run: dict, path: Path = HISTORY_PATH):
+    runs = load_history(path)
+    runs.append(run)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as f:
+        f.write(json.dumps({"runs": runs}, indent=2).encode())
+
+
+def make_run(results: List[BenchResult], params: dict) -> dict:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "env": environment(),
+        "params": params,
+        "results": {r.name: {k: v for k, v in asdict(r).items() if k != "name"} for r in results},
+    }
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+    change: float  # 相对变化，正数表示变慢
+    baseline_commit: Optional[str] = None
+    regressed: bool = field(default=False)
+
+
+def compare(history: List[dict], current: dict, threshold: float = DEFAULT_THRESHOLD) -> List[Comparison]:
+    """
+    每项基准与历史中最近一次包含它的结果对比（按中位数）
+    变慢超过 threshold 且差值大于两倍标准差时才算退化，避免把抖动当成退化
+    """
+    out = []
+    for name, cur in current["results"].items():
+        baseline = next((run for run in reversed(history) if name in run["results"]), None)
+        if baseline is None:
+            continue
+        base = baseline["results"][name]
+        if base["median"] <= 0:
+            continue
+        change = cur["median"] / base["median"] - 1
+        noise = 2 * max(base["stdev"], cur["stdev"])
+        regressed = change > threshold and cur["median"] - base["median"] > noise
+        out.append(Comparison(name, base["median"], cur["median"], change, baseline["env"].get("commit"), regressed))
+    return out
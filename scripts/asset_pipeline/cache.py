@@ -0,0 +1,132 @@
+"""
+内容寻址的生成结果缓存
+以 (provider, model, prompt, width, height) 的哈希为键保存 AI 生成的原图，
+manifest.json 记录每个对象的参数、大小和最近使用时间，总大小超过上限时按 LRU 淘汰
+（每个输出文件当前对应哪个键由 planner.BuildState 记录）。
+本次运行还要用到的对象用 pin() 固定，淘汰时跳过，close() 时解除固定并保存
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from . import ROOT_DIR
+from .storage import atomic_write
+
+CACHE_DIR = Path(os.getenv("ASSET_CACHE_DIR", ROOT_DIR / ".cache" / "images"))
+CACHE_MAX_BYTES = int(os.getenv("ASSET_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+
+def cache_key(provider: str, model: str, prompt: str, width: int, height: int) -> str:
+    """生成参数的内容哈希"""
+    payload = json.dumps([provider, model, prompt, int(width), int(height)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AssetCache:
+    """磁盘上的 LRU 缓存，线程安全"""
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.manifest_path = self.root / "manifest.json"
+        self._lock = threading.RLock()
+        self.entries: Dict[str, dict] = {}
+        self.pinned: Set[str] = set()
+        self.dirty = False  # get() 刷新了最近使用时间但还没有保存
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return
+        self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"entries": self.entries}
+            with atomic_write(self.manifest_path) as f:
+                f.write(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+            self.dirty = False
+
+    def close(self) -> None:
+        """解除固定，按上限淘汰，并保存 get() 刷新过的最近使用时间"""
+        with self._lock:
+            if self.pinned:
+                self.pinned.clear()
+                self.evict()
+                self.dirty = True
+            if self.dirty:
+                self.save()
+
+    def __enter__(self) -> "AssetCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def pin(self, keys: Iterable[str]) -> None:
+        """固定本次运行稍后还要读取的对象（例如等待派生的母版），put() 触发的淘汰不会删除它们"""
+        with self._lock:
+            self.pinned.update(keys)
+
+    def object_path(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / key
+
+    def get(self, key: str) -> Optional[Path]:
+        """命中时返回缓存对象路径并刷新其最近使用时间"""
+        with self._lock:
+            entry = self.entries.get(key)
+            path = self.object_path(key)
+            if entry is None or not path.exists():
+                self.entries.pop(key, None)
+                return None
+            entry["last_used"] = time.time()
+            self.dirty = True
+            return path
+
+    def put(self, key: str, src: Path, meta: Optional[dict] = None) -> Path:
+        """把 src 复制进缓存，然后按需淘汰"""
+        path = self.object_path(key)
+        with atomic_write(path) as f, open(src, "rb") as source:
+            shutil.copyfileobj(source, f)
+        with self._lock:
+            self.entries[key] = {
+                **(meta or {}),
+                "size": path.stat().st_size,
+                "last_used": time.time(),
+            }
+            self.evict()
+            self.save()
+        return path
+
+    def evict(self) -> None:
+        """按最近使用时间从旧到新删除对象，直到总大小不超过上限；固定的对象不删除"""
+        with self._lock:
+            total = sum(entry["size"] for entry in self.entries.values())
+            for key in sorted(self.entries, key=lambda k: self.entries[k]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                if key in self.pinned:
+                    continue
+                total -= self.entries.pop(key)["size"]
+                try:
+                    self.object_path(key).unlink()
+                except FileNotFoundError:
+                    pass
+
+    def restore(self, key: str, dest: Path) -> bool:
+        """缓存命中时把对象复制到 dest 并返回 True"""
+        cached = self.get(key)
+        if cached is None:
+            return False
+        with atomic_write(dest) as f, open(cached, "rb") as source:
+            shutil.copyfileobj(source, f)
+        self.save()
+        return True
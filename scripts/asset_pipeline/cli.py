@@ -0,0 +1,986 @@
+"""
+assets 命令行：图片流水线的统一入口
+  plan      列出各来源需要处理的图片（不下载、不生成）
+  status    清单中每张图片的当前状态
+  fetch     从在线图库下载，--providers 指定来源及后备顺序
+  generate  调用 AI 生成，--provider openai / lovart
+  render    本地渲染占位图
+  optimize  重新压缩并检查体积预算
+  previews  处理后台上传的模板预览图（缩略图、响应式尺寸、去除 EXIF）
+  verify    校验图片格式、尺寸和完整性，隔离有问题的文件
+  refs      源码中引用了哪些图片：引用次数、缺失的图片、没有被引用的图片
+  serve     本地占位图服务，代替 via.placeholder.com
+  fingerprint  生成带内容哈希的图片副本和地址映射（可长期缓存），清理过期的旧指纹
+  atlas     把配置的小图分组拼合成图集（雪碧图），输出 CSS / JSON 坐标清单
+  responsive  生成多种宽度和格式的响应式衍生图及 srcset 清单
+  lqip      计算占位信息（宽高、主色、BlurHash、内联预览图）
+  dedup     检测重复图片，--fix 用新的种子重新下载冲突的图片
+  bench     基准测试，--compare 与历史结果对比
+plan / fetch / generate / render 默认只处理源码中引用了的图片（引用多的优先），--all 处理清单中的全部图片
+plan / status / verify / refs 只读取清单、构建状态、文件头和源码，不会导入 requests、Pillow、NumPy
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from . import IMAGES_DIR, bench, providers, trace
+from .cache import cache_key
+from .manifest import ManifestError, load_manifest, load_settings
+from .planner import MISSING, BuildState, PlanItem, plan
+from .providers import ProviderError
+
+# fetch 的输出归 "download" 所有（与原 download-placeholder-images.py 的构建状态兼容）
+FETCH_OWNER = "download"
+DEFAULT_FETCH_CHAIN = ("unsplash", "placeholder", "picsum")
+DEFAULT_FETCH_JOBS = 8
+DEFAULT_VERIFY_JOBS = 8
+
+
+def fetch_recipe(config: dict) -> str:
+    """下载结果只取决于搜索词和尺寸，与具体使用了哪个来源无关"""
+    return cache_key(FETCH_OWNER, "", config["search"], config["width"], config["height"])
+
+
+class Target(NamedTuple):
+    """一个会写入 public/images 的子命令"""
+
+    command: str
+    owner: str
+    recipe: Callable[[dict], str]
+
+
+def targets() -> List[Target]:
+    return [
+        Target("fetch", FETCH_OWNER, fetch_recipe),
+        *(Target(f"generate --provider {name}", name, providers.get(name).recipe)
+          for name in providers.names("generate")),
+        *(Target("render", name, providers.get(name).recipe) for name in providers.names("render")),
+    ]
+
+
+def _banner(title: str) -> None:
+    print("=" * 60)
+    print(title)
+    print("=" * 60)
+
+
+def _reference_counts() -> Dict[str, int]:
+    from .references import reference_counts
+
+    return reference_counts(load_settings("references"))
+
+
+def _by_usage(work: List[PlanItem], counts: Dict[str, int], everything: bool,
+              log: Optional[Callable[[str], None]] = print) -> List[PlanItem]:
+    """按源码中的引用次数从多到少排序；everything 为 False 时去掉没有被引用的图片"""
+    if not everything:
+        skipped = [item.filename for item in work if not counts.get(item.filename)]
+        if skipped and log:
+            log(f"跳过源码中没有引用的 {len(skipped)} 张: {', '.join(skipped)}（--all 处理全部）")
+        work = [item for item in work if counts.get(item.filename)]
+    return sorted(work, key=lambda item: -counts.get(item.filename, 0))
+
+
+# ---------------------------------------------------------------- plan / status
+
+
+def cmd_plan(args) -> int:
+    state = BuildState()
+    selected = [t for t in targets() if not args.target or t.owner in args.target or t.command in args.target]
+    counts = _reference_counts()
+    report = {}
+    for target in selected:
+        work = plan(load_manifest(target.owner), target.owner, target.recipe, IMAGES_DIR, state)
+        work = _by_usage(work, counts, args.all, log=None)
+        report[target.command] = [
+            {"file": item.filename, "reason": item.reason,
+             "width": item.config["width"], "height": item.config["height"]}
+            for item in work
+        ]
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for command, items in report.items():
+            print(f"assets {command}: {'需要处理 ' + str(len(items)) + ' 张' if items else '已是最新'}")
+            for item in items:
+                reason = "缺失" if item["reason"] == MISSING else "配方变化"
+                print(f"  {reason:<4} {item['file']} ({item['width']}x{item['height']})")
+    return 1 if args.check and any(report.values()) else 0
+
+
+def asset_status(state: BuildState, known: Dict[str, Target]) -> List[dict]:
+    """清单中每张图片的状态；只读，不写回构建状态"""
+    rows = []
+    for filename, config in load_manifest().items():
+        path = IMAGES_DIR / filename
+        row = {"file": filename, "width": config["width"], "height": config["height"],
+               "owner": None, "provider": None, "bytes": None}
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            rows.append({**row, "status": "missing"})
+            continue
+        row["bytes"] = st.st_size
+        entry = state.refresh(filename, path, st)
+        if entry is None:
+            rows.append({**row, "status": "untracked"})
+            continue
+        row.update(owner=entry.get("owner"), provider=entry.get("provider"))
+        target = known.get(entry.get("owner") or "")
+        if entry.get("owner") is None:
+            status = "adopted"
+        elif target and entry.get("recipe") != target.recipe(load_manifest(target.owner)[filename]):
+            status = "stale"
+        else:
+            status = "ok"
+        rows.append({**row, "status": status})
+    return rows
+
+
+STATUS_LABELS = {
+    "ok": "✓ 最新",
+    "stale": "↻ 配方变化",
+    "missing": "✗ 缺失",
+    "adopted": "· 手动管理",
+    "untracked": "· 未登记",
+}
+
+
+def cmd_status(args) -> int:
+    known = {t.owner: t for t in targets()}
+    rows = asset_status(BuildState(), known)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        for row in rows:
+            size = f"{row['bytes'] / 1024:.0f}KB" if row["bytes"] is not None else "-"
+            source = row["provider"] or "-"
+            print(f"{STATUS_LABELS[row['status']]:<8}  {row['file']:<28} {row['width']}x{row['height']:<6} {size:>7}  {source}")
+        counts: Dict[str, int] = {}
+        for row in rows:
+            counts[row["status"]] = counts.get(row["status"], 0) + 1
+        print(f"\n共 {len(rows)} 张: " + "，".join(
+            f"{STATUS_LABELS[s].split(' ', 1)[1]} {n}" for s, n in counts.items()))
+    return 1 if args.check and any(row["status"] in ("missing", "stale") for row in rows) else 0
+
+
+def cmd_verify(args) -> int:
+    import time
+
+    from .verify import QUARANTINE_DIR, quarantine, verify_images
+
+    started = time.perf_counter()
+    commands = {t.owner: t.command for t in targets()}
+    state = BuildState()
+    checked = 0
+    bad = []
+    for filename, problem in verify_images(load_manifest(), IMAGES_DIR, jobs=args.jobs):
+        checked += 1
+        if problem is None:
+            continue
+        bad.append(filename)
+        print(f"✗ {filename}: {problem}")
+        if args.dry_run:
+            continue
+        # 无主文件原本就是由下载脚本放进来的，交给 fetch 重新获取
+        owner = (state.entries.get(filename) or {}).get("owner")
+        quarantine(IMAGES_DIR / filename)
+        state.forget(filename)
+        print(f"  已隔离，运行 assets {commands.get(owner, 'fetch')} 重新获取")
+    state.save()
+    elapsed = time.perf_counter() - started
+
+    print(f"\n校验了 {checked} 张图片，用时 {elapsed * 1000:.0f}ms" +
+          (f"，{len(bad)} 张有问题" if bad else "，全部正常"))
+    if bad and not args.dry_run:
+        print(f"有问题的文件已移到 {QUARANTINE_DIR}")
+    return 1 if bad else 0
+
+
+def cmd_refs(args) -> int:
+    import time
+
+    from .references import ReferenceIndex
+    from .verify import EXPECTED_FORMATS
+
+    started = time.perf_counter()
+    index = ReferenceIndex(settings=load_settings("references"))
+    total, parsed = index.update()
+    index.save()
+    usage = index.usage()
+    elapsed = time.perf_counter() - started
+
+    manifest = load_manifest()
+    on_disk = {p.name for p in IMAGES_DIR.iterdir() if p.is_file() and p.suffix.lower() in EXPECTED_FORMATS}
+    # 子目录中的构建产物（图集、指纹副本）按路径判断
+    present = {image for image in usage if image in on_disk or (IMAGES_DIR / image).is_file()}
+    # 被引用、但既不存在也不在清单里（流水线不知道怎么构建）的图片
+    missing = {image: places for image, places in usage.items() if image not in manifest and image not in present}
+    orphans = sorted(name for name in set(manifest) | on_disk if name not in usage)
+
+    if args.json:
+        print(json.dumps({"references": usage, "missing": sorted(missing), "orphans": orphans},
+                         ensure_ascii=False, indent=2))
+    else:
+        print(f"扫描了 {total} 个源文件（重新解析 {parsed} 个），用时 {elapsed * 1000:.0f}ms\n")
+        print("被引用的图片（按引用次数）:")
+        for image, places in usage.items():
+            if image in missing:
+                mark = "✗ 缺失"
+            elif image not in present:
+                mark = "↻ 待构建"
+            else:
+                mark = "✓"
+            print(f"  {len(places):>4}  {image:<28} {mark}")
+        for image, places in missing.items():
+            print(f"\n✗ {image} 被引用但不存在，清单中也没有:")
+            for place in places:
+                print(f"    {place}")
+        if orphans:
+            print("\n没有被引用的图片: " + ", ".join(orphans))
+
+    if args.prune:
+        candidates = [IMAGES_DIR / name for name in orphans if (IMAGES_DIR / name).exists()]
+        total_size = sum(path.stat().st_size for path in candidates)
+        if not args.yes:
+            # 动态拼接的路径扫描不到，删除前先让人确认候选列表
+            print(f"\n以下 {len(candidates)} 个文件没有被引用，共 {_kb(total_size)}（未删除）:")
+            for path in candidates:
+                print(f"  {path.name}")
+            if candidates:
+                print("确认没有动态引用后，加 --yes 删除")
+        else:
+            state = BuildState()
+            for path in candidates:
+                path.unlink()
+                # generate-images.mjs 为占位图写的说明文件
+                path.with_suffix(".txt").unlink(missing_ok=True)
+                state.forget(path.name)
+                print(f"✓ 已删除: {path.name}")
+            state.save()
+            print(f"共释放 {_kb(total_size)}；清单中的条目保留，需要时用 --all 重新构建")
+    return 1 if args.check and missing else 0
+
+
+# ---------------------------------------------------------------- fetch / generate / render
+
+
+def _fetch_one(chain: List[providers.FetchProvider], item: PlanItem,
+               policy=None) -> Tuple[Optional[str], List[str]]:
+    """下载一张图片，返回实际提供图片的来源和日志行；policy 为 None 时不对冲，按顺序逐个尝试"""
+    from .hedge import fetch_hedged
+
+    lines: List[str] = []
+    lines.append(f"正在下载: {item.filename}...")
+    if policy is not None:
+        name = fetch_hedged(chain, item.filename, item.config, IMAGES_DIR / item.filename, policy, log=lines.append)
+        if name:
+            lines.append(f"✓ 已保存: {item.filename} ({item.config['width']}x{item.config['height']}，"
+                         f"来源 {providers.get(name).title})")
+        return name, lines
+    for i, provider in enumerate(chain):
+        if i:
+            lines.append(f"  尝试备用来源: {provider.title}...")
+        if provider.fetch(item.filename, item.config, IMAGES_DIR / item.filename, log=lines.append):
+            return provider.name, lines
+    return None, lines
+
+
+def cmd_fetch(args) -> int:
+    from .fetch import run_ordered
+    from .hedge import HedgePolicy, LatencyStats
+
+    chain = [providers.get(name, "fetch") for name in args.providers]
+    for provider in chain:
+        provider.check()
+
+    _banner("从网络下载占位图片")
+    print(f"来源: {' → '.join(p.title for p in chain)}")
+    stats = LatencyStats()
+    policy = None
+    if not args.no_hedge and len(chain) > 1:
+        policy = HedgePolicy(stats, load_settings("fetch"), fixed=args.hedge_after)
+        # 最后一个来源之后没有可以对冲的来源
+        print("对冲阈值: " + "，".join(f"{p.title} {policy.describe(p.name)}" for p in chain[:-1]))
+    print()
+
+    # 只下载缺失或配方变化的图片
+    assets = load_manifest(FETCH_OWNER)
+    state = BuildState()
+    work = plan(assets, FETCH_OWNER, fetch_recipe, IMAGES_DIR, state)
+    print(f"✓ 已是最新: {len(assets) - len(work)} 张")
+    work = _by_usage(work, _reference_counts(), args.all)
+    print()
+
+    downloaded = 0
+    failed = []
+    # 并发下载，按清单顺序输出每张图片的日志
+    for item, (provider, lines) in run_ordered(work, lambda item: _fetch_one(chain, item, policy),
+                                               concurrency=args.jobs):
+        for line in lines:
+            print(line)
+        if provider:
+            state.record(item.filename, FETCH_OWNER, item.recipe, IMAGES_DIR / item.filename, provider=provider)
+            state.save()
+            downloaded += 1
+        else:
+            failed.append(item.filename)
+        print()  # 空行分隔
+    if policy is not None:
+        stats.save()
+
+    print("=" * 60)
+    print(f"完成！成功下载了 {downloaded}/{len(work)} 张图片")
+    if failed:
+        print(f"\n以下图片下载失败: {', '.join(failed)}")
+        print("可以稍后重试、换用其他来源（--providers）或手动替换")
+        return 1
+    return 0
+
+
+def _verify_image(path: Path) -> None:
+    """完整解码一次，截断或损坏的图片会抛出异常"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.load()
+
+
+def cmd_generate(args) -> int:
+    from .cache import AssetCache
+
+    provider = providers.get(args.provider, "generate")
+    _banner(f"使用 {provider.title} 生成图片")
+    provider.check()
+
+    # 只生成缺失或提示词/尺寸变化的图片，缓存命中的直接恢复
+    state = BuildState()
+    with AssetCache() as cache:
+        return _generate(args, provider, state, cache)
+
+
+def _generate(args, provider, state: BuildState, cache) -> int:
+    import tempfile
+
+    from .cache import CACHE_DIR
+    from .journal import FAILED, PLANNED, VERIFIED, RunJournal
+    from .masters import derive, group_masters
+    from .planner import restore_cached
+
+    work = plan(load_manifest(provider.name), provider.name, provider.recipe, IMAGES_DIR, state)
+    work = _by_usage(work, _reference_counts(), args.all)
+    to_generate = restore_cached(work, cache, state, provider.name, IMAGES_DIR)
+    if not to_generate:
+        print("\n所有图片已是最新！")
+        return 0
+
+    # 每个提示词只按受支持的尺寸生成一次母版，清单中的尺寸在本地裁切缩放得到
+    masters = group_masters(to_generate, provider)
+    # 派生前新生成的母版写入缓存可能触发淘汰，已在缓存中的母版要保留到派生完成
+    cache.pin(m.item.recipe for m in masters)
+    missing = [m for m in masters if cache.get(m.item.recipe) is None]
+    print(f"\n需要生成 {len(to_generate)} 张图片（{len(masters)} 个母版，"
+          f"{len(masters) - len(missing)} 个已在缓存中，{len(missing)} 个需要调用 API）\n")
+
+    errors: Dict[str, str] = {}
+    if missing:
+        # 运行日志记录每个远端任务的进度，上次中断时未完成的任务会被接管而不是重新提交
+        journal = RunJournal()
+        resumable = {entry["key"] for entry in journal.unfinished(provider.name) if entry["state"] != PLANNED}
+        resumed = sum(1 for m in missing if m.item.recipe in resumable)
+        if resumed:
+            print(f"继续上次中断的 {resumed} 个生成任务\n")
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix="masters-", dir=CACHE_DIR) as tmp:
+            for master_item, error in provider.generate([m.item for m in missing], Path(tmp), journal=journal):
+                if error:
+                    errors[master_item.recipe] = error
+                    continue
+                config = master_item.config
+                path = Path(tmp) / master_item.filename
+                try:
+                    _verify_image(path)
+                except Exception as e:
+                    errors[master_item.recipe] = f"图片无法解码: {e}"
+                    journal.mark(master_item.recipe, FAILED, error=errors[master_item.recipe])
+                    continue
+                cache.put(master_item.recipe, path,
+                          {"provider": provider.name, "prompt": config["prompt"],
+                           "width": config["width"], "height": config["height"], "master": True})
+                journal.mark(master_item.recipe, VERIFIED)
+            for m in missing:
+                if m.item.recipe not in errors and cache.get(m.item.recipe) is None:
+                    errors[m.item.recipe] = "生成结果不在缓存中"
+        journal.close()
+
+    generated = 0
+    for master in masters:
+        error = errors.get(master.item.recipe)
+        for item in master.derived:
+            if error:
+                print(f"✗ 生成失败 {item.filename}: {error}")
+                continue
+            output_path = IMAGES_DIR / item.filename
+            try:
+                derive(cache.get(master.item.recipe), output_path, item.config["width"], item.config["height"])
+            except Exception as e:
+                print(f"✗ 裁切缩放失败 {item.filename}: {e}")
+                continue
+            state.record(item.filename, provider.name, item.recipe, output_path)
+            generated += 1
+            print(f"✓ 已派生: {item.filename} ({item.config['width']}x{item.config['height']}，"
+                  f"母版 {master.item.config['width']}x{master.item.config['height']})")
+    state.save()
+
+    print("\n" + "=" * 60)
+    print(f"完成！成功生成了 {generated}/{len(to_generate)} 张图片")
+    return 0 if generated == len(to_generate) else 1
+
+
+def cmd_render(args) -> int:
+    provider = providers.get(args.provider, "render")
+    provider.check()
+    from .fonts import describe
+
+    print("生成占位图片...")
+    print("=" * 60)
+    print(describe())
+
+    # 只生成缺失或配方变化的图片
+    state = BuildState()
+    assets = load_manifest(provider.name)
+    work = plan(assets, provider.name, provider.recipe, IMAGES_DIR, state)
+    print(f"✓ 已是最新: {len(assets) - len(work)} 张")
+    work = _by_usage(work, _reference_counts(), args.all)
+
+    generated = 0
+    failed = 0
+    for item, error in provider.render(work, IMAGES_DIR, jobs=args.jobs):
+        if error:
+            print(f"✗ 生成失败 {item.filename}: {error}")
+            failed += 1
+            continue
+        print(f"✓ 已生成: {item.filename} ({item.config['width']}x{item.config['height']})")
+        state.record(item.filename, provider.name, item.recipe, IMAGES_DIR / item.filename)
+        generated += 1
+    state.save()
+
+    print("\n" + "=" * 60)
+    print(f"完成！生成了 {generated} 张占位图片")
+    print("\n注意：这些是简单的占位图片")
+    print("如需高质量图片，请使用 assets generate 或参考 IMAGE_GENERATION_PROMPTS.md")
+    return 1 if failed else 0
+
+
+def _kb(size: int) -> str:
+    return f"{size / 1024:.1f}KB"
+
+
+def cmd_optimize(args) -> int:
+    try:
+        from .optimize import DEFAULT_SETTINGS, optimize_images
+    except ImportError:
+        raise ProviderError("请先安装 Pillow 和 NumPy 库\n运行: pip install pillow numpy") from None
+
+    settings = {**DEFAULT_SETTINGS, **load_settings("optimize")}
+    if args.ssim:
+        settings["ssim"] = args.ssim
+
+    print("优化图片体积...")
+    print("=" * 60)
+    print(f"SSIM 阈值: {settings['ssim']}\n")
+
+    # 改写后同步构建状态，避免被误认为手动替换过的文件
+    state = BuildState()
+
+    saved = 0
+    over_budget = []
+    failed = []
+    for result in optimize_images(load_manifest(), IMAGES_DIR, settings, dry_run=args.dry_run,
+                                  on_write=state.update_content):
+        if result.status == "failed":
+            print(f"✗ 优化失败 {result.filename}: {result.error}")
+            failed.append(result.filename)
+            continue
+        if result.status == "optimized":
+            saved += result.before - result.after
+            percent = (result.before - result.after) * 100 / result.before
+            print(f"✓ 已优化: {result.filename} {_kb(result.before)} → {_kb(result.after)} "
+                  f"(-{percent:.0f}%, 质量 {result.quality}, SSIM {result.ssim:.4f})")
+        if result.over_budget:
+            print(f"✗ 超出预算: {result.filename} {_kb(result.after)} > {_kb(result.budget)}")
+            over_budget.append(result.filename)
+    state.save()
+
+    print("\n" + "=" * 60)
+    print(f"完成！共节省 {_kb(saved)}")
+
+    if over_budget:
+        print(f"\n以下图片超出体积预算: {', '.join(over_budget)}")
+        print("可以在 scripts/assets.json 中为该图片设置更大的 max_bytes，或换一张更简单的图片")
+    return 1 if over_budget or failed else 0
+
+
+def cmd_responsive(args) -> int:
+    try:
+        from .derivatives import DEFAULT_SETTINGS, OUTPUT_DIRNAME, SRCSET_MANIFEST_NAME, available_formats, \
+            build_derivatives
+    except ImportError:
+        raise ProviderError("请先安装 Pillow 库\n运行: pip install pillow") from None
+
+    settings = {**DEFAULT_SETTINGS, **load_settings("responsive")}
+    if args.widths:
+        settings["widths"] = args.widths
+    if args.formats:
+        settings["formats"] = args.formats
+
+    print("生成响应式衍生图...")
+    print("=" * 60)
+
+    unsupported = set(settings["formats"]) - set(available_formats(settings["formats"]))
+    if unsupported:
+        print(f"⚠️  当前 Pillow 不支持编码 {', '.join(sorted(unsupported))}，已跳过")
+    print(f"宽度: {', '.join(str(w) for w in settings['widths'])}")
+    print(f"格式: {', '.join(available_formats(settings['formats']))}\n")
+
+    counts = {"built": 0, "fresh": 0, "failed": 0, "removed": 0}
+    for name, status, error in build_derivatives(IMAGES_DIR, settings=settings, processes=args.jobs, force=args.force):
+        counts[status] += 1
+        if status == "built":
+            print(f"✓ 已生成: {name}")
+        elif status == "failed":
+            print(f"✗ 生成失败 {name}: {error}")
+        elif status == "removed":
+            print(f"✓ 已清理: {name} 的衍生图（原图已删除）")
+
+    print("\n" + "=" * 60)
+    print(f"完成！生成 {counts['built']} 张，已是最新 {counts['fresh']} 张，失败 {counts['failed']} 张")
+    print(f"srcset 清单: public/images/{OUTPUT_DIRNAME}/{SRCSET_MANIFEST_NAME}")
+    return 1 if counts["failed"] else 0
+
+
+def cmd_lqip(args) -> int:
+    try:
+        from .lqip import MANIFEST_NAME, build_lqip
+    except ImportError:
+        raise ProviderError("请先安装 Pillow 和 NumPy 库\n运行: pip install pillow numpy") from None
+
+    print("生成图片占位信息...")
+    print("=" * 60)
+
+    counts = {"built": 0, "fresh": 0, "failed": 0, "removed": 0}
+    for name, status, error in build_lqip(IMAGES_DIR, force=args.force):
+        counts[status] += 1
+        if status == "built":
+            print(f"✓ 已生成: {name}")
+        elif status == "failed":
+            print(f"✗ 生成失败 {name}: {error}")
+        elif status == "removed":
+            print(f"✓ 已移除: {name}（原图已删除）")
+
+    print("\n" + "=" * 60)
+    print(f"完成！生成 {counts['built']} 张，已是最新 {counts['fresh']} 张，失败 {counts['failed']} 张")
+    print(f"占位信息: public/images/{MANIFEST_NAME}")
+    return 1 if counts["failed"] else 0
+
+
+# 每张冲突图片最多换几次种子
+MAX_REFETCH_ATTEMPTS = 3
+
+
+def _find_duplicates(index, root: Path, recursive: bool, threshold: int):
+    from .dedup import IMAGE_SUFFIXES
+
+    pattern = "**/*" if recursive else "*"
+    images = sorted(p for p in root.glob(pattern) if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+    keys = index.update(root, images)
+    index.save()
+    # 索引以绝对路径为键，输出和 --fix 使用相对 root 的路径
+    base = root.resolve()
+    groups = index.find_duplicates(keys, threshold)
+    for group in groups:
+        group["files"] = [Path(key).relative_to(base).as_posix() for key in group["files"]]
+    return keys, groups
+
+
+def cmd_dedup(args) -> int:
+    try:
+        from .dedup import DEFAULT_THRESHOLD, DedupIndex
+    except ImportError:
+        raise ProviderError("请先安装 Pillow 和 NumPy 库\n运行: pip install pillow numpy") from None
+
+    # --fix 按文件名覆盖 public/images 中的清单图片，扫描其他目录时文件名对不上
+    if args.fix and args.path.resolve() != IMAGES_DIR.resolve():
+        print(f"\n错误: --fix 只能用于 {IMAGES_DIR.relative_to(IMAGES_DIR.parents[1])}，不能用于 {args.path}")
+        return 1
+
+    print("检测重复图片...")
+    print("=" * 60)
+
+    threshold = DEFAULT_THRESHOLD if args.threshold is None else args.threshold
+    index = DedupIndex()
+    keys, groups = _find_duplicates(index, args.path, args.recursive, threshold)
+    print(f"已检查 {len(keys)} 张图片\n")
+
+    if args.fix and groups:
+        assets = load_manifest()
+        state = BuildState()
+        picsum = providers.get("picsum")
+        # 只替换从在线图库下载的图片；AI 生成、本地渲染和手动放入的图片换成随机照片会丢失内容
+        downloaded = set(providers.names("fetch"))
+        for attempt in range(1, MAX_REFETCH_ATTEMPTS + 1):
+            # 每组保留第一张，其余可以重新下载的图片用新的种子重新下载
+            duplicates = [name for group in groups for name in group["files"][1:]]
+            targets = [
+                name for name in duplicates
+                if name in assets and state.entries.get(name, {}).get("provider") in downloaded
+            ]
+            if attempt == 1:
+                for name in duplicates:
+                    if name not in targets:
+                        print(f"  跳过 {name}: 不是从在线图库下载的清单图片，需要手动处理")
+            if not targets:
+                break
+            print(f"第 {attempt} 轮重新下载 {len(targets)} 张冲突图片")
+            for name in targets:
+                path = IMAGES_DIR / name
+                if picsum.fetch(name, assets[name], path, log=lambda line: print(f"  {line}"), attempt=attempt):
+                    state.update_content(name, path)
+                    state.entries[name]["provider"] = "picsum"
+            state.save()
+            keys, groups = _find_duplicates(index, args.path, args.recursive, threshold)
+        print()
+
+    for group in groups:
+        if group["kind"] == "identical":
+            print(f"✗ 完全相同: {', '.join(group['files'])}")
+        else:
+            print(f"✗ 近似重复 (距离 {group['distance']}): {', '.join(group['files'])}")
+
+    print("\n" + "=" * 60)
+    if groups:
+        print(f"发现 {len(groups)} 组重复图片")
+        if not args.fix:
+            print("可以运行 --fix 重新下载从在线图库下载的冲突图片")
+        return 1
+    print("完成！没有发现重复图片")
+    return 0
+
+
+def cmd_bench(args) -> int:
+    try:
+        import requests  # noqa: F401
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        raise ProviderError("请先安装 Pillow 和 requests 库\n运行: pip install pillow requests") from None
+
+    print("图片流水线基准测试")
+    print("=" * 60)
+
+    suites = []
+    if args.suite in ("micro", "all"):
+        suites.append(bench.bench_render(bench.manifest_sizes(), repeat=args.repeat))
+        suites.append(bench.bench_jpeg(repeat=args.repeat))
+    if args.suite in ("macro", "all"):
+        suites.append(bench.bench_download(latency=args.latency, error_rate=args.error_rate))
+        suites.append(bench.bench_placeholders())
+
+    results = []
+    for suite in suites:
+        for result in suite:
+            results.append(result)
+            print(f"  {result.name:<24} 中位数 {result.median * 1000:9.2f} ms   "
+                  f"最快 {result.min * 1000:9.2f} ms   ±{result.stdev * 1000:.2f}")
+
+    params = {"suite": args.suite, "repeat": args.repeat, "latency": args.latency, "error_rate": args.error_rate}
+    run = bench.make_run(results, params)
+    history = bench.load_history(args.history)
+
+    regressed = []
+    if args.compare:
+        print("\n" + "=" * 60)
+        comparisons = bench.compare(history, run, args.threshold)
+        if not comparisons:
+            print("⚠️  历史中没有可对比的结果，本次结果将作为基线")
+        else:
+            baseline = history[-1]
+            same_params = {k: v for k, v in baseline.get("params", {}).items() if k != "suite"} == \
+                {k: v for k, v in params.items() if k != "suite"}
+            if not same_params or baseline["env"].get("host") != run["env"]["host"]:
+                print("⚠️  基线的参数或机器与本次不同，结果仅供参考")
+            for c in comparisons:
+                mark = "✗" if c.regressed else "✓"
+                print(f"{mark} {c.name:<24} {c.baseline * 1000:9.2f} → {c.current * 1000:9.2f} ms  "
+                      f"({c.change:+.1%}，基线 {c.baseline_commit or '未知提交'})")
+                if c.regressed:
+                    regressed.append(c.name)
+
+    # 退化的结果不写入历史，避免下一次对比时基线被拉低
+    if not args.no_save and not regressed:
+        bench.append_history(run, args.history)
+        print(f"\n✓ 已记录到 {args.history}")
+
+    if regressed:
+        print(f"\n✗ {len(regressed)} 项退化超过 {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+def cmd_previews(args) -> int:
+    try:
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        raise ProviderError("请先安装 Pillow 库\n运行: pip install pillow") from None
+    from .previews import SPOOL_DIR, process_queue
+
+    print("处理模板预览图...")
+    print("=" * 60)
+    print(f"队列目录: {SPOOL_DIR}" + ("（持续监听，Ctrl+C 退出）" if args.watch else "") + "\n")
+
+    processed = 0
+    failed = 0
+    try:
+        for record, error in process_queue(settings=load_settings("previews"), processes=args.jobs,
+                                           watch=args.watch, poll_interval=args.poll):
+            if error:
+                print(f"✗ 处理失败 {record['filename']}: {error}")
+                failed += 1
+                continue
+            variants = sum(len(v) for v in record["sources"].values())
+            print(f"✓ 已处理: {record['filename']} ({record['width']}x{record['height']}，"
+                  f"缩略图 + {variants} 个衍生图)")
+            processed += 1
+    except KeyboardInterrupt:
+        pass
+
+    print("\n" + "=" * 60)
+    print(f"完成！处理了 {processed} 张预览图" + (f"，失败 {failed} 张" if failed else ""))
+    return 1 if failed else 0
+
+
+def cmd_fingerprint(args) -> int:
+    from .fingerprint import DEFAULT_SETTINGS, MAP_PATH, STATE_PATH, build_fingerprints
+
+    settings = {**DEFAULT_SETTINGS, **load_settings("fingerprint")}
+    if args.retention_days is not None:
+        settings["retention_days"] = args.retention_days
+
+    print("生成指纹文件名...")
+    print("=" * 60)
+    if not STATE_PATH.exists():
+        print("提示: 没有上次构建的指纹记录（干净检出的构建），旧版本的指纹文件不在本次输出中，无法保留；"
+              "需要保留时在构建之间持久化 public/images/hashed/ 和 .cache/images/")
+    counts = {"built": 0, "fresh": 0, "expired": 0}
+    for name, status in build_fingerprints(settings=settings):
+        counts[status] += 1
+        if status == "built":
+            print(f"✓ 已生成: {name}")
+        elif status == "expired":
+            print(f"✓ 已删除过期指纹: {name}")
+
+    print("\n" + "=" * 60)
+    print(f"完成！新指纹 {counts['built']} 个，未变化 {counts['fresh']} 个，"
+          f"删除过期指纹 {counts['expired']} 个（保留 {settings['retention_days']:g} 天）")
+    print(f"地址映射: {MAP_PATH.relative_to(MAP_PATH.parents[1])}")
+    return 0
+
+
+def cmd_atlas(args) -> int:
+    try:
+        from .atlas import CSS_NAME, DEFAULT_SETTINGS, MAP_PATH, OUTPUT_DIRNAME, build_atlases
+    except ImportError:
+        raise ProviderError("请先安装 Pillow 库\n运行: pip install pillow") from None
+
+    settings = {**DEFAULT_SETTINGS, **load_settings("atlases")}
+    if not settings["groups"]:
+        print("scripts/assets.json 的 atlases 段中没有配置图集分组")
+        return 0
+
+    print("拼合图集...")
+    print("=" * 60)
+    counts = {"built": 0, "fresh": 0, "failed": 0, "empty": 0, "removed": 0}
+    for group, status, detail in build_atlases(settings=settings, processes=args.jobs, force=args.force):
+        counts[status] += 1
+        if status == "built":
+            print(f"✓ 已生成: {group}（{detail}）")
+        elif status == "failed":
+            print(f"✗ 生成失败 {group}: {detail}")
+        elif status == "empty":
+            print(f"⚠ {group}: {detail}")
+        elif status == "removed":
+            print(f"✓ 已删除: {group}")
+
+    print("\n" + "=" * 60)
+    print(f"完成！生成 {counts['built']} 组，未变化 {counts['fresh']} 组，失败 {counts['failed']} 组")
+    print(f"坐标清单: {MAP_PATH.relative_to(MAP_PATH.parents[1])}、"
+          f"public/images/{OUTPUT_DIRNAME}/{CSS_NAME}")
+    return 1 if counts["failed"] else 0
+
+
+def cmd_serve(args) -> int:
+    try:
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        raise ProviderError("请先安装 Pillow 库\n运行: pip install pillow") from None
+    from .fonts import describe
+    from .serve import serve
+
+    server = serve(args.host, args.port, args.cache_mb)
+    host, port = server.server_address[:2]
+    base = f"http://{host}:{port}"
+    print(f"占位图服务: {base}/1600x900/Hello.jpg（Ctrl+C 退出）")
+    print(describe())
+    print(f"下载占位图: PLACEHOLDER_BASE={base} python3 scripts/assets.py fetch --providers placeholder")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    cache = server.cache
+    print(f"\n缓存命中 {cache.hits} 次，渲染 {cache.misses} 次，缓存占用 {_kb(cache.size)}")
+    return 0
+
+
+# ---------------------------------------------------------------- 入口
+
+
+def _provider_list(value: str) -> List[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="assets", description="图片资源流水线")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="<命令>")
+
+    p = sub.add_parser("plan", help="列出需要下载/生成的图片，不做任何处理")
+    p.add_argument("--target", action="append",
+                   help="只看某个来源（fetch / openai / lovart / local），可重复")
+    p.add_argument("--json", action="store_true", help="输出 JSON")
+    p.add_argument("--check", action="store_true", help="有待处理的图片时以 1 退出（用于 pre-commit）")
+    p.add_argument("--all", action="store_true", help="处理清单中的全部图片，包括源码中没有引用的")
+    p.set_defaults(func=cmd_plan, traced=False)
+
+    p = sub.add_parser("status", help="查看清单中每张图片的状态")
+    p.add_argument("--json", action="store_true", help="输出 JSON")
+    p.add_argument("--check", action="store_true", help="有缺失或配方变化的图片时以 1 退出")
+    p.set_defaults(func=cmd_status, traced=False)
+
+    p = sub.add_parser("verify", help="校验图片格式、尺寸和完整性（只读文件头，可在每次构建时运行）")
+    p.add_argument("--dry-run", action="store_true", help="只报告问题，不隔离文件")
+    p.add_argument("--jobs", "-j", type=int, default=DEFAULT_VERIFY_JOBS,
+                   help=f"并发读取文件头的线程数（默认 {DEFAULT_VERIFY_JOBS}）")
+    p.set_defaults(func=cmd_verify, traced=False)
+
+    p = sub.add_parser("refs", help="源码中引用了哪些图片：引用次数、缺失的图片、没有被引用的图片")
+    p.add_argument("--prune", action="store_true", help="列出 public/images 中没有被引用、可以删除的图片")
+    p.add_argument("--yes", action="store_true", help="与 --prune 一起使用时真正删除这些图片")
+    p.add_argument("--json", action="store_true", help="输出 JSON")
+    p.add_argument("--check", action="store_true", help="有被引用但无法构建的图片时以 1 退出")
+    p.set_defaults(func=cmd_refs, traced=False)
+
+    p = sub.add_parser("fetch", help="从在线图库下载（无需 API 密钥）")
+    p.add_argument("--providers", type=_provider_list, default=list(DEFAULT_FETCH_CHAIN),
+                   help=f"逗号分隔的来源，按顺序作为后备（默认 {','.join(DEFAULT_FETCH_CHAIN)}，"
+                        f"可选 {','.join(providers.names('fetch'))}）")
+    p.add_argument("--jobs", "-j", type=int, default=DEFAULT_FETCH_JOBS,
+                   help=f"同时下载的图片数量（默认 {DEFAULT_FETCH_JOBS}）")
+    p.add_argument("--hedge-after", type=float, metavar="SECONDS",
+                   help="固定的对冲阈值：超过该时间没有首字节就同时请求下一个来源（默认按历史 p95 自动调整）")
+    p.add_argument("--no-hedge", action="store_true", help="不发对冲请求，前一个来源失败后才尝试下一个")
+    p.add_argument("--all", action="store_true", help="处理清单中的全部图片，包括源码中没有引用的")
+    p.set_defaults(func=cmd_fetch, traced=True)
+
+    p = sub.add_parser("generate", help="调用 AI 生成图片")
+    p.add_argument("--provider", required=True, help=f"可选 {', '.join(providers.names('generate'))}")
+    p.add_argument("--all", action="store_true", help="处理清单中的全部图片，包括源码中没有引用的")
+    p.set_defaults(func=cmd_generate, traced=True)
+
+    p = sub.add_parser("render", help="本地渲染彩色占位图")
+    p.add_argument("--provider", default="local", help=argparse.SUPPRESS)
+    p.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                   help="并行渲染的进程数（默认为 CPU 核心数）")
+    p.add_argument("--all", action="store_true", help="处理清单中的全部图片，包括源码中没有引用的")
+    p.set_defaults(func=cmd_render, traced=True)
+
+    p = sub.add_parser("optimize", help="重新压缩图片并检查体积预算")
+    p.add_argument("--ssim", type=float, help="最低 SSIM（默认读取 assets.json）")
+    p.add_argument("--dry-run", action="store_true", help="只报告结果，不改写文件")
+    p.set_defaults(func=cmd_optimize, traced=True)
+
+    p = sub.add_parser("responsive", help="为每张图片生成多种宽度的 AVIF / WebP / JPEG 衍生图和 srcset 清单")
+    p.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                   help="并行处理的进程数（默认为 CPU 核心数）")
+    p.add_argument("--widths", type=lambda s: [int(w) for w in s.split(",")],
+                   help="逗号分隔的目标宽度，例如 320,640,1024（默认读取 assets.json）")
+    p.add_argument("--formats", type=lambda s: s.split(","),
+                   help="逗号分隔的输出格式: avif,webp,jpeg（默认读取 assets.json）")
+    p.add_argument("--force", action="store_true", help="忽略增量状态，全部重新生成")
+    p.set_defaults(func=cmd_responsive, traced=False)
+
+    p = sub.add_parser("lqip", help="计算图片的宽高、主色、BlurHash 和内联预览图，写入 public/images/lqip.json")
+    p.add_argument("--force", action="store_true", help="忽略增量状态，全部重新计算")
+    p.set_defaults(func=cmd_lqip, traced=False)
+
+    p = sub.add_parser("dedup", help="检测字节相同或视觉上几乎相同的图片")
+    p.add_argument("path", nargs="?", type=Path, default=IMAGES_DIR, help="要检查的目录（默认 public/images）")
+    p.add_argument("--recursive", "-r", action="store_true", help="包括子目录")
+    p.add_argument("--threshold", type=int, help="感知哈希汉明距离阈值（默认 8，0-64）")
+    p.add_argument("--fix", action="store_true",
+                   help="用不同种子重新下载冲突的图片（只限 public/images 中从在线图库下载的清单图片）")
+    p.set_defaults(func=cmd_dedup, traced=False)
+
+    p = sub.add_parser("bench", help="运行基准测试，--compare 与历史结果对比")
+    p.add_argument("--suite", choices=["micro", "macro", "all"], default="all", help="运行哪一组基准（默认全部）")
+    p.add_argument("--repeat", type=int, default=bench.DEFAULT_REPEAT,
+                   help=f"每项 micro 基准重复的轮数（默认 {bench.DEFAULT_REPEAT}，macro 固定为 3）")
+    p.add_argument("--latency", type=float, default=bench.DEFAULT_LATENCY,
+                   help=f"假服务器每个请求的延迟秒数（默认 {bench.DEFAULT_LATENCY}）")
+    p.add_argument("--error-rate", type=float, default=bench.DEFAULT_ERROR_RATE,
+                   help=f"假服务器首次请求返回 503 的 URL 比例（默认 {bench.DEFAULT_ERROR_RATE}）")
+    p.add_argument("--compare", action="store_true", help="与历史中最近的结果对比，退化时以 1 退出")
+    p.add_argument("--threshold", type=float, default=bench.DEFAULT_THRESHOLD,
+                   help=f"判定退化的中位数变慢比例（默认 {bench.DEFAULT_THRESHOLD}）")
+    p.add_argument("--history", type=Path, default=bench.HISTORY_PATH, help="历史文件路径")
+    p.add_argument("--no-save", action="store_true", help="不写入历史文件")
+    p.set_defaults(func=cmd_bench, traced=False)
+
+    p = sub.add_parser("previews", help="处理上传接口排入队列的模板预览图")
+    p.add_argument("--watch", action="store_true", help="处理完积压后继续监听新任务")
+    p.add_argument("--poll", type=float, default=1.0, help="监听时检查新任务的间隔秒数（默认 1）")
+    p.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                   help="并行处理的进程数（默认为 CPU 核心数）")
+    p.set_defaults(func=cmd_previews, traced=True)
+
+    p = sub.add_parser("fingerprint", help="生成带内容哈希的图片副本和 lib/image-manifest.json，清理过期的旧指纹")
+    p.add_argument("--retention-days", type=float, help="旧指纹不再被引用后保留的天数（默认读取 assets.json）")
+    p.set_defaults(func=cmd_fingerprint, traced=False)
+
+    p = sub.add_parser("atlas", help="把 assets.json 中配置的小图分组拼合成图集，输出 CSS 和 lib/image-atlases.json")
+    p.add_argument("--force", action="store_true", help="忽略增量状态，重新拼合所有分组")
+    p.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                   help="并行拼合的进程数（默认为 CPU 核心数）")
+    p.set_defaults(func=cmd_atlas, traced=False)
+
+    p = sub.add_parser("serve", help="本地占位图服务（/宽x高/标签.jpg），代替 via.placeholder.com")
+    p.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    p.add_argument("--port", type=int, default=8790, help="端口（默认 8790，0 表示随机端口）")
+    p.add_argument("--cache-mb", type=int, default=64, help="渲染结果缓存的上限（MB，默认 64）")
+    p.set_defaults(func=cmd_serve, traced=False)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        if not args.traced:
+            return args.func(args)
+        with trace.run(f"assets-{args.command}"):
+            return args.func(args)
+    except (ProviderError, ManifestError) as e:
+        print(f"\n错误: {e}")
+        return 1
@@ -0,0 +1,177 @@
+"""
+重复图片检测
+为每张图片计算 SHA-256 和 64 位感知哈希（pHash + dHash），保存在紧凑的磁盘索引中；
+一次扫描同时找出字节完全相同和视觉上几乎相同的图片。
+解码使用 JPEG draft 模式（DCT 域直接缩小），哈希和两两距离都用 NumPy 批量计算
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .cache import CACHE_DIR
+from .planner import file_sha256
+from .storage import atomic_write
+
+INDEX_PATH = CACHE_DIR / "dedup-index.json"
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+
+# pHash 汉明距离不超过该值视为近似重复（64 位中）
+DEFAULT_THRESHOLD = 8
+
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    """(N, 64) 布尔数组 -> (N,) uint64"""
+    return np.packbits(bits.astype(np.uint8), axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def _load_gray(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """解码为 32x32（pHash）和 9x8（dHash）灰度像素"""
+    with Image.open(path) as img:
+        # JPEG 在解码阶段按 1/2、1/4、1/8 缩小，大图只需解码很少的数据
+        img.draft("L", (_DCT_SIZE * 2, _DCT_SIZE * 2))
+        gray = img.convert("L")
+    small = np.asarray(gray.resize((_DCT_SIZE, _DCT_SIZE), Image.BILINEAR), dtype=np.float64)
+    tiny = np.asarray(gray.resize((_HASH_SIZE + 1, _HASH_SIZE), Image.BILINEAR), dtype=np.int16)
+    return small, tiny
+
+
+def compute_hashes(paths: List[Path], workers: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+    """批量计算 (pHash, dHash)，各为 (N,) uint64"""
+    if not paths:
+        return np.zeros(0, np.uint64), np.zeros(0, np.uint64)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pixels = list(pool.map(_load_gray, paths))
+    small = np.stack([p[0] for p in pixels])
+    tiny = np.stack([p[1] for p in pixels])
+
+    # pHash：二维 DCT 取左上 8x8 低频系数（去掉直流分量后按中位数二值化）
+    coeffs = np.einsum("ij,njk,lk->nil", _DCT, small, _DCT)[:, :_HASH_SIZE, :_HASH_SIZE]
+    flat = coeffs.reshape(len(paths), -1)
+    median = np.median(flat[:, 1:], axis=1, keepdims=True)
+    phash = _pack(flat > median)
+
+    # dHash：相邻像素的亮度梯度方向
+    dhash = _pack((tiny[:, :, 1:] > tiny[:, :, :-1]).reshape(len(paths), -1))
+    return phash, dhash
+
+
+def hamming_matrix(hashes: np.ndarray) -> np.ndarray:
+    """所有哈希两两之间的汉明距离 (N, N)"""
+    xor = hashes[:, None] ^ hashes[None, :]
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor).astype(np.int32)
+    return np.unpackbits(xor.view(np.uint8).reshape(*xor.shape, 8), axis=-1).sum(axis=-1)
+
+
+class DedupIndex:
+    """
+    {绝对路径: {size, mtime_ns, sha256, phash, dhash}}，按 mtime/大小增量更新
+    以绝对路径为键，扫描不同目录时各自的条目互不覆盖
+    """
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = Path(path)
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            entries = {}
+        # 旧版本按相对路径保存的条目无法确定属于哪个目录，直接丢弃
+        self.entries: Dict[str, dict] = {k: v for k, v in entries.items() if Path(k).is_absolute()}
+
+    def save(self) -> None:
+        with atomic_write(self.path) as f:
+            f.write(json.dumps(self.entries, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+    def update(self, root: Path, paths: Iterable[Path]) -> List[str]:
+        """刷新 root 下给定文件的索引，返回本次参与比较的键（绝对路径）"""
+        root = root.resolve()
+        keys, stale, stale_keys = [], [], []
+        for path in paths:
+            key = path.resolve().as_posix()
+            keys.append(key)
+            st = path.stat()
+            entry = self.entries.get(key)
+            if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                continue
+            sha256 = file_sha256(path)
+            self.entries[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+            if entry and entry.get("sha256") == sha256 and "phash" in entry:
+                self.entries[key].update(phash=entry["phash"], dhash=entry["dhash"])
+            else:
+                stale.append(path)
+                stale_keys.append(key)
+
+        phash, dhash = compute_hashes(stale)
+        for key, p, d in zip(stale_keys, phash, dhash):
+            self.entries[key].update(phash=f"{int(p):016x}", dhash=f"{int(d):016x}")
+        # 只清理 root 下已删除的文件，其他目录的条目保持不变
+        for key in set(self.entries) - set(keys):
+            path = Path(key)
+            if root in path.parents and not path.exists():
+                del self.entries[key]
+        return keys
+
+    def find_duplicates(self, keys: List[str], threshold: int = DEFAULT_THRESHOLD) -> List[dict]:
+        """
+        返回重复组列表 [{"kind": "identical"|"similar", "files": [...], "distance": n}]
+        先按 SHA-256 分组，再用 pHash/dHash 距离做单链接聚类
+        """
+        groups = []
+        by_sha: Dict[str, List[str]] = {}
+        for key in keys:
+            by_sha.setdefault(self.entries[key]["sha256"], []).append(key)
+        identical = [sorted(files) for files in by_sha.values() if len(files) > 1]
+        groups += [{"kind": "identical", "files": files, "distance": 0} for files in identical]
+
+        # 字节相同的只保留一个代表参与近似比较
+        reps = sorted(files[0] for files in by_sha.values())
+        if len(reps) < 2:
+            return groups
+        phash = np.array([int(self.entries[k]["phash"], 16) for k in reps], dtype=np.uint64)
+        dhash = np.array([int(self.entries[k]["dhash"], 16) for k in reps], dtype=np.uint64)
+        dist = np.maximum(hamming_matrix(phash), hamming_matrix(dhash))
+        close = np.triu(dist <= threshold, k=1)
+
+        # 并查集合并相近的图片
+        parent = list(range(len(reps)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in zip(*np.nonzero(close)):
+            parent[find(i)] = find(j)
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(reps)):
+            clusters.setdefault(find(i), []).append(i)
+        for members in clusters.values():
+            if len(members) > 1:
+                sub = dist[np.ix_(members, members)]
+                groups.append({
+                    "kind": "similar",
+                    "files": sorted(reps[i] for i in members),
+                    "distance": int(sub[np.triu_indices(len(members), k=1)].max()),
+                })
+        return groups
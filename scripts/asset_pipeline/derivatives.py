@@ -0,0 +1,213 @@
+"""
+响应式衍生图
+为 public/images 中的每张原图生成一组宽度（不放大）× 多种格式（AVIF/WebP/渐进式 JPEG），
+使用 Lanczos 缩放；按原图内容哈希和配置增量生成，并输出供前端使用的 srcset 清单
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+from . import IMAGES_DIR
+from .cache import CACHE_DIR
+from .planner import content_hash
+from .storage import atomic_write
+
+OUTPUT_DIRNAME = "responsive"
+SRCSET_MANIFEST_NAME = "manifest.json"
+STATE_PATH = CACHE_DIR / "derivatives-state.json"
+
+# 原图扩展名
+MASTER_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+DEFAULT_SETTINGS = {
+    "widths": [320, 640, 1024, 1600, 1920],
+    "formats": ["avif", "webp", "jpeg"],
+    "quality": {"avif": 55, "webp": 78, "jpeg": 80},
+}
+
+# 编码器速度档位：比最慢档位体积只大 1-3%，编码快 2.5 倍左右
+ENCODER_OPTIONS = {
+    "jpeg": {"progressive": True, "optimize": True},
+    "webp": {"method": 4},
+    "avif": {"speed": 8},
+}
+
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg"}
+
+# 衍生图文件名带上原图扩展名，foo.jpg 和 foo.png 的衍生图不会互相覆盖；
+# 命名方式计入配置哈希，修改后所有衍生图按新名称重新生成，旧文件随之清理
+VARIANT_NAME = "{stem}-{suffix}-{width}w.{ext}"
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def available_formats(formats: List[str]) -> List[str]:
+    """过滤掉当前 Pillow 不支持编码的格式"""
+    return [fmt for fmt in formats if fmt in EXTENSIONS and (fmt == "jpeg" or features.check(fmt))]
+
+
+def settings_hash(settings: dict) -> str:
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def ladder(master_width: int, widths: List[int]) -> List[int]:
+    """不超过原图宽度的目标宽度；原图比最大档窄时补上原图宽度本身"""
+    if master_width > max(widths):
+        return sorted(set(widths))
+    return sorted({w for w in widths if w < master_width}) + [master_width]
+
+
+def _save(img: Image.Image, path: Path, fmt: str, quality: int) -> None:
+    with atomic_write(path) as f:
+        img.save(f, fmt.upper(), quality=quality, **ENCODER_OPTIONS[fmt])
+
+
+def render_variants(master: Path, settings: dict, output_dir: Path) -> Dict:
+    """
+    解码一次原图，生成所有宽度和格式的衍生图
+    返回该原图在 srcset 清单中的条目
+    """
+    with Image.open(master) as src:
+        img = ImageOps.exif_transpose(src)
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    width, height = img.size
+
+    sources: Dict[str, List[dict]] = {fmt: [] for fmt in settings["formats"]}
+    for target_width in ladder(width, settings["widths"]):
+        target_height = max(1, round(height * target_width / width))
+        if target_width == width:
+            resized = img
+        else:
+            # reducing_gap 先用整数倍缩小再做 Lanczos，大幅缩小时更快且质量相同
+            resized = img.resize((target_width, target_height), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in settings["formats"]:
+            out = resized.convert("RGB") if fmt == "jpeg" and resized.mode != "RGB" else resized
+            path = output_dir / VARIANT_NAME.format(stem=master.stem, suffix=master.suffix.lstrip("."),
+                                                    width=target_width, ext=EXTENSIONS[fmt])
+            _save(out, path, fmt, settings["quality"][fmt])
+            sources[fmt].append({
+                "src": "/" + path.relative_to(output_dir.parent.parent).as_posix(),
+                "width": target_width,
+                "height": target_height,
+                "bytes": path.stat().st_size,
+            })
+
+    return {
+        "width": width,
+        "height": height,
+        "sources": sources,
+        "srcset": {
+            fmt: ", ".join(f"{v['src']} {v['width']}w" for v in variants)
+            for fmt, variants in sources.items()
+        },
+        "types": {fmt: MIME_TYPES[fmt] for fmt in sources},
+    }
+
+
+def _render_job(job: Tuple[Path, dict, Path]) -> Tuple[Optional[dict], Optional[str]]:
+    try:
+        return render_variants(*job), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _variant_paths(entry: dict, public_dir: Path) -> List[Path]:
+    return [
+        public_dir / variant["src"].lstrip("/")
+        for variants in entry.get("sources", {}).values()
+        for variant in variants
+    ]
+
+
+def build_derivatives(
+    images_dir: Path = IMAGES_DIR,
+    output_dir: Optional[Path] = None,
+    settings: Optional[dict] = None,
+    processes: Optional[int] = None,
+    force: bool = False,
+) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    增量生成衍生图，逐个产出 (原图文件名, 状态, 错误信息)
+    状态: "built" / "fresh" / "failed" / "removed"
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    settings["formats"] = available_formats(settings["formats"])
+    fingerprint = settings_hash({**settings, "naming": VARIANT_NAME})
+    output_dir = Path(output_dir or images_dir / OUTPUT_DIRNAME)
+    public_dir = output_dir.parent.parent
+    manifest_path = output_dir / SRCSET_MANIFEST_NAME
+    state_path = STATE_PATH
+
+    try:
+        srcset = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        srcset = {}
+    try:
+        state = json.loads(state_path.read_text())
+    except (OSError, ValueError):
+        state = {}
+
+    masters = sorted(p for p in images_dir.iterdir() if p.is_file() and p.suffix.lower() in MASTER_SUFFIXES)
+    jobs = []
+    for master in masters:
+        st = master.stat()
+        previous = state.get(master.name)
+        sha256 = content_hash(master, st, previous)
+        state[master.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256,
+                              "settings": previous.get("settings") if previous else None}
+        entry = srcset.get(master.name)
+        up_to_date = (
+            not force
+            and entry is not None
+            and entry.get("sha256") == sha256
+            and state[master.name]["settings"] == fingerprint
+            and all(p.exists() for p in _variant_paths(entry, public_dir))
+        )
+        if up_to_date:
+            yield master.name, "fresh", None
+        else:
+            jobs.append((master, sha256))
+
+    # 原图已删除的衍生图一并清理
+    names = {m.name for m in masters}
+    for name in sorted(set(srcset) - names):
+        for path in _variant_paths(srcset.pop(name), public_dir):
+            path.unlink(missing_ok=True)
+        state.pop(name, None)
+        yield name, "removed", None
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    processes = min(processes or os.cpu_count() or 1, len(jobs) or 1)
+    tasks = [(master, settings, output_dir) for master, _ in jobs]
+    if processes <= 1:
+        results = map(_render_job, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=processes)
+        results = pool.map(_render_job, tasks)
+
+    try:
+        for (master, sha256), (entry, error) in zip(jobs, results):
+            if error:
+                yield master.name, "failed", error
+                continue
+            # 删除旧配置下生成、这次不再需要的文件
+            old = set(_variant_paths(srcset.get(master.name, {}), public_dir))
+            for path in old - set(_variant_paths(entry, public_dir)):
+                path.unlink(missing_ok=True)
+            entry["sha256"] = sha256
+            srcset[master.name] = entry
+            state[master.name]["settings"] = fingerprint
+            yield master.name, "built", None
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        with atomic_write(manifest_path) as f:
+            f.write(json.dumps(dict(sorted(srcset.items())), ensure_ascii=False, indent=2).encode("utf-8"))
+        with atomic_write(state_path) as f:
+            f.write(json.dumps(state, indent=2, sort_keys=True).encode("utf-8"))
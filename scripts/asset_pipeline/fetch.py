@@ -0,0 +1,73 @@
+"""
+并发下载引擎
+线程池控制总并发，每个主机再用信号量单独限流，结果按提交顺序产出
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 总并发数（同时进行的下载任务数）
+DEFAULT_CONCURRENCY = 8
+
+# 未在 HOST_LIMITS 中列出的主机（例如本地测试服务器）使用的并发上限
+DEFAULT_HOST_LIMIT = 4
+
+# 每个图片来源的并发上限，避免触发对方限流
+HOST_LIMITS: Dict[str, int] = {
+    "source.unsplash.com": 4,
+    "picsum.photos": 4,
+    "via.placeholder.com": 2,
+}
+
+
+class HostLimiter:
+    """按主机名限制同时进行的请求数"""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default: int = DEFAULT_HOST_LIMIT):
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self.default = default
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = threading.Semaphore(self.limits.get(host, self.default))
+                self._semaphores[host] = sem
+            return sem
+
+    @contextmanager
+    def slot(self, url: str):
+        """在 with 块内占用 url 所属主机的一个并发名额"""
+        sem = self._semaphore(urlsplit(url).hostname or "")
+        with sem:
+            yield
+
+
+# 进程内共享的限流器，所有下载函数默认使用它
+host_limiter = HostLimiter()
+
+
+def run_ordered(
+    items: Iterable[T],
+    worker: Callable[[T], R],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Iterator[Tuple[T, R]]:
+    """
+    并发执行 worker(item)，按 items 的原始顺序逐个产出 (item, result)
+    后面的任务先完成时会等待前面的任务，保证输出顺序稳定
+    """
+    items = list(items)
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items)))) as pool:
+        futures = [pool.submit(worker, item) for item in items]
+        for item, future in zip(items, futures):
+            yield item, future.result()
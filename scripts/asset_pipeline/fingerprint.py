@@ -0,0 +1,121 @@
+"""
+内容指纹文件名
+public/images 中的图片以固定的文件名提供（product-ppt.jpg），重新生成后地址不变，
+所以不能设置长期缓存。这里为每张图片生成带内容哈希的副本（public/images/hashed/product-ppt.3fa9c1.jpg），
+并把 {逻辑文件名: 实际地址} 写入 lib/image-manifest.json 供 Next.js 引用；
+hashed/ 下的文件内容永不改变，可以缓存一年（见 next.config.ts）。
+被替换的旧指纹文件在保留期之后删除，仍在使用旧页面的浏览器和 CDN 在此期间不会 404。
+保留只对在同一目录里反复构建的环境有效：hashed/ 不提交，干净检出的 CI 构建里没有旧指纹可以保留，
+需要在构建之间持久化 public/images/hashed/ 和 .cache/images/（保留计时），或由旧的部署继续提供旧地址
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from . import IMAGES_DIR, ROOT_DIR
+from .cache import CACHE_DIR
+from .planner import content_hash
+from .storage import atomic_write
+
+OUTPUT_DIRNAME = "hashed"
+URL_PREFIX = f"/images/{OUTPUT_DIRNAME}"
+MAP_PATH = ROOT_DIR / "lib" / "image-manifest.json"
+STATE_PATH = CACHE_DIR / "fingerprint-state.json"
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif")
+
+# 取 SHA-256 的前几位作为指纹
+FINGERPRINT_LENGTH = 6
+
+DEFAULT_SETTINGS = {
+    "retention_days": 7,  # 旧指纹文件不再被引用之后保留的天数
+}
+
+
+def fingerprinted_name(name: str, sha256: str) -> str:
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}.{sha256[:FINGERPRINT_LENGTH]}{suffix}"
+
+
+def _publish(source: Path, target: Path) -> None:
+    """
+    复制到 target（原子写入）
+    不用硬链接：cp 覆盖原图时会就地改写同一个 inode，已发布的指纹文件内容也会跟着变
+    """
+    with open(source, "rb") as src, atomic_write(target) as f:
+        shutil.copyfileobj(src, f, 1024 * 1024)
+
+
+def build_fingerprints(
+    images_dir: Path = IMAGES_DIR,
+    output_dir: Optional[Path] = None,
+    map_path: Path = MAP_PATH,
+    settings: Optional[dict] = None,
+    now: Optional[float] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    生成指纹副本、更新地址映射并清理过期的旧指纹，逐个产出 (文件名, 状态)
+    状态: "built"（新指纹）/ "fresh"（内容没变）/ "expired"（旧指纹已删除）
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    output_dir = Path(output_dir or images_dir / OUTPUT_DIRNAME)
+    now = time.time() if now is None else now
+    try:
+        state = json.loads(STATE_PATH.read_text())
+    except (OSError, ValueError):
+        state = {}
+    sources: Dict[str, dict] = state.get("sources", {})
+    # {指纹文件名: 不再被引用的时间}
+    superseded: Dict[str, float] = state.get("superseded", {})
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    current: Dict[str, str] = {}
+    for source in sorted(p for p in images_dir.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES):
+        st = source.stat()
+        # 内容没变时直接复用上次的哈希，不重新读取文件
+        sha256 = content_hash(source, st, sources.get(source.name))
+        sources[source.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+        physical = fingerprinted_name(source.name, sha256)
+        current[source.name] = physical
+        if (output_dir / physical).exists():
+            yield physical, "fresh"
+        else:
+            _publish(source, output_dir / physical)
+            yield physical, "built"
+    for name in set(sources) - set(current):
+        del sources[name]
+
+    # 当前没有被引用的指纹文件从第一次发现时开始计时（包括从 git 检出、没有状态记录的文件）
+    live = set(current.values())
+    retention = settings["retention_days"] * 86400
+    for path in sorted(output_dir.iterdir()):
+        if not path.is_file() or path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        if path.name in live:
+            superseded.pop(path.name, None)
+            continue
+        since = superseded.setdefault(path.name, now)
+        if now - since >= retention:
+            path.unlink()
+            del superseded[path.name]
+            yield path.name, "expired"
+    for name in set(superseded) - {p.name for p in output_dir.iterdir()}:
+        del superseded[name]
+
+    mapping = {name: f"{URL_PREFIX}/{physical}" for name, physical in sorted(current.items())}
+    content = json.dumps(mapping, ensure_ascii=False, indent=2) + "\n"
+    try:
+        unchanged = map_path.read_text(encoding="utf-8") == content
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        with atomic_write(map_path) as f:
+            f.write(content.encode("utf-8"))
+
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(STATE_PATH) as f:
+        f.write(json.dumps({"sources": sources, "superseded": superseded}, indent=2).encode())
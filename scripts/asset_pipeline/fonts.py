@@ -0,0 +1,172 @@
+"""
+占位图标签使用的字体
+每个进程只查找一次字体文件（环境变量 → fontconfig 的 fc-match → 扫描各系统的字体目录），
+标签含中日韩文字时改用 CJK 字体；FreeTypeFont 按 (字体文件, 字号) 缓存，
+文字的包围盒按 (文字, 字体) 缓存，批量渲染时不再重复读取字体文件和排版
+都找不到时退回 Pillow 自带的可缩放字体（只有拉丁字母）
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from PIL import ImageFont
+
+# 直接指定字体文件，跳过查找
+FONT_ENV = "ASSET_FONT"
+CJK_FONT_ENV = "ASSET_FONT_CJK"
+
+LATIN = "latin"
+CJK = "cjk"
+
+# 按优先顺序排列的字体文件名（各系统常见的无衬线字体）
+PREFERRED = {
+    LATIN: (
+        "Helvetica.ttc", "HelveticaNeue.ttc", "Arial.ttf", "arial.ttf",
+        "DejaVuSans.ttf", "LiberationSans-Regular.ttf", "NotoSans-Regular.ttf",
+    ),
+    CJK: (
+        "PingFang.ttc", "Hiragino Sans GB.ttc", "STHeiti Medium.ttc", "Songti.ttc",
+        "NotoSansCJK-Regular.ttc", "NotoSansCJKsc-Regular.otf", "NotoSansSC-Regular.otf",
+        "SourceHanSansSC-Regular.otf", "SourceHanSans-Regular.ttc",
+        "wqy-microhei.ttc", "wqy-zenhei.ttc", "msyh.ttc", "simhei.ttf", "DroidSansFallbackFull.ttf",
+    ),
+}
+
+# fc-match 的查询模式
+FC_PATTERNS = {LATIN: "sans-serif", CJK: "sans-serif:lang=zh-cn"}
+
+FONT_SUFFIXES = (".ttf", ".ttc", ".otf")
+
+
+def font_dirs() -> Iterator[Path]:
+    home = Path.home()
+    if sys.platform == "darwin":
+        yield from (Path("/System/Library/Fonts"), Path("/Library/Fonts"), home / "Library" / "Fonts")
+    elif os.name == "nt":
+        yield Path(os.environ.get("WINDIR", "C:\\Windows")) / "Fonts"
+    else:
+        yield from (Path("/usr/share/fonts"), Path("/usr/local/share/fonts"),
+                    home / ".local" / "share" / "fonts", home / ".fonts")
+
+
+def _fc_match(role: str) -> Optional[str]:
+    """用 fontconfig 查找；CJK 查询会校验返回的字体确实支持中文（fc-match 总会返回一个最接近的字体）"""
+    if not shutil.which("fc-match"):
+        return None
+    try:
+        out = subprocess.run(["fc-match", "-f", "%{file}\n%{lang}", FC_PATTERNS[role]],
+                             capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    path, _, langs = out.partition("\n")
+    if not path or not path.endswith(FONT_SUFFIXES):
+        return None
+    if role == CJK and "zh" not in langs:
+        return None
+    return path
+
+
+@lru_cache(maxsize=None)
+def _installed() -> Dict[str, str]:
+    """{字体文件名: 路径}，每个进程只扫描一次字体目录"""
+    found: Dict[str, str] = {}
+    for directory in font_dirs():
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(FONT_SUFFIXES):
+                    found.setdefault(name, os.path.join(root, name))
+    return found
+
+
+def _scan(role: str) -> Optional[str]:
+    installed = _installed()
+    for name in PREFERRED[role]:
+        if name in installed:
+            return installed[name]
+    return None
+
+
+def resolve(role: str) -> Optional[str]:
+    """查找某类字体的文件路径，找不到时返回 None"""
+    path = os.getenv(CJK_FONT_ENV if role == CJK else FONT_ENV)
+    if path and os.path.exists(path):
+        return path
+    return _fc_match(role) or _scan(role)
+
+
+_faces: Optional[Dict[str, Optional[str]]] = None
+
+
+def faces() -> Dict[str, Optional[str]]:
+    """当前进程使用的 {类别: 字体路径}，第一次调用时查找"""
+    global _faces
+    if _faces is None:
+        _faces = {role: resolve(role) for role in (LATIN, CJK)}
+    return _faces
+
+
+def preload(resolved: Dict[str, Optional[str]]) -> None:
+    """把父进程查找到的字体路径交给工作进程，工作进程不用再查找一次"""
+    global _faces
+    _faces = dict(resolved)
+
+
+def needs_cjk(text: str) -> bool:
+    """是否包含中日韩文字（包括全角标点和假名、谚文）"""
+    return any(
+        "\u2e80" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af" or "\uf900" <= ch <= "\ufaff"
+        or "\uff00" <= ch <= "\uffef"
+        for ch in text
+    )
+
+
+@lru_cache(maxsize=None)
+def get_font(path: Optional[str], size: int):
+    """按 (字体文件, 字号) 缓存的 FreeTypeFont；path 为 None 时使用 Pillow 自带字体"""
+    size = max(1, size)
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size)  # Pillow >= 10.1 自带可缩放字体
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def font_for(text: str, size: int):
+    """为这段文字选择字体：含中日韩文字且找到了 CJK 字体时用 CJK 字体，否则用拉丁字体"""
+    available = faces()
+    path = available[CJK] if needs_cjk(text) and available[CJK] else available[LATIN]
+    return get_font(path, size)
+
+
+@lru_cache(maxsize=4096)
+def text_bbox(text: str, font) -> Tuple[int, int, int, int]:
+    """文字在原点处的包围盒 (left, top, right, bottom)；font 来自 get_font，同一对象会被复用"""
+    return tuple(int(v) for v in font.getbbox(text))
+
+
+def fit_font(text: str, size: int, max_width: int):
+    """字号为 size 时文字超出 max_width 就按比例缩小（较长的中文标签），返回 (字体, 包围盒)"""
+    font = font_for(text, size)
+    bbox = text_bbox(text, font)
+    width = bbox[2] - bbox[0]
+    if width > max_width > 0:
+        font = font_for(text, max(1, size * max_width // width))
+        bbox = text_bbox(text, font)
+    return font, bbox
+
+
+def describe() -> str:
+    """输出中显示的字体来源"""
+    available = faces()
+    latin = Path(available[LATIN]).name if available[LATIN] else "Pillow 自带字体"
+    cjk = Path(available[CJK]).name if available[CJK] else f"未找到（中文标签无法显示，可设置 {CJK_FONT_ENV}）"
+    return f"字体: {latin}，中文字体: {cjk}"
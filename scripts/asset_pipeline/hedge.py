@@ -0,0 +1,242 @@
+"""
+对冲下载（hedged requests）
+先向第一个来源发请求；超过该来源首字节耗时的 p95 仍没有收到响应头时，
+再向下一个来源发同样的请求，哪个先下载到有效图片就用哪个，其余的取消。
+每个来源的首字节耗时记录在直方图里并跨运行保存，阈值随实测延迟自动调整
+"""
+
+import json
+import queue
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .cache import CACHE_DIR
+from .storage import atomic_write, commit_file
+from .transport import resumable
+from .verify import check
+
+LATENCY_PATH = CACHE_DIR / "latency.json"
+
+# 首字节耗时直方图的桶上界（秒），最后一个桶之外的样本计入溢出桶
+BUCKETS = (0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0)
+
+DEFAULT_SETTINGS = {
+    "hedge_quantile": 0.95,  # 按该分位数决定何时发出对冲请求
+    "hedge_default": 2.0,    # 样本不足时使用的阈值（秒）
+    "hedge_min": 0.2,        # 阈值下限，避免本来就很快的来源被频繁对冲
+    "hedge_max": 10.0,       # 阈值上限
+    "min_samples": 20,       # 样本数达到该值后才按直方图计算阈值
+}
+
+# 每个来源最多保留的样本数；超过后所有桶减半，让旧数据逐渐失去权重
+MAX_SAMPLES = 1000
+
+Log = Callable[[str], None]
+
+
+class LatencyStats:
+    """各来源首字节耗时的直方图，线程安全"""
+
+    def __init__(self, path: Path = LATENCY_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, List[float]] = {}
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        # 桶的划分变了之后旧数据无法换算，直接丢弃
+        if data.get("buckets") == list(BUCKETS):
+            self.counts = {name: list(counts) for name, counts in data.get("providers", {}).items()
+                           if len(counts) == len(BUCKETS) + 1}
+
+    def observe(self, provider: str, seconds: float) -> None:
+        with self._lock:
+            counts = self.counts.setdefault(provider, [0.0] * (len(BUCKETS) + 1))
+            counts[bisect_left(BUCKETS, seconds)] += 1
+            if sum(counts) > MAX_SAMPLES:
+                counts[:] = [c / 2 for c in counts]
+
+    def samples(self, provider: str) -> int:
+        with self._lock:
+            return round(sum(self.counts.get(provider, ())))
+
+    def quantile(self, provider: str, q: float) -> Optional[float]:
+        """估计分位数（取所在桶的上界），没有样本时返回 None；落在溢出桶时返回最大桶上界"""
+        with self._lock:
+            counts = self.counts.get(provider)
+            total = sum(counts) if counts else 0
+            if not total:
+                return None
+            cumulative = 0.0
+            for bound, count in zip(BUCKETS, counts):
+                cumulative += count
+                if cumulative >= q * total:
+                    return bound
+            return BUCKETS[-1]
+
+    def save(self) -> None:
+        with self._lock:
+            data = {"buckets": list(BUCKETS), "providers": self.counts}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(self.path) as f:
+                f.write(json.dumps(data, indent=2).encode())
+
+
+class HedgePolicy:
+    """决定每个来源等待多久没有首字节就发出对冲请求；fixed 不为 None 时所有来源使用固定阈值"""
+
+    def __init__(self, stats: LatencyStats, settings: Optional[dict] = None, fixed: Optional[float] = None):
+        self.stats = stats
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.fixed = fixed
+
+    def delay(self, provider: str) -> float:
+        if self.fixed is not None:
+            return self.fixed
+        s = self.settings
+        if self.stats.samples(provider) < s["min_samples"]:
+            return s["hedge_default"]
+        value = self.stats.quantile(provider, s["hedge_quantile"])
+        return min(max(value, s["hedge_min"]), s["hedge_max"])
+
+    def describe(self, provider: str) -> str:
+        """输出中显示的阈值来源"""
+        delay = self.delay(provider)
+        if self.fixed is not None:
+            return f"{delay:g}s"
+        n = self.stats.samples(provider)
+        if n < self.settings["min_samples"]:
+            return f"{delay:g}s（默认，已有 {n} 个样本）"
+        return f"{delay:g}s（p{self.settings['hedge_quantile'] * 100:g}，{n} 个样本）"
+
+
+def _staging_path(dest: Path, provider: str) -> Path:
+    """每个来源先下载到自己的临时文件（以 .part 结尾，不会被提交到 git）"""
+    return dest.with_name(f"{dest.name}.{provider}.part")
+
+
+def _discard(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _discard_staging(path: Path) -> None:
+    """删除临时文件以及 transport 用于续传的 .part / .part.json"""
+    for p in (path, path.with_name(path.name + ".part"), path.with_name(path.name + ".part.json")):
+        _discard(p)
+
+
+class _Attempt:
+    __slots__ = ("provider", "staging", "started", "first_byte")
+
+    def __init__(self, provider, staging: Path):
+        self.provider = provider
+        self.staging = staging
+        self.started = time.perf_counter()
+        self.first_byte = threading.Event()
+
+
+def fetch_hedged(chain: Sequence, filename: str, config: dict, dest: Path,
+                 policy: HedgePolicy, log: Log = print) -> Optional[str]:
+    """
+    按 chain 的顺序下载一张图片，返回实际提供图片的来源名称，全部失败时返回 None
+    - 当前最后一个发出的请求超过对冲阈值仍没有首字节时，向下一个来源发出对冲请求
+    - 某个请求失败时立即尝试下一个来源
+    - 第一个下载到有效图片的请求胜出，其余请求通过 cancel 事件取消，所有来源的临时文件删除
+    - 有来源留下了可续传的 .part 文件（上次运行中断或下载被截断）时，先从这些来源续传，
+      其余来源保持原有顺序
+    请求失败时保留 .part 文件，下次运行从断点续传；内容校验失败的文件直接删除。
+    被取消的请求在收到响应头或下一个数据块时才会退出，所以不等待它们结束
+    """
+    # 续传只需要请求剩余的字节，通常比从头下载的对冲请求更快完成
+    chain = sorted(chain, key=lambda p: not resumable(_staging_path(dest, p.name)))
+    cancel = threading.Event()
+    results: "queue.Queue[Tuple[_Attempt, Optional[str]]]" = queue.Queue()
+    lock = threading.Lock()
+    finished = False  # 已经决出胜者（或全部失败），之后完成的请求自行清理临时文件
+    attempts: List[_Attempt] = []
+
+    def report(attempt: _Attempt, error: Optional[str]) -> None:
+        with lock:
+            if finished:
+                _discard_staging(attempt.staging)
+            else:
+                results.put((attempt, error))
+
+    def run(attempt: _Attempt) -> None:
+        provider = attempt.provider
+
+        def on_headers(elapsed: float):
+            if not attempt.first_byte.is_set():
+                policy.stats.observe(provider.name, elapsed)
+                attempt.first_byte.set()
+
+        try:
+            response = provider.download(filename, config, attempt.staging, cancel=cancel, on_headers=on_headers)
+        except Exception as e:
+            report(attempt, str(e))
+            return
+        if not response.ok:
+            report(attempt, f"HTTP {response.status_code}")
+        else:
+            # 错误页面、格式或尺寸不符、被截断的内容都算失败，交给下一个来源
+            report(attempt, check(attempt.staging, config, dest.name))
+
+    def launch() -> None:
+        provider = chain[len(attempts)]
+        staging = _staging_path(dest, provider.name)
+        # 上次运行留下的完整临时文件没有经过校验，丢弃；.part 文件留给 transport 续传
+        _discard(staging)
+        attempt = _Attempt(provider, staging)
+        attempts.append(attempt)
+        threading.Thread(target=run, args=(attempt,), daemon=True, name=f"hedge-{provider.name}").start()
+
+    launch()
+    running = 1
+    winner: Optional[_Attempt] = None
+    while running:
+        last = attempts[-1]
+        timeout = None
+        if len(attempts) < len(chain) and not last.first_byte.is_set():
+            timeout = max(0.0, last.started + policy.delay(last.provider.name) - time.perf_counter())
+        try:
+            attempt, error = results.get(timeout=timeout)
+        except queue.Empty:
+            if not last.first_byte.is_set():
+                log(f"  {last.provider.title} {policy.delay(last.provider.name):g}s 内无响应，"
+                    f"同时请求 {chain[len(attempts)].title}...")
+                launch()
+                running += 1
+            continue
+        running -= 1
+        if error is None:
+            winner = attempt
+            break
+        log(f"  ✗ {attempt.provider.title} 失败: {error}")
+        _discard(attempt.staging)
+        if len(attempts) < len(chain):
+            log(f"  尝试备用来源: {chain[len(attempts)].title}...")
+            launch()
+            running += 1
+
+    cancel.set()
+    with lock:
+        finished = True
+        # 胜者之外已经完成、还没取出的结果
+        while not results.empty():
+            attempt, _ = results.get_nowait()
+            _discard_staging(attempt.staging)
+    if winner is None:
+        return None
+    commit_file(winner.staging, dest)
+    # 图片已经到位，其他来源的半截文件（包括这次没有发出请求的来源）不再需要
+    for provider in chain:
+        if provider is not winner.provider:
+            _discard_staging(_staging_path(dest, provider.name))
+    return winner.provider.name
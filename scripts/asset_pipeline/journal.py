@@ -0,0 +1,116 @@
+"""
+生成任务的运行日志（SQLite）
+每个生成请求（以配方哈希为键）依次经过:
+  planned → submitted（记录远端 task_id）→ completed（记录图片 URL）→ downloaded → verified
+每次状态变化立即提交，进程中途被杀掉后重新运行时:
+  submitted 的任务直接继续轮询，completed / downloaded 的直接重新下载，都不会重复提交（重复付费）
+提交请求的 Idempotency-Key 由配方哈希和尝试次数组成：结果不明确的失败（超时、断网）沿用同一个键重试，
+记录为 failed 的任务（远端失败、过期、图片无法解码）或已完成后再次生成时尝试次数加一，换用新的键
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .cache import CACHE_DIR
+
+JOURNAL_PATH = CACHE_DIR / "journal.sqlite"
+
+PLANNED = "planned"
+SUBMITTED = "submitted"
+COMPLETED = "completed"
+DOWNLOADED = "downloaded"
+VERIFIED = "verified"
+FAILED = "failed"
+
+# 已完成的记录保留的天数
+RETENTION_DAYS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    state TEXT NOT NULL,
+    task_id TEXT,
+    url TEXT,
+    error TEXT,
+    attempt INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def idempotency_key(key: str, attempt: int) -> str:
+    """提交请求的 Idempotency-Key：同一次尝试内重复提交得到同一个远端任务"""
+    return f"{key}-{attempt}"
+
+
+class RunJournal:
+    """线程安全；所有写操作立即提交（WAL 模式，进程崩溃不会丢失已提交的状态）"""
+
+    def __init__(self, path: Path = JOURNAL_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(tasks)")}
+        if "attempt" not in columns:  # 旧版本创建的运行日志
+            self._db.execute("ALTER TABLE tasks ADD COLUMN attempt INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("DELETE FROM tasks WHERE state = ? AND updated_at < ?",
+                         (VERIFIED, time.time() - RETENTION_DAYS * 86400))
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM tasks WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row else None
+
+    def plan(self, key: str, provider: str, filename: str) -> dict:
+        """
+        登记一个生成请求，返回当前记录；未结束的记录保持原状态（继续上次的任务）
+        上次已失败或已完成的记录重新开始，尝试次数加一（使用新的 Idempotency-Key）
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO tasks (key, provider, filename, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, filename, PLANNED, now, now),
+            )
+            self._db.execute(
+                "UPDATE tasks SET state = ?, attempt = attempt + 1, task_id = NULL, url = NULL, error = NULL, "
+                "updated_at = ? WHERE key = ? AND state IN (?, ?)",
+                (PLANNED, now, key, FAILED, VERIFIED),
+            )
+            row = self._db.execute("SELECT * FROM tasks WHERE key = ?", (key,)).fetchone()
+        return dict(row)
+
+    def mark(self, key: str, state: str, **fields) -> None:
+        """更新状态以及 task_id / url / error"""
+        columns = {"state": state, "updated_at": time.time(), **fields}
+        if state != FAILED:
+            columns.setdefault("error", None)
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        with self._lock:
+            self._db.execute(f"UPDATE tasks SET {assignments} WHERE key = ?", (*columns.values(), key))
+
+    def unfinished(self, provider: Optional[str] = None) -> List[dict]:
+        """尚未校验完成的记录（失败的除外）"""
+        query = "SELECT * FROM tasks WHERE state NOT IN (?, ?)"
+        params: list = [VERIFIED, FAILED]
+        if provider:
+            query += " AND provider = ?"
+            params.append(provider)
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query + " ORDER BY created_at", params)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
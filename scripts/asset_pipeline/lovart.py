@@ -0,0 +1,298 @@
+"""
+Lovart API 客户端与批量任务调度器
+调度器先提交所有生成任务，再在一个循环里统一轮询（间隔自适应增长），
+任务完成后立即在后台下载；所有 API 请求共用一个速率限制
+传入 RunJournal 时每一步都记入运行日志，重新运行时接管上次未完成的远端任务而不是重新提交
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import trace, transport
+from .journal import COMPLETED, DOWNLOADED, FAILED, PLANNED, SUBMITTED, RunJournal
+
+# 每秒最多发起的 API 请求数（提交 + 轮询）
+DEFAULT_RATE_LIMIT = 2.0
+
+# 轮询间隔：首次 POLL_INITIAL 秒，之后每次乘以 POLL_BACKOFF，最长 POLL_MAX 秒
+POLL_INITIAL = 1.0
+POLL_BACKOFF = 1.5
+POLL_MAX = 10.0
+
+# 单个任务从提交到完成的最长等待时间
+TASK_TIMEOUT = 120.0
+
+
+class LovartError(Exception):
+    """Lovart API 返回了无法处理的响应；status 为 HTTP 状态码（有的话）"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def definitive(self) -> bool:
+        """API 明确拒绝了请求（4xx）；其余错误（5xx、超时、断网）无法确定请求是否已被接受"""
+        return self.status is not None and 400 <= self.status < 500
+
+
+def extract_image_url(data: dict) -> Optional[str]:
+    """从生成/任务响应中取出图片地址（兼容几种常见格式）"""
+    if data.get("data"):
+        return data["data"][0].get("url") or data["data"][0].get("image_url")
+    if isinstance(data.get("result"), dict) and data["result"].get("url"):
+        return data["result"]["url"]
+    return data.get("url") or data.get("image_url")
+
+
+class LovartClient:
+    def __init__(self, api_base: str, api_key: str, model: str = ""):
+        self.api_base = api_base.rstrip("/")
+        self.model = model
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def submit(self, prompt: str, width: int, height: int, idempotency_key: Optional[str] = None) -> dict:
+        """
+        提交生成请求
+        同步完成时返回 {"url": ...}，异步任务返回 {"task_id": ...}
+        idempotency_key 通过 Idempotency-Key 头发送，支持该头的 API 不会为重复提交创建新任务
+        """
+        payload = {
+            "prompt": prompt,
+            "width": width,
+            "height": height,
+            "num_images": 1,
+        }
+        if self.model:
+            payload["model"] = self.model
+
+        headers = dict(self.headers)
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        response = transport.post(
+            f"{self.api_base}/images/generations",
+            headers=headers,
+            json=payload,
+            timeout=120,
+        )
+        if response.status_code == 200:
+            data = response.json()
+            image_url = extract_image_url(data)
+            if not image_url:
+                raise LovartError(f"API响应格式未知: {data}")
+            return {"url": image_url}
+        if response.status_code == 202:
+            data = response.json()
+            task_id = data.get("task_id") or data.get("id")
+            if not task_id:
+                raise LovartError(f"API响应中没有任务ID: {data}")
+            return {"task_id": task_id}
+        raise LovartError(f"API调用失败 (HTTP {response.status_code}): {response.text[:200]}",
+                          response.status_code)
+
+    def poll(self, task_id: str) -> dict:
+        """查询任务状态，返回 {"status": ..., "url": ...}"""
+        response = transport.get(f"{self.api_base}/tasks/{task_id}", headers=self.headers, timeout=30)
+        if response.status_code != 200:
+            raise LovartError(f"查询状态失败 (HTTP {response.status_code})", response.status_code)
+        data = response.json()
+        status = data.get("status", "pending")
+        return {"status": status, "url": extract_image_url(data) if status == "completed" else None}
+
+
+class RateLimiter:
+    """令牌间隔限速：相邻两次 acquire() 至少间隔 1/rate 秒，线程安全"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+@dataclass
+class Job:
+    filename: str
+    prompt: str
+    width: int
+    height: int
+    key: str = ""  # 运行日志中的键（配方哈希）
+    idempotency_key: str = ""  # 提交请求的 Idempotency-Key（配方哈希 + 尝试次数）
+    task_id: Optional[str] = None
+    submitted_at: float = 0.0
+    next_poll: float = 0.0
+    interval: float = POLL_INITIAL
+    download: Optional[Future] = None
+    error: Optional[str] = None
+    log: List[str] = field(default_factory=list)
+
+
+class LovartScheduler:
+    """批量提交、统一轮询、完成即下载"""
+
+    def __init__(
+        self,
+        client: LovartClient,
+        images_dir: Path,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        concurrency: int = 8,
+        timeout: float = TASK_TIMEOUT,
+        log: Callable[[str], None] = print,
+        journal: Optional[RunJournal] = None,
+    ):
+        self.client = client
+        self.images_dir = Path(images_dir)
+        self.limiter = RateLimiter(rate_limit)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.log = log
+        self.journal = journal
+
+    def _record(self, job: Job, state: str, **fields) -> None:
+        if self.journal is not None and job.key:
+            self.journal.mark(job.key, state, **fields)
+
+    def _submit(self, job: Job) -> Optional[str]:
+        """提交单个任务；同步完成时返回图片地址"""
+        self.limiter.acquire()
+        with trace.span("generate", asset=job.filename, provider="lovart") as span:
+            result = self.client.submit(job.prompt, job.width, job.height, idempotency_key=job.idempotency_key or None)
+            span.set(task_id=result.get("task_id"))
+        job.submitted_at = time.monotonic()
+        if "url" in result:
+            self._record(job, COMPLETED, url=result["url"])
+            return result["url"]
+        job.task_id = result["task_id"]
+        self._record(job, SUBMITTED, task_id=job.task_id)
+        job.next_poll = job.submitted_at + job.interval
+        self.log(f"  任务已提交: {job.filename} (任务ID: {job.task_id})")
+        return None
+
+    def _poll(self, job: Job) -> dict:
+        self.limiter.acquire()
+        with trace.span("poll", asset=job.filename, provider="lovart", task_id=job.task_id) as span:
+            status = self.client.poll(job.task_id)
+            span.set(task_status=status["status"])
+        return status
+
+    def _download(self, job: Job, image_url: str) -> None:
+        with trace.span("fetch", asset=job.filename, provider="lovart"):
+            response = transport.download(image_url, self.images_dir / job.filename, timeout=60)
+        if not response.ok:
+            raise LovartError(f"下载失败 (HTTP {response.status_code})")
+        self._record(job, DOWNLOADED)
+        self.log(f"✓ 已保存: {job.filename}")
+
+    def _start_download(self, pool: ThreadPoolExecutor, job: Job, image_url: str) -> None:
+        job.download = pool.submit(self._download, job, image_url)
+
+    def run(self, jobs: List[Job]) -> Dict[str, Optional[str]]:
+        """执行所有任务，返回 {文件名: 错误信息}，成功的为 None"""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as api_pool, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as download_pool:
+            # 1. 接管运行日志中上次未完成的任务，其余的一次性提交
+            pending: List[Job] = []
+            to_submit = []
+            for job in jobs:
+                entry = self.journal.get(job.key) if self.journal is not None and job.key else None
+                if entry and entry["state"] == SUBMITTED and entry["task_id"]:
+                    job.task_id = entry["task_id"]
+                    job.submitted_at = job.next_poll = time.monotonic()
+                    pending.append(job)
+                    self.log(f"  继续上次的任务: {job.filename} (任务ID: {job.task_id})")
+                elif entry and entry["state"] in (COMPLETED, DOWNLOADED) and entry["url"]:
+                    self.log(f"  重新下载上次已完成的任务: {job.filename}")
+                    self._start_download(download_pool, job, entry["url"])
+                else:
+                    to_submit.append(job)
+            submits = [(job, api_pool.submit(self._submit, job)) for job in to_submit]
+            for job, future in submits:
+                try:
+                    image_url = future.result()
+                except Exception as e:
+                    job.error = f"提交失败: {e}"
+                    if isinstance(e, LovartError) and e.definitive:
+                        self._record(job, FAILED, error=job.error)
+                    else:
+                        # 请求可能已被接受：保持本次尝试，下次运行用同一个 Idempotency-Key 重新提交
+                        self._record(job, PLANNED, error=job.error)
+                    continue
+                if image_url:
+                    self._start_download(download_pool, job, image_url)
+                else:
+                    pending.append(job)
+
+            # 2. 统一轮询所有未完成的任务，只查询已到轮询时间的
+            while pending:
+                now = time.monotonic()
+                wait = min(job.next_poll for job in pending) - now
+                if wait > 0:
+                    time.sleep(wait)
+                    now = time.monotonic()
+
+                due = [job for job in pending if job.next_poll <= now]
+                polls = [(job, api_pool.submit(self._poll, job)) for job in due]
+                for job, future in polls:
+                    try:
+                        status = future.result()
+                    except Exception as e:
+                        job.error = str(e)
+                        pending.remove(job)
+                        if isinstance(e, LovartError) and e.status in (404, 410):
+                            # 远端任务已过期或不存在，下次运行换用新的 Idempotency-Key 重新提交
+                            self._record(job, FAILED, error=job.error)
+                        continue
+
+                    if status["status"] in ("completed", "failed"):
+                        # 从提交到任务结束的排队 + 生成时间
+                        trace.record("wait", time.monotonic() - job.submitted_at, asset=job.filename,
+                                     provider="lovart", task_status=status["status"])
+                    if status["status"] == "completed":
+                        pending.remove(job)
+                        if status["url"]:
+                            self._record(job, COMPLETED, url=status["url"])
+                            self._start_download(download_pool, job, status["url"])
+                        else:
+                            job.error = "任务完成但没有返回图片地址"
+                            self._record(job, FAILED, error=job.error)
+                    elif status["status"] == "failed":
+                        pending.remove(job)
+                        job.error = "任务失败"
+                        self._record(job, FAILED, error=job.error)
+                    elif time.monotonic() - job.submitted_at > self.timeout:
+                        # 运行日志中仍是 submitted，下次运行会继续轮询这个任务
+                        pending.remove(job)
+                        job.error = "超时（下次运行会继续等待该任务）"
+                    else:
+                        job.interval = min(job.interval * POLL_BACKOFF, POLL_MAX)
+                        job.next_poll = time.monotonic() + job.interval
+
+            # 3. 等待剩余的下载完成
+            for job in jobs:
+                if job.download is None:
+                    continue
+                try:
+                    job.download.result()
+                except Exception as e:
+                    job.error = str(e)
+                    # 图片地址可能已过期：异步任务下次运行时重新查询地址，同步结果只能重新提交
+                    if job.task_id:
+                        self._record(job, SUBMITTED, task_id=job.task_id)
+                    else:
+                        self._record(job, FAILED, error=job.error)
+
+        return {job.filename: job.error for job in jobs}
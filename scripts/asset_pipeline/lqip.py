@@ -0,0 +1,181 @@
+"""
+低质量占位信息
+为每张图片计算固有宽高、主色、BlurHash 和一张 base64 内联的极小预览图（LQIP），
+前端可以在原图加载前立即显示占位并预留布局空间。
+解码使用 JPEG draft 模式，BlurHash 和主色都用 NumPy 批量计算
+"""
+
+import base64
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+from PIL import ExifTags, Image, ImageOps, features
+
+from . import IMAGES_DIR
+from .cache import CACHE_DIR
+from .planner import content_hash
+from .storage import atomic_write
+
+MANIFEST_NAME = "lqip.json"
+STATE_PATH = CACHE_DIR / "lqip-state.json"
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+# BlurHash 的横向/纵向分量数
+BLURHASH_COMPONENTS = (4, 3)
+# 计算 BlurHash 和主色时使用的缩略图最长边
+ANALYSIS_SIZE = 64
+# 内联预览图的宽度
+LQIP_WIDTH = 16
+LQIP_QUALITY = 40
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _base83(value: int, length: int) -> str:
+    return "".join(_BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def _srgb_to_linear(pixels: np.ndarray) -> np.ndarray:
+    v = pixels / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = min(max(value, 0.0), 1.0)
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(pixels: np.ndarray, components: Tuple[int, int] = BLURHASH_COMPONENTS) -> str:
+    """对 (H, W, 3) uint8 像素计算 BlurHash"""
+    cx, cy = components
+    height, width = pixels.shape[:2]
+    linear = _srgb_to_linear(pixels.astype(np.float64))
+
+    # 所有分量一次性算出：factors[j, i] = Σ cos(πjy/h)·cos(πix/w)·linear(x, y)
+    basis_x = np.cos(np.pi * np.arange(cx)[:, None] * np.arange(width)[None, :] / width)
+    basis_y = np.cos(np.pi * np.arange(cy)[:, None] * np.arange(height)[None, :] / height)
+    factors = np.einsum("jy,ix,yxc->jic", basis_y, basis_x, linear) / (width * height)
+    factors[1:, :] *= 2
+    factors[0, 1:] *= 2
+    factors = factors.reshape(-1, 3)
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((cx - 1) + (cy - 1) * 9, 1)
+    if len(ac):
+        quantised_max = int(max(0, min(82, np.floor(np.abs(ac).max() * 166 - 0.5))))
+        maximum = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        maximum = 1.0
+        result += _base83(0, 1)
+
+    result += _base83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+    quant = np.clip(np.floor(np.sign(ac) * np.sqrt(np.abs(ac / maximum)) * 9 + 9.5), 0, 18).astype(int)
+    for r, g, b in quant:
+        result += _base83(r * 19 * 19 + g * 19 + b, 2)
+    return result
+
+
+def dominant_color(pixels: np.ndarray) -> str:
+    """把颜色量化到 16 级/通道后取出现最多的区间，返回该区间内像素的平均色"""
+    flat = pixels.reshape(-1, 3).astype(np.int32)
+    bins = (flat[:, 0] >> 4) << 8 | (flat[:, 1] >> 4) << 4 | (flat[:, 2] >> 4)
+    top = np.bincount(bins, minlength=4096).argmax()
+    r, g, b = flat[bins == top].mean(axis=0).round().astype(int)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def lqip_data_uri(img: Image.Image) -> str:
+    """极小的内联预览图（优先 WebP）"""
+    height = max(1, round(img.height * LQIP_WIDTH / img.width))
+    tiny = img.resize((LQIP_WIDTH, height), Image.BILINEAR)
+    buf = io.BytesIO()
+    if features.check("webp"):
+        tiny.save(buf, "WEBP", quality=LQIP_QUALITY)
+        mime = "image/webp"
+    else:
+        tiny.save(buf, "JPEG", quality=LQIP_QUALITY)
+        mime = "image/jpeg"
+    return f"data:{mime};base64,{base64.b64encode(buf.getvalue()).decode('ascii')}"
+
+
+def analyze(path: Path) -> dict:
+    """计算单张图片的占位信息"""
+    with Image.open(path) as src:
+        # 尺寸和方向都从文件头读取；任何 load() 之前调用 draft，JPEG 在解码阶段直接缩小
+        orientation = src.getexif().get(ExifTags.Base.Orientation, 1)
+        width, height = (src.height, src.width) if orientation in (5, 6, 7, 8) else src.size
+        src.draft("RGB", (ANALYSIS_SIZE * 2, ANALYSIS_SIZE * 2))
+        # 只对缩小解码后的图片按 EXIF 方向旋转
+        small = ImageOps.exif_transpose(src).convert("RGB")
+    small.thumbnail((ANALYSIS_SIZE, ANALYSIS_SIZE), Image.BILINEAR)
+    pixels = np.asarray(small)
+    return {
+        "width": width,
+        "height": height,
+        "color": dominant_color(pixels),
+        "blurhash": blurhash(pixels),
+        "lqip": lqip_data_uri(small),
+    }
+
+
+def build_lqip(images_dir: Path = IMAGES_DIR, workers: int = 8, force: bool = False) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    增量生成 images_dir/lqip.json，逐个产出 (文件名, 状态, 错误信息)
+    状态: "built" / "fresh" / "failed" / "removed"
+    """
+    manifest_path = images_dir / MANIFEST_NAME
+    try:
+        manifest: Dict[str, dict] = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    try:
+        state: Dict[str, dict] = json.loads(STATE_PATH.read_text())
+    except (OSError, ValueError):
+        state = {}
+
+    paths = sorted(p for p in images_dir.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+    todo = []
+    for path in paths:
+        st = path.stat()
+        sha256 = content_hash(path, st, state.get(path.name))
+        state[path.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+        if not force and manifest.get(path.name, {}).get("sha256") == sha256:
+            yield path.name, "fresh", None
+        else:
+            todo.append((path, sha256))
+
+    names = {p.name for p in paths}
+    for name in sorted(set(manifest) - names):
+        del manifest[name]
+        state.pop(name, None)
+        yield name, "removed", None
+
+    def run(item):
+        try:
+            return analyze(item[0]), None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for (path, sha256), (entry, error) in zip(todo, pool.map(run, todo)):
+                if error:
+                    state.pop(path.name, None)
+                    yield path.name, "failed", error
+                    continue
+                entry["sha256"] = sha256
+                manifest[path.name] = entry
+                yield path.name, "built", None
+    finally:
+        with atomic_write(manifest_path) as f:
+            f.write(json.dumps(dict(sorted(manifest.items())), ensure_ascii=False, indent=2).encode("utf-8"))
+        with atomic_write(STATE_PATH) as f:
+            f.write(json.dumps(state, indent=2, sort_keys=True).encode("utf-8"))
@@ -0,0 +1,49 @@
+"""
+图片资源清单
+scripts/assets.json 是所有脚本共用的唯一清单，assets 中每个条目描述一张图片：
+尺寸、中文说明、占位标签、图库搜索词、AI 提示词，以及按 provider 覆盖的字段；
+其余顶层字段是各处理阶段的配置（例如 responsive）
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+MANIFEST_PATH = Path(__file__).resolve().parent.parent / "assets.json"
+
+REQUIRED_FIELDS = ("width", "height", "description", "label", "search", "prompt")
+
+
+class ManifestError(ValueError):
+    """清单格式错误"""
+
+
+def _read(path: Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"无法读取清单 {path}: {e}") from e
+
+
+def load_settings(section: str, path: Path = MANIFEST_PATH) -> dict:
+    """读取清单中某个处理阶段的配置，没有配置时返回空字典"""
+    return dict(_read(path).get(section, {}))
+
+
+def load_manifest(provider: Optional[str] = None, path: Path = MANIFEST_PATH) -> Dict[str, dict]:
+    """
+    读取清单，返回 {文件名: 配置}
+    指定 provider 时，把该条目 providers[provider] 中的字段覆盖到配置上
+    """
+    data = _read(path)
+
+    assets = {}
+    for filename, entry in data.get("assets", {}).items():
+        missing = [field for field in REQUIRED_FIELDS if field not in entry]
+        if missing:
+            raise ManifestError(f"{filename} 缺少字段: {', '.join(missing)}")
+        config = {k: v for k, v in entry.items() if k != "providers"}
+        if provider:
+            config.update(entry.get("providers", {}).get(provider, {}))
+        assets[filename] = config
+    return assets
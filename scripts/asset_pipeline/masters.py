@@ -0,0 +1,117 @@
+"""
+AI 生成的母版图
+生成 API 往往只支持固定的几种尺寸（DALL·E 3: 1024x1024 / 1792x1024 / 1024x1792），
+按清单尺寸直接请求会被拒绝。这里按宽高比把每个提示词映射到最接近的受支持尺寸，
+每个不同的提示词只生成一次母版（存入生成结果缓存），清单中的各个尺寸在本地
+用智能裁切 + Lanczos 缩放得到
+"""
+
+import math
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from . import trace
+from .planner import MISSING, PlanItem
+from .storage import atomic_write
+
+Size = Tuple[int, int]
+
+# 从母版派生的图片的 JPEG 质量（之后 optimize 会按 SSIM 重新压缩）
+DERIVE_QUALITY = 92
+
+# 计算裁切位置时把图片缩小到长边为该值，足够找到主体且很快
+ENERGY_SIZE = 256
+
+# 裁切窗口偏离中心的惩罚（相对于窗口内平均能量），避免在细节差不多时裁到边上
+CENTER_BIAS = 0.15
+
+
+def master_size(requested: Sequence[Size], supported: Sequence[Size]) -> Size:
+    """
+    选出母版尺寸：宽高比与所有请求尺寸最接近（对数比之和最小）的受支持尺寸，相同时取面积大的
+    来源没有尺寸限制时，直接使用面积最大的请求尺寸
+    """
+    if not supported:
+        return max(requested, key=lambda s: (s[0] * s[1], s))
+
+    def cost(size: Size):
+        aspect = size[0] / size[1]
+        return (sum(abs(math.log(aspect * h / w)) for w, h in requested), -size[0] * size[1])
+
+    return min(supported, key=cost)
+
+
+class Master(NamedTuple):
+    """一个提示词的母版，以及由它派生的工作项"""
+
+    item: PlanItem  # 交给 GenerateProvider.generate() 的工作项，尺寸为母版尺寸
+    derived: List[PlanItem]
+
+
+def group_masters(items: Sequence[PlanItem], provider) -> List[Master]:
+    """按提示词分组，每组一个母版；母版的配方与同尺寸的普通生成结果相同，可以复用已有缓存"""
+    groups: Dict[str, List[PlanItem]] = {}
+    for item in items:
+        groups.setdefault(item.config["prompt"], []).append(item)
+
+    masters = []
+    for prompt, group in groups.items():
+        width, height = master_size([(i.config["width"], i.config["height"]) for i in group], provider.sizes)
+        config = {"prompt": prompt, "width": width, "height": height}
+        first = Path(group[0].filename)
+        filename = f"{first.stem}-{width}x{height}{first.suffix}"
+        masters.append(Master(PlanItem(filename, config, provider.recipe(config), MISSING), group))
+    return masters
+
+
+def crop_box(img, width: int, height: int) -> Tuple[float, float, float, float]:
+    """
+    在 img 中找出宽高比为 width:height 的最大裁切框，沿需要裁掉的方向滑动，
+    选细节（梯度能量）最多的位置，并略微偏向中心
+    """
+    import numpy as np
+
+    src_w, src_h = img.size
+    target = width / height
+    if abs(src_w / src_h - target) < 1e-3:
+        return 0.0, 0.0, float(src_w), float(src_h)
+
+    scale = ENERGY_SIZE / max(src_w, src_h)
+    small = img.convert("L").resize((max(1, round(src_w * scale)), max(1, round(src_h * scale))))
+    luma = np.asarray(small, dtype=np.float32)
+    energy = np.zeros_like(luma)
+    energy[:, 1:] += np.abs(np.diff(luma, axis=1))
+    energy[1:, :] += np.abs(np.diff(luma, axis=0))
+
+    horizontal = src_w / src_h > target  # 太宽，裁左右
+    if horizontal:
+        crop = src_h * target
+        profile = energy.sum(axis=0)
+    else:
+        crop = src_w / target
+        profile = energy.sum(axis=1)
+    full = src_w if horizontal else src_h
+    window = max(1, min(len(profile), round(crop * scale)))
+    sums = np.convolve(profile, np.ones(window), mode="valid")
+    offsets = np.arange(len(sums))
+    center = (len(profile) - window) / 2
+    mean = sums.mean() if sums.mean() > 0 else 1.0
+    score = sums - CENTER_BIAS * mean * np.abs(offsets - center) / max(center, 1)
+    start = min(max(int(score.argmax()) / scale, 0.0), full - crop)
+    if horizontal:
+        return start, 0.0, start + crop, float(src_h)
+    return 0.0, start, float(src_w), start + crop
+
+
+def derive(master: Path, dest: Path, width: int, height: int) -> None:
+    """从母版裁切并缩放（必要时放大）到 width x height，保存为 JPEG"""
+    from PIL import Image
+
+    with Image.open(master) as src:
+        img = src.convert("RGB")
+    with trace.span("derive", asset=dest.name, master=f"{img.width}x{img.height}"):
+        box = crop_box(img, width, height)
+        # resize 的 box 参数直接从裁切区域采样，省去一次中间图片的复制
+        out = img.resize((width, height), Image.LANCZOS, box=box)
+        with atomic_write(dest) as f:
+            out.save(f, "JPEG", quality=DERIVE_QUALITY, optimize=True, progressive=True)
@@ -0,0 +1,183 @@
+"""
+图片重新压缩与体积预算
+JPEG：去掉 EXIF/XMP 等元数据，用优化的 Huffman 表和渐进式扫描重新编码，
+二分查找 SSIM 不低于阈值的最低质量；PNG：无损优化。
+只有确实变小时才替换原文件；已优化过的文件按内容哈希跳过，避免反复有损压缩
+"""
+
+import io
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from . import IMAGES_DIR, trace
+from .cache import CACHE_DIR
+from .planner import file_sha256
+from .storage import atomic_write
+
+STATE_PATH = CACHE_DIR / "optimize-state.json"
+
+DEFAULT_SETTINGS = {
+    "ssim": 0.985,          # 重新编码后与原图的最低结构相似度
+    "min_quality": 40,
+    "max_quality": 92,
+    "max_bytes": 500_000,   # 默认单张体积预算，可在清单条目中用 max_bytes 覆盖
+}
+
+# 新文件至少比原文件小这么多才替换
+MIN_SAVING = 0.01
+
+SSIM_WINDOW = 8
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+
+
+def _box_mean(x: np.ndarray, k: int) -> np.ndarray:
+    """k x k 滑动窗口均值（积分图实现，只保留完整窗口）"""
+    c = np.cumsum(np.cumsum(x, axis=0), axis=1)
+    c = np.pad(c, ((1, 0), (1, 0)))
+    return (c[k:, k:] - c[:-k, k:] - c[k:, :-k] + c[:-k, :-k]) / (k * k)
+
+
+def ssim(a: Image.Image, b: Image.Image) -> float:
+    """两张同尺寸图片亮度通道的平均 SSIM"""
+    x = np.asarray(a.convert("L"), dtype=np.float64)
+    y = np.asarray(b.convert("L"), dtype=np.float64)
+    k = min(SSIM_WINDOW, *x.shape)
+    mx, my = _box_mean(x, k), _box_mean(y, k)
+    vx = _box_mean(x * x, k) - mx * mx
+    vy = _box_mean(y * y, k) - my * my
+    cxy = _box_mean(x * y, k) - mx * my
+    s = ((2 * mx * my + _C1) * (2 * cxy + _C2)) / ((mx * mx + my * my + _C1) * (vx + vy + _C2))
+    return float(s.mean())
+
+
+def encode_jpeg(img: Image.Image, quality: int) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=quality, optimize=True, progressive=True,
+             icc_profile=img.info.get("icc_profile"))
+    return buf.getvalue()
+
+
+def search_jpeg_quality(img: Image.Image, threshold: float, lo: int, hi: int):
+    """二分查找 SSIM >= threshold 的最低质量，返回 (数据, 质量, SSIM)；都达不到时使用最高质量"""
+    best = None
+    low, high = lo, hi
+    while low <= high:
+        mid = (low + high) // 2
+        data = encode_jpeg(img, mid)
+        with Image.open(io.BytesIO(data)) as candidate:
+            score = ssim(img, candidate)
+        if score >= threshold:
+            best = (data, mid, score)
+            high = mid - 1
+        else:
+            low = mid + 1
+    if best is None:
+        data = encode_jpeg(img, hi)
+        with Image.open(io.BytesIO(data)) as candidate:
+            best = (data, hi, ssim(img, candidate))
+    return best
+
+
+@dataclass
+class OptimizeResult:
+    filename: str
+    status: str              # "optimized" / "optimal" / "skipped" / "failed"
+    before: int = 0
+    after: int = 0
+    quality: Optional[int] = None
+    ssim: Optional[float] = None
+    budget: Optional[int] = None
+    error: Optional[str] = None
+    data: Optional[bytes] = field(default=None, repr=False)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.after > self.budget
+
+
+def optimize_file(path: Path, settings: dict) -> OptimizeResult:
+    """重新压缩单个文件；不写盘，变小时新数据放在 result.data"""
+    before = path.stat().st_size
+    with trace.span("decode", asset=path.name, bytes=before), Image.open(path) as src:
+        fmt = src.format
+        icc = src.info.get("icc_profile")
+        img = ImageOps.exif_transpose(src)
+        img.load()
+    # 只保留 ICC 颜色配置，其余元数据（EXIF、XMP、注释）都丢弃
+    img.info = {"icc_profile": icc} if icc else {}
+
+    if fmt not in ("JPEG", "PNG"):
+        return OptimizeResult(path.name, "skipped", before, before)
+    with trace.span("encode", asset=path.name, format=fmt.lower()) as span:
+        if fmt == "JPEG":
+            img = img.convert("RGB")
+            data, quality, score = search_jpeg_quality(
+                img, settings["ssim"], settings["min_quality"], settings["max_quality"])
+        else:
+            buf = io.BytesIO()
+            img.save(buf, "PNG", optimize=True, icc_profile=icc)
+            data, quality, score = buf.getvalue(), None, 1.0
+        span.set(bytes=len(data), quality=quality)
+
+    result = OptimizeResult(path.name, "optimal", before, before, quality, score)
+    if len(data) < before * (1 - MIN_SAVING):
+        result.status = "optimized"
+        result.after = len(data)
+        result.data = data
+    return result
+
+
+def optimize_images(
+    assets: Dict[str, dict],
+    images_dir: Path = IMAGES_DIR,
+    settings: Optional[dict] = None,
+    dry_run: bool = False,
+    on_write=None,
+) -> Iterator[OptimizeResult]:
+    """
+    优化 images_dir 顶层的 JPEG/PNG，逐个产出结果
+    on_write(filename, path) 在文件被替换后调用，供调用方同步构建状态
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    try:
+        state = json.loads(STATE_PATH.read_text())
+    except (OSError, ValueError):
+        state = {}
+
+    try:
+        for path in sorted(images_dir.iterdir()):
+            if not path.is_file() or path.suffix.lower() not in (".jpg", ".jpeg", ".png"):
+                continue
+            budget = assets.get(path.name, {}).get("max_bytes", settings["max_bytes"])
+            sha256 = file_sha256(path)
+            if state.get(path.name) == sha256:
+                size = path.stat().st_size
+                yield OptimizeResult(path.name, "optimal", size, size, budget=budget)
+                continue
+
+            try:
+                result = optimize_file(path, settings)
+            except Exception as e:
+                yield OptimizeResult(path.name, "failed", error=f"{type(e).__name__}: {e}")
+                continue
+            result.budget = budget
+
+            if result.status == "optimized" and not dry_run:
+                with trace.span("write", asset=path.name, bytes=len(result.data)), atomic_write(path) as f:
+                    f.write(result.data)
+                sha256 = file_sha256(path)
+                if on_write:
+                    on_write(path.name, path)
+            if not dry_run:
+                state[path.name] = sha256
+            yield result
+    finally:
+        if not dry_run:
+            with atomic_write(STATE_PATH) as f:
+                f.write(json.dumps(state, indent=2, sort_keys=True).encode("utf-8"))
@@ -0,0 +1,173 @@
+"""
+增量构建计划
+类似 make：对比清单和磁盘上的文件，只把需要重新生成的图片列入工作清单。
+构建状态记录每个文件由哪个脚本（owner）按哪个配方（recipe，参数哈希）生成，
+以及生成时的大小、mtime 和内容哈希；mtime 和大小没变时不重新计算哈希
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import trace
+from .cache import CACHE_DIR, AssetCache
+from .storage import atomic_write
+
+STATE_PATH = CACHE_DIR / "build-state.json"
+
+# PlanItem.reason
+MISSING = "missing"                # 文件不存在
+RECIPE_CHANGED = "recipe-changed"  # 同一脚本生成的文件，但提示词/尺寸等参数变了
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash(path: Path, st: os.stat_result, entry: Optional[dict]) -> str:
+    """entry 中记录的大小和 mtime 与文件一致时直接复用其 sha256，否则重新计算"""
+    if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("sha256"):
+        return entry["sha256"]
+    return file_sha256(path)
+
+
+@dataclass
+class PlanItem:
+    filename: str
+    config: dict
+    recipe: str
+    reason: str
+
+
+class BuildState:
+    """构建状态 {文件名: {owner, provider, recipe, size, mtime_ns, sha256}}"""
+
+    def __init__(self, path: Path = STATE_PATH):
+        self.path = Path(path)
+        self.dirty = False
+        try:
+            self.entries: Dict[str, dict] = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        with atomic_write(self.path) as f:
+            f.write(json.dumps(self.entries, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8"))
+        self.dirty = False
+
+    def refresh(self, filename: str, path: Path, st: os.stat_result) -> Optional[dict]:
+        """返回文件的状态记录；文件 mtime/大小变化时重新计算内容哈希"""
+        entry = self.entries.get(filename)
+        if entry is None:
+            return None
+        if entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+            sha256 = content_hash(path, st, None)
+            if sha256 != entry.get("sha256"):
+                # 文件被手动替换：不再归任何脚本所有，之后也不会被自动覆盖
+                entry["owner"] = None
+                entry["provider"] = None
+                entry["sha256"] = sha256
+            entry["size"] = st.st_size
+            entry["mtime_ns"] = st.st_mtime_ns
+            self.dirty = True
+        return entry
+
+    def update_content(self, filename: str, path: Path) -> None:
+        """文件被后续处理阶段（如重新压缩）改写后，更新内容记录但保留归属和配方"""
+        entry = self.entries.get(filename)
+        if entry is None:
+            return
+        st = path.stat()
+        entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=file_sha256(path))
+        self.dirty = True
+
+    def forget(self, filename: str) -> None:
+        """文件被移走（例如校验失败被隔离）后删除记录，之后按缺失处理"""
+        if self.entries.pop(filename, None) is not None:
+            self.dirty = True
+
+    def record(self, filename: str, owner: Optional[str], recipe: Optional[str], path: Path,
+               provider: Optional[str] = None) -> None:
+        """登记刚生成（或首次接管）的文件"""
+        st = path.stat()
+        self.entries[filename] = {
+            "owner": owner,
+            "provider": provider or owner,
+            "recipe": recipe,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": file_sha256(path),
+        }
+        self.dirty = True
+
+
+def plan(
+    assets: Dict[str, dict],
+    owner: str,
+    recipe_of: Callable[[dict], str],
+    images_dir: Path,
+    state: BuildState,
+) -> List[PlanItem]:
+    """
+    返回 owner 这个脚本需要生成的最小工作清单
+    - 文件不存在：需要生成
+    - 文件由 owner 生成但配方变了：需要重新生成
+    - 文件由其他脚本生成或被手动替换：保留不动（与各脚本原来"已存在就跳过"一致）
+    - 文件存在但没有状态记录：来源未知，登记为无主文件，同样不会被覆盖
+    """
+    with trace.span("plan", owner=owner, assets=len(assets)) as span:
+        work = []
+        for filename, config in assets.items():
+            path = images_dir / filename
+            recipe = recipe_of(config)
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                work.append(PlanItem(filename, config, recipe, MISSING))
+                continue
+
+            entry = state.refresh(filename, path, st)
+            if entry is None:
+                state.record(filename, None, None, path)
+            elif entry.get("owner") == owner and entry.get("recipe") != recipe:
+                work.append(PlanItem(filename, config, recipe, RECIPE_CHANGED))
+        state.save()
+        span.set(work=len(work))
+    return work
+
+
+def restore_cached(
+    work: List[PlanItem],
+    cache: AssetCache,
+    state: BuildState,
+    owner: str,
+    images_dir: Path,
+    log: Callable[[str], None] = print,
+) -> List[PlanItem]:
+    """
+    先从缓存恢复工作项，返回仍需调用 API 生成的项
+    配方变化的文件在被覆盖前按旧配方存入缓存，之后改回旧提示词可以直接恢复
+    """
+    remaining = []
+    for item in work:
+        path = images_dir / item.filename
+        if item.reason == RECIPE_CHANGED:
+            old_recipe = state.entries[item.filename]["recipe"]
+            if cache.get(old_recipe) is None:
+                cache.put(old_recipe, path, {"provider": owner, "file": item.filename})
+        if cache.restore(item.recipe, path):
+            state.record(item.filename, owner, item.recipe, path)
+            log(f"✓ 从缓存恢复: {item.filename}")
+        else:
+            remaining.append(item)
+    state.save()
+    return remaining
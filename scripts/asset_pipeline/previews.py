@@ -0,0 +1,269 @@
+"""
+模板预览图的后台处理
+POST /api/admin/templates/upload 只把上传的预览图写入本地队列目录（lib/api/preview-queue.ts），
+这里的 worker 在请求之外生成缩略图和响应式衍生图、去掉 EXIF，并把结果写回队列
+
+队列目录结构（同一文件系统内用 rename 转移，多个 worker 同时运行也不会重复处理）:
+  files/{id}.{ext}   上传的原图
+  new/{id}.json      待处理的任务
+  cur/{id}.json      已被某个 worker 领取
+  done/{id}.json     处理结果（缩略图、srcset、原图尺寸），由 Next.js 写回 Template.preview 后移到 applied/
+  failed/{id}.json   处理失败的任务和错误信息（原图保留）
+衍生图不写入 public/：Next.js 只提供构建时就存在的 public 文件。默认由 /api/previews/{id}/{文件名}
+从 OUTPUT_DIR 读取返回；输出目录同步到 CDN 或对象存储时，用 PREVIEW_PUBLIC_URL 指定对应的地址前缀
+"""
+
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from . import ROOT_DIR, trace
+from .storage import atomic_write
+
+SPOOL_DIR = Path(os.getenv("PREVIEW_SPOOL_DIR") or ROOT_DIR / ".cache" / "previews")
+OUTPUT_DIR = Path(os.getenv("PREVIEW_OUTPUT_DIR") or ROOT_DIR / ".cache" / "preview-output")
+# OUTPUT_DIR 对应的地址前缀（与 lib/api/preview-queue.ts 一致）
+URL_PREFIX = (os.getenv("PREVIEW_PUBLIC_URL") or "/api/previews").rstrip("/")
+
+DEFAULT_SETTINGS = {
+    "thumbnail": [480, 360],  # 模板卡片的缩略图，居中裁切
+    "widths": [640, 1280],    # 详情页的响应式宽度（不放大）
+    "formats": ["webp", "jpeg"],
+    "quality": {"webp": 78, "jpeg": 80},
+}
+
+# worker 领取任务后超过这个时间（秒）仍未完成，视为已崩溃，任务退回队列
+LEASE_SECONDS = 600
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+QUEUES = ("new", "cur", "done", "failed")
+
+
+def _paths(spool: Path, queue: str, job_id: str) -> Path:
+    return spool / queue / f"{job_id}.json"
+
+
+def recover(spool: Path = SPOOL_DIR, lease: float = LEASE_SECONDS) -> List[str]:
+    """把领取后超时未完成的任务退回 new/，返回退回的任务 id"""
+    cur = spool / "cur"
+    if not cur.is_dir():
+        return []
+    now = time.time()
+    recovered = []
+    for path in sorted(cur.glob("*.json")):
+        try:
+            if now - path.stat().st_mtime < lease:
+                continue
+            os.replace(path, _paths(spool, "new", path.stem))
+        except FileNotFoundError:
+            continue  # 刚好被处理完
+        recovered.append(path.stem)
+    return recovered
+
+
+def claim(spool: Path = SPOOL_DIR, limit: Optional[int] = None) -> List[dict]:
+    """按提交顺序领取待处理任务；rename 是原子的，抢先领取的 worker 胜出"""
+    new = spool / "new"
+    if not new.is_dir():
+        return []
+    (spool / "cur").mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for path in sorted(new.glob("*.json")):
+        if limit is not None and len(jobs) >= limit:
+            break
+        target = _paths(spool, "cur", path.stem)
+        try:
+            os.replace(path, target)
+        except FileNotFoundError:
+            continue  # 被其他 worker 领走了
+        os.utime(target)  # 租约从领取时开始计算
+        try:
+            jobs.append(json.loads(target.read_text()))
+        except (OSError, ValueError) as e:
+            _finish(spool, path.stem, "failed", {"id": path.stem, "error": f"任务文件无法解析: {e}"})
+    return jobs
+
+
+def release(spool: Path, job_ids) -> None:
+    """把已领取但还没处理完的任务退回 new/（worker 正常退出或被 Ctrl+C 中断时）"""
+    for job_id in job_ids:
+        try:
+            os.replace(_paths(spool, "cur", job_id), _paths(spool, "new", job_id))
+        except FileNotFoundError:
+            pass
+
+
+def _finish(spool: Path, job_id: str, queue: str, record: dict) -> None:
+    target = _paths(spool, queue, job_id)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(target) as f:
+        f.write(json.dumps(record, ensure_ascii=False, indent=2).encode("utf-8"))
+    _paths(spool, "cur", job_id).unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------- 图片处理
+
+
+def _strip_metadata(img):
+    """去掉 EXIF / XMP / 注释（可能包含 GPS 位置和设备信息），只保留 ICC 色彩配置"""
+    icc = img.info.get("icc_profile")
+    img.info = {"icc_profile": icc} if icc else {}
+    return img
+
+
+def _save(img, path: Path, fmt: str, quality: int) -> int:
+    from .derivatives import ENCODER_OPTIONS
+
+    options = dict(ENCODER_OPTIONS[fmt])
+    if img.info.get("icc_profile"):
+        options["icc_profile"] = img.info["icc_profile"]
+    with atomic_write(path) as f:
+        img.save(f, fmt.upper(), quality=quality, **options)
+    return path.stat().st_size
+
+
+def process_preview(source: Path, settings: dict, output_dir: Path) -> dict:
+    """
+    解码一次原图，生成缩略图和各宽度、各格式的衍生图，返回结果记录
+    JPEG 用 draft 模式在 DCT 阶段直接按 1/2、1/4、1/8 缩小解码，大图解码快数倍
+    """
+    from PIL import ExifTags, Image, ImageOps
+
+    from .derivatives import EXTENSIONS, ladder
+
+    thumb_w, thumb_h = settings["thumbnail"]
+    max_width = max(settings["widths"])
+    with Image.open(source) as src, trace.span("decode", format=src.format):
+        orientation = src.getexif().get(ExifTags.Base.Orientation, 1)
+        rotated = orientation in (5, 6, 7, 8)
+        width, height = (src.height, src.width) if rotated else src.size
+        # 需要的最小缩放比例：最宽的衍生图和缩略图（居中裁切，取较大的比例）都不能被放大
+        scale = min(1.0, max(max_width / width, thumb_w / width, thumb_h / height))
+        if src.format == "JPEG" and scale < 1.0:
+            # draft 按文件中的存储方向请求尺寸，选不小于请求尺寸的最大 DCT 缩放
+            src.draft("RGB", (math.ceil(src.width * scale), math.ceil(src.height * scale)))
+        src.seek(0)  # GIF 只取第一帧
+        img = ImageOps.exif_transpose(src)
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+    # 缩放、裁切得到的图片会复制 info，这里清理一次即可
+    _strip_metadata(img)
+    decoded_width = img.width
+
+    sources = {fmt: [] for fmt in settings["formats"]}
+    directory = output_dir / source.stem
+    directory.mkdir(parents=True, exist_ok=True)
+    with trace.span("encode"):
+        thumb = ImageOps.fit(img, (thumb_w, thumb_h), Image.LANCZOS)
+        thumb_path = directory / "thumb.jpg"
+        thumb_bytes = _save(_flatten(thumb), thumb_path, "jpeg", settings["quality"]["jpeg"])
+
+        # 衍生图宽度以原图宽度为准，draft 解码后的图片可能略宽于目标宽度
+        for target_width in ladder(width, settings["widths"]):
+            target_height = max(1, round(height * target_width / width))
+            if (target_width, target_height) == img.size:
+                resized = img
+            else:
+                resized = img.resize((target_width, target_height), Image.LANCZOS, reducing_gap=3.0)
+            for fmt in settings["formats"]:
+                out = _flatten(resized) if fmt == "jpeg" else resized
+                path = directory / f"{target_width}w.{EXTENSIONS[fmt]}"
+                size = _save(out, path, fmt, settings["quality"][fmt])
+                sources[fmt].append({
+                    "src": f"{URL_PREFIX}/{source.stem}/{path.name}",
+                    "width": target_width,
+                    "height": target_height,
+                    "bytes": size,
+                })
+
+    return {
+        "width": width,
+        "height": height,
+        "decoded_width": decoded_width,
+        "thumbnail": {"src": f"{URL_PREFIX}/{source.stem}/{thumb_path.name}",
+                      "width": thumb_w, "height": thumb_h, "bytes": thumb_bytes},
+        "sources": sources,
+        "srcset": {fmt: ", ".join(f"{v['src']} {v['width']}w" for v in variants)
+                   for fmt, variants in sources.items()},
+    }
+
+
+def _flatten(img):
+    """JPEG 不支持透明，铺到白色背景上"""
+    if img.mode == "RGB":
+        return img
+    from PIL import Image
+
+    background = Image.new("RGB", img.size, (255, 255, 255))
+    background.paste(img, mask=img.getchannel("A"))
+    background.info = dict(img.info)
+    return background
+
+
+def _process_job(task: Tuple[dict, Path, dict, Path]) -> Tuple[dict, Optional[dict], Optional[str], List[dict]]:
+    job, spool, settings, output_dir = task
+    with trace.tracer.capture() as spans:
+        try:
+            with trace.span("preview", asset=job["id"]):
+                result = process_preview(spool / job["source"], settings, output_dir)
+            return job, result, None, spans
+        except Exception as e:
+            return job, None, f"{type(e).__name__}: {e}", spans
+
+
+def process_queue(
+    spool: Path = SPOOL_DIR,
+    output_dir: Path = OUTPUT_DIR,
+    settings: Optional[dict] = None,
+    processes: Optional[int] = None,
+    watch: bool = False,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> Iterator[Tuple[dict, Optional[str]]]:
+    """
+    处理队列中的任务，逐个产出 (结果记录, 错误信息)
+    watch 为 False 时处理完当前积压就返回；为 True 时持续轮询新任务
+    """
+    from .derivatives import available_formats
+
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    settings["formats"] = available_formats(settings["formats"])
+    for queue in QUEUES:
+        (spool / queue).mkdir(parents=True, exist_ok=True)
+    recover(spool)
+
+    processes = processes or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=processes) if processes > 1 else None
+    pending = set()
+    try:
+        while True:
+            # 一次最多领取两倍进程数的任务，其余留给同时运行的其他 worker
+            jobs = claim(spool, limit=processes * 2)
+            if not jobs:
+                if not watch:
+                    return
+                time.sleep(poll_interval)
+                continue
+            pending.update(job["id"] for job in jobs)
+            tasks = [(job, spool, settings, output_dir) for job in jobs]
+            results = pool.map(_process_job, tasks) if pool else map(_process_job, tasks)
+            for job, result, error, spans in results:
+                trace.tracer.ingest(spans)
+                pending.discard(job["id"])
+                record = {**job, "processed_at": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+                if error:
+                    _finish(spool, job["id"], "failed", {**record, "error": error})
+                    yield record, error
+                    continue
+                record.update(result)
+                _finish(spool, job["id"], "done", record)
+                # 衍生图已经生成，原图不再需要
+                (spool / job["source"]).unlink(missing_ok=True)
+                yield record, None
+    finally:
+        release(spool, pending)
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
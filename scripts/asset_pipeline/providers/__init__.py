@@ -0,0 +1,59 @@
+"""
+图片来源插件注册表
+注册表只保存 "模块:类名"，第一次用到某个来源时才导入对应模块；
+插件模块本身也只在真正下载、生成时才导入 requests、Pillow 等依赖，
+因此 assets plan / status 不会加载它们
+"""
+
+import importlib
+from typing import Dict, List, Optional, Tuple
+
+from .base import FetchProvider, GenerateProvider, Provider, ProviderError, RenderProvider
+
+# 名称 -> (类型, "模块:类名")；类型为 fetch / generate / render
+REGISTRY: Dict[str, Tuple[str, str]] = {
+    "unsplash": ("fetch", "asset_pipeline.providers.web:Unsplash"),
+    "picsum": ("fetch", "asset_pipeline.providers.web:Picsum"),
+    "placeholder": ("fetch", "asset_pipeline.providers.web:Placeholder"),
+    "openai": ("generate", "asset_pipeline.providers.dalle:OpenAIProvider"),
+    "lovart": ("generate", "asset_pipeline.providers.lovart:LovartProvider"),
+    "local": ("render", "asset_pipeline.providers.local:LocalProvider"),
+}
+
+_instances: Dict[str, Provider] = {}
+
+
+def register(name: str, kind: str, target: str) -> None:
+    """注册（或替换）一个来源，target 形如 "my_package.module:ClassName" """
+    if kind not in ("fetch", "generate", "render"):
+        raise ValueError(f"未知的来源类型: {kind}")
+    REGISTRY[name] = (kind, target)
+    _instances.pop(name, None)
+
+
+def names(kind: Optional[str] = None) -> List[str]:
+    """已注册的来源名称，可以按类型筛选（不会导入插件模块）"""
+    return [name for name, (k, _) in REGISTRY.items() if kind is None or k == kind]
+
+
+def get(name: str, kind: Optional[str] = None) -> Provider:
+    """按名称取得来源实例，首次调用时导入插件模块"""
+    if name not in REGISTRY or (kind and REGISTRY[name][0] != kind):
+        raise ProviderError(f"未知的图片来源: {name}（可选: {', '.join(names(kind))}）")
+    if name not in _instances:
+        module_name, _, attr = REGISTRY[name][1].partition(":")
+        _instances[name] = getattr(importlib.import_module(module_name), attr)()
+    return _instances[name]
+
+
+__all__ = [
+    "REGISTRY",
+    "FetchProvider",
+    "GenerateProvider",
+    "Provider",
+    "ProviderError",
+    "RenderProvider",
+    "get",
+    "names",
+    "register",
+]
@@ -0,0 +1,114 @@
+"""
+图片来源的基类
+- FetchProvider: 从 URL 下载现成图片（Unsplash / Picsum / placeholder.com），可以按顺序组合为后备链
+- GenerateProvider: 调用生成 API（OpenAI / Lovart），结果进入生成结果缓存
+- RenderProvider: 在本地渲染
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from .. import trace
+from ..cache import cache_key
+from ..planner import PlanItem
+from ..verify import check
+
+Log = Callable[[str], None]
+
+
+class ProviderError(Exception):
+    """来源不存在或缺少运行所需的配置（API 密钥、依赖库）"""
+
+
+class Provider:
+    name = ""
+    kind = ""
+    title = ""  # 输出中显示的名称
+
+    def check(self) -> None:
+        """运行前检查配置和依赖，有问题时抛出 ProviderError"""
+
+
+class FetchProvider(Provider):
+    kind = "fetch"
+    timeout = 30
+
+    def url(self, filename: str, config: dict, attempt: int = 0) -> str:
+        """图片地址；attempt 大于 0 时应尽量返回另一张图片（用于替换重复图片）"""
+        raise NotImplementedError
+
+    def download(self, filename: str, config: dict, dest: Path, attempt: int = 0,
+                 cancel: Optional[threading.Event] = None,
+                 on_headers: Optional[Callable[[float], None]] = None):
+        """
+        下载到 dest 并返回（已关闭的）响应，由调用方判断状态码
+        收到成功的响应头时调用 on_headers(首字节耗时)，耗时从拿到主机并发名额开始计算；
+        cancel 被设置后抛出 DownloadCancelled
+        """
+        from .. import transport
+        from ..fetch import host_limiter
+
+        def hook(response, *args, **kwargs):
+            if on_headers is not None and response.ok and not response.is_redirect:
+                on_headers(time.perf_counter() - started)
+
+        url = self.url(filename, config, attempt)
+        with host_limiter.slot(url), trace.span("fetch", asset=filename, provider=self.name) as span:
+            started = time.perf_counter()
+            try:
+                return transport.download(url, dest, timeout=self.timeout, allow_redirects=True,
+                                          cancel=cancel, hooks={"response": hook})
+            except transport.DownloadCancelled:
+                span.set(cancelled=True)
+                raise
+
+    def fetch(self, filename: str, config: dict, dest: Path, log: Log = print, attempt: int = 0) -> bool:
+        """下载到 dest，成功返回 True；失败原因写入 log"""
+        try:
+            response = self.download(filename, config, dest, attempt)
+        except Exception as e:
+            log(f"✗ 下载失败 {filename}: {e}")
+            return False
+        if not response.ok:
+            log(f"✗ 下载失败: {filename} (HTTP {response.status_code})")
+            return False
+        # HTTP 200 也可能是错误页面、其他格式或被截断的内容
+        problem = check(dest, config)
+        if problem:
+            dest.unlink(missing_ok=True)
+            log(f"✗ 下载失败 {filename}: {problem}")
+            return False
+        log(f"✓ 已保存: {filename} ({config['width']}x{config['height']}，来源 {self.title})")
+        return True
+
+
+class GenerateProvider(Provider):
+    kind = "generate"
+    model = ""
+    # API 支持的输出尺寸 (宽, 高)；为空表示任意尺寸。清单尺寸由母版在本地裁切缩放得到（见 masters.py）
+    sizes: Tuple[Tuple[int, int], ...] = ()
+
+    def recipe(self, config: dict) -> str:
+        """生成结果取决于来源、模型、提示词和尺寸"""
+        return cache_key(self.name, self.model, config["prompt"], config["width"], config["height"])
+
+    def generate(self, items: Iterable[PlanItem], images_dir: Path, log: Log = print,
+                 journal=None) -> Iterator[Tuple[PlanItem, Optional[str]]]:
+        """
+        生成并保存图片，逐个产出 (工作项, 错误信息)，成功时错误信息为 None
+        journal（RunJournal）不为 None 时以工作项的配方为键记录每一步，并接管上次未完成的请求
+        """
+        raise NotImplementedError
+
+
+class RenderProvider(Provider):
+    kind = "render"
+
+    def recipe(self, config: dict) -> str:
+        raise NotImplementedError
+
+    def render(self, items: Iterable[PlanItem], images_dir: Path,
+               jobs: Optional[int] = None) -> Iterator[Tuple[PlanItem, Optional[str]]]:
+        raise NotImplementedError
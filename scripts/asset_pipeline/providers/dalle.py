@@ -0,0 +1,77 @@
+"""
+OpenAI DALL-E 3
+需要: pip install openai，并设置环境变量 OPENAI_API_KEY
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .. import trace
+from ..planner import PlanItem
+from .base import GenerateProvider, Log, ProviderError
+
+OPENAI_MODEL = "dall-e-3"
+# DALL·E 3 只接受这三种尺寸
+OPENAI_SIZES = ((1024, 1024), (1792, 1024), (1024, 1792))
+
+
+class OpenAIProvider(GenerateProvider):
+    name = "openai"
+    title = "OpenAI DALL-E"
+    model = OPENAI_MODEL
+    sizes = OPENAI_SIZES
+
+    def check(self) -> None:
+        if not os.getenv("OPENAI_API_KEY"):
+            raise ProviderError("请设置 OPENAI_API_KEY 环境变量\n  例如: export OPENAI_API_KEY='your-api-key'")
+        try:
+            import openai  # noqa: F401
+        except ImportError:
+            raise ProviderError("请先安装 openai 库\n  运行: pip install openai requests") from None
+
+    def generate(self, items: Iterable[PlanItem], images_dir: Path, log: Log = print,
+                 journal=None) -> Iterator[Tuple[PlanItem, Optional[str]]]:
+        from openai import OpenAI
+
+        from .. import transport
+        from ..journal import COMPLETED, DOWNLOADED, FAILED
+
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        for item in items:
+            config = item.config
+            entry = journal.plan(item.recipe, self.name, item.filename) if journal is not None else None
+            try:
+                if entry and entry["state"] in (COMPLETED, DOWNLOADED) and entry["url"]:
+                    # 上次已生成但没有保存下来：图片地址在有效期内（约 1 小时）可以直接下载，不再付费生成
+                    image_url = entry["url"]
+                    log(f"重新下载上次已生成的图片: {item.filename}...")
+                else:
+                    log(f"正在生成: {item.filename}...")
+                    log(f"提示词: {config['prompt'][:100]}...")
+                    with trace.span("generate", asset=item.filename, provider=self.name, model=self.model):
+                        response = client.images.generate(
+                            model=self.model,
+                            prompt=config["prompt"],
+                            size=f"{config['width']}x{config['height']}",
+                            quality="hd",
+                            n=1,
+                        )
+                    image_url = response.data[0].url
+                    log(f"  图片URL: {image_url}")
+                    if journal is not None:
+                        journal.mark(item.recipe, COMPLETED, url=image_url)
+
+                with trace.span("fetch", asset=item.filename, provider=self.name):
+                    img_response = transport.download(image_url, images_dir / item.filename, timeout=60)
+                if not img_response.ok:
+                    raise RuntimeError(f"下载失败 (HTTP {img_response.status_code})")
+            except Exception as e:
+                if journal is not None:
+                    journal.mark(item.recipe, FAILED, error=str(e))
+                yield item, str(e)
+                continue
+            if journal is not None:
+                journal.mark(item.recipe, DOWNLOADED)
+            log(f"✓ 已保存: {item.filename}")
+            yield item, None
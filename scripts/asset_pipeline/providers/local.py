@@ -0,0 +1,37 @@
+"""
+本地渲染的占位图（渐变背景 + 标签文字），不需要网络
+"""
+
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+from ..cache import cache_key
+from ..planner import PlanItem
+from .base import ProviderError, RenderProvider
+
+
+class LocalProvider(RenderProvider):
+    name = "local"
+    title = "本地渲染"
+
+    def check(self) -> None:
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            raise ProviderError("请先安装 Pillow 库\n运行: pip install pillow") from None
+
+    def recipe(self, config: dict) -> str:
+        """本地占位图只取决于标签和尺寸"""
+        return cache_key(self.name, "", config["label"], config["width"], config["height"])
+
+    def render(self, items: Iterable[PlanItem], images_dir: Path,
+               jobs: Optional[int] = None) -> Iterator[Tuple[PlanItem, Optional[str]]]:
+        from ..render import render_many
+
+        items = list(items)
+        render_jobs = [
+            (images_dir / item.filename, item.config["width"], item.config["height"], item.config["label"])
+            for item in items
+        ]
+        for item, (_job, error) in zip(items, render_many(render_jobs, processes=jobs)):
+            yield item, error
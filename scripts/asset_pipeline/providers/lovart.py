@@ -0,0 +1,78 @@
+"""
+Lovart 图片生成 API（见 scripts/LOVART_API_SETUP.md）
+需要设置环境变量 LOVART_API_KEY，可选 LOVART_API_BASE / LOVART_MODEL / LOVART_RATE_LIMIT /
+LOVART_SIZES（API 只支持固定尺寸时设置，例如 "1024x1024,1920x1080"）
+"""
+
+import os
+import uuid
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+from ..cache import cache_key
+from ..planner import PlanItem
+from .base import GenerateProvider, Log, ProviderError
+
+# 与 asset_pipeline.lovart.DEFAULT_RATE_LIMIT 一致；这里不导入该模块，避免加载 requests
+DEFAULT_RATE_LIMIT = 2.0
+
+
+def _parse_sizes(value: str) -> Tuple[Tuple[int, int], ...]:
+    try:
+        return tuple(tuple(int(n) for n in size.strip().lower().split("x", 1))
+                     for size in value.split(",") if size.strip())
+    except ValueError:
+        raise ProviderError(f"LOVART_SIZES 格式错误: {value}（应为 1024x1024,1920x1080）") from None
+
+
+class LovartProvider(GenerateProvider):
+    name = "lovart"
+    title = "Lovart"
+
+    def __init__(self):
+        self.api_base = os.getenv("LOVART_API_BASE", "https://api.lovart.ai/v1")  # 根据实际API地址调整
+        self.api_key = os.getenv("LOVART_API_KEY")
+        self.model = os.getenv("LOVART_MODEL", "")  # 留空则使用API默认模型
+        self.rate_limit = float(os.getenv("LOVART_RATE_LIMIT", DEFAULT_RATE_LIMIT))  # 每秒最多请求数
+        self.sizes = _parse_sizes(os.getenv("LOVART_SIZES", ""))
+
+    def recipe(self, config: dict) -> str:
+        return cache_key(self.name, self.model or "default", config["prompt"], config["width"], config["height"])
+
+    def check(self) -> None:
+        if not self.api_key:
+            raise ProviderError(
+                "未设置 LOVART_API_KEY 环境变量\n"
+                "  export LOVART_API_KEY='your-api-key'\n"
+                "如果API地址不是默认值，也可以设置：\n"
+                "  export LOVART_API_BASE='https://your-api-endpoint.com/v1'\n"
+                f"当前API地址: {self.api_base}"
+            )
+
+    def generate(self, items: Iterable[PlanItem], images_dir: Path, log: Log = print,
+                 journal=None) -> Iterator[Tuple[PlanItem, Optional[str]]]:
+        from ..journal import idempotency_key
+        from ..lovart import Job, LovartClient, LovartScheduler
+
+        items = list(items)
+        log(f"API地址: {self.api_base}\n")
+        # 一次性提交所有任务，统一轮询，完成一张下载一张
+        client = LovartClient(self.api_base, self.api_key, self.model)
+        scheduler = LovartScheduler(client, images_dir, rate_limit=self.rate_limit, log=log, journal=journal)
+        if journal is not None:
+            keys = {}
+            for item in items:
+                entry = journal.plan(item.recipe, self.name, item.filename)
+                keys[item.recipe] = idempotency_key(item.recipe, entry["attempt"])
+        else:
+            # 没有运行日志时无法接管上次的任务，每次运行都是新的尝试
+            keys = {item.recipe: f"{item.recipe}-{uuid.uuid4().hex[:8]}" for item in items}
+        jobs = [
+            Job(item.filename, item.config["prompt"], item.config["width"], item.config["height"],
+                key=item.recipe, idempotency_key=keys[item.recipe])
+            for item in items
+        ]
+        errors = scheduler.run(jobs)
+        log("")
+        for item in items:
+            yield item, errors[item.filename]
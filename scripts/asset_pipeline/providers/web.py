@@ -0,0 +1,51 @@
+"""
+免密钥的在线图片来源
+地址都可以通过环境变量指向本地测试服务器
+"""
+
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+from .base import FetchProvider
+
+UNSPLASH_SOURCE_BASE = os.getenv("UNSPLASH_SOURCE_BASE", "https://source.unsplash.com")
+PICSUM_BASE = os.getenv("PICSUM_BASE", "https://picsum.photos")
+PLACEHOLDER_BASE = os.getenv("PLACEHOLDER_BASE", "https://via.placeholder.com")
+
+
+class Unsplash(FetchProvider):
+    """Unsplash Source API，按搜索词返回随机图片"""
+
+    name = "unsplash"
+    title = "Unsplash"
+
+    def url(self, filename: str, config: dict, attempt: int = 0) -> str:
+        # 格式: https://source.unsplash.com/{width}x{height}/?{search}
+        return f"{UNSPLASH_SOURCE_BASE}/{config['width']}x{config['height']}/?{config['search'].replace(' ', ',')}"
+
+
+class Picsum(FetchProvider):
+    """Lorem Picsum，按文件名生成固定种子，不同文件拿到不同的图片，重复运行结果稳定"""
+
+    name = "picsum"
+    title = "Picsum Photos"
+
+    def url(self, filename: str, config: dict, attempt: int = 0) -> str:
+        stem = Path(filename).stem
+        seed = stem if attempt == 0 else f"{stem}-{attempt}"
+        return f"{PICSUM_BASE}/seed/{seed}/{config['width']}/{config['height']}"
+
+
+class Placeholder(FetchProvider):
+    """placeholder.com 纯色占位图，图上显示占位标签"""
+
+    name = "placeholder"
+    title = "placeholder.com"
+    timeout = 10
+
+    def url(self, filename: str, config: dict, attempt: int = 0) -> str:
+        # 不带扩展名时 placeholder.com 返回 PNG，按目标文件的格式请求，否则无法通过格式校验
+        ext = Path(filename).suffix.lstrip(".").lower().replace("jpeg", "jpg") or "jpg"
+        return (f"{PLACEHOLDER_BASE}/{config['width']}x{config['height']}.{ext}/666666/ffffff"
+                f"?text={quote(config['label'])}")
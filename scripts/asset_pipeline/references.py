@@ -0,0 +1,143 @@
+"""
+源码引用索引
+扫描 app/、components/、lib/ 下的源码（ts/tsx/js/css/json 等），找出引用了哪些 /images/ 下的图片、
+分别在哪些文件的哪一行。索引保存在 .cache/images/references.json，
+再次扫描时只重新解析 mtime 或大小变化的文件，其余直接复用。
+流水线据此只构建实际被引用的图片（引用多的优先），并报告缺失的图片和没人使用的图片
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import ROOT_DIR
+from .cache import CACHE_DIR
+from .storage import atomic_write
+
+INDEX_PATH = CACHE_DIR / "references.json"
+INDEX_VERSION = 1
+
+DEFAULT_SETTINGS = {
+    "sources": ["app", "components", "lib"],
+    "extensions": [".tsx", ".ts", ".jsx", ".js", ".mjs", ".cjs", ".css", ".scss", ".json",
+                   ".prisma", ".html", ".md", ".mdx", ".yml", ".yaml"],
+    # 相对仓库根目录的文件或目录；指纹地址映射列出了所有图片，不代表源码在使用它们
+    "exclude": ["lib/image-manifest.json"],
+}
+
+DEFAULT_JOBS = 8
+
+# 不进入的目录
+SKIP_DIRS = {"node_modules", ".next", ".git", ".cache", ".vercel", "__pycache__", ".pytest_cache"}
+
+# 只匹配写死的路径（"/images/case-ai.jpg" 或 "public/images/..."），拼接出来的动态路径无法静态分析；
+# 前面不能紧跟字母数字，避免把 "contents/images/..." 这样的存储键当作图片引用
+IMAGE_REF = re.compile(
+    r"(?<![\w-])(?:public)?/images/((?:[\w.-]+/)*[\w.-]+\.(?:jpe?g|png|webp|gif|avif|svg))\b",
+    re.IGNORECASE,
+)
+
+
+def scan_file(path: Path) -> Dict[str, List[int]]:
+    """返回 {图片文件名（相对 public/images）: [行号...]}"""
+    refs: Dict[str, List[int]] = {}
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return refs
+    if "/images/" not in text:
+        return refs
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if "/images/" not in line:
+            continue
+        for match in IMAGE_REF.finditer(line):
+            refs.setdefault(match.group(1), []).append(lineno)
+    return refs
+
+
+class ReferenceIndex:
+    """{源文件相对路径: {mtime_ns, size, refs}}，按 mtime 增量更新"""
+
+    def __init__(self, root: Path = ROOT_DIR, path: Path = INDEX_PATH, settings: Optional[dict] = None):
+        self.root = Path(root)
+        self.path = Path(path)
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        # 扫描范围变了之后旧索引可能缺文件，直接重建
+        if data.get("version") == INDEX_VERSION and data.get("settings") == self.settings:
+            self.files: Dict[str, dict] = data.get("files", {})
+        else:
+            self.files = {}
+
+    def _walk(self) -> Dict[str, os.stat_result]:
+        extensions = tuple(self.settings["extensions"])
+        exclude = {e.strip("/") for e in self.settings["exclude"]}
+
+        def excluded(rel: str) -> bool:
+            return any(rel == e or rel.startswith(e + "/") for e in exclude)
+
+        found = {}
+        for source in self.settings["sources"]:
+            for directory, dirs, files in os.walk(self.root / source):
+                dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+                for name in files:
+                    if name.endswith(extensions):
+                        path = os.path.join(directory, name)
+                        rel = os.path.normpath(os.path.relpath(path, self.root)).replace(os.sep, "/")
+                        if not excluded(rel):
+                            found[rel] = os.stat(path)
+        return found
+
+    def update(self, jobs: int = DEFAULT_JOBS) -> Tuple[int, int]:
+        """扫描源码目录，只重新解析有变化的文件，返回 (源文件总数, 重新解析的文件数)"""
+        found = self._walk()
+        changed = []
+        for rel, st in found.items():
+            entry = self.files.get(rel)
+            if entry is None or entry["mtime_ns"] != st.st_mtime_ns or entry["size"] != st.st_size:
+                changed.append(rel)
+        removed = self.files.keys() - found.keys()
+        for rel in removed:
+            del self.files[rel]
+        if changed:
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                for rel, refs in zip(changed, pool.map(lambda rel: scan_file(self.root / rel), changed)):
+                    st = found[rel]
+                    self.files[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "refs": refs}
+        self.dirty = self.dirty or bool(changed or removed)
+        return len(found), len(changed)
+
+    def usage(self) -> Dict[str, List[str]]:
+        """{图片文件名: ["源文件:行号", ...]}，按引用次数从多到少排序"""
+        result: Dict[str, List[str]] = {}
+        for rel in sorted(self.files):
+            for image, lines in self.files[rel]["refs"].items():
+                result.setdefault(image, []).extend(f"{rel}:{line}" for line in lines)
+        return dict(sorted(result.items(), key=lambda item: (-len(item[1]), item[0])))
+
+    def counts(self) -> Dict[str, int]:
+        return {image: len(places) for image, places in self.usage().items()}
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        data = {"version": INDEX_VERSION, "settings": self.settings, "files": self.files}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.path) as f:
+            f.write(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        self.dirty = False
+
+
+def reference_counts(settings: Optional[dict] = None) -> Dict[str, int]:
+    """增量更新并保存索引，返回 {图片文件名: 引用次数}"""
+    index = ReferenceIndex(settings=settings)
+    index.update()
+    index.save()
+    return index.counts()
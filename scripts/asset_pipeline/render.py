@@ -0,0 +1,148 @@
+"""
+本地占位图渲染
+背景渐变一次性生成为 1 像素宽的列再横向拉伸，不再逐行调用 draw.line；
+只与尺寸有关的背景（渐变 + 装饰圆）按尺寸缓存，同尺寸的图片只需复制后绘制文字。
+标签的字体和排版由 fonts.py 查找并缓存（支持中文标签）。
+render_many() 用进程池并行渲染和编码（都是 CPU 密集型，线程受 GIL 限制）
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from . import fonts, trace
+from .storage import atomic_write
+
+# (输出路径, 宽, 高, 标签)
+RenderJob = Tuple[Path, int, int, str]
+
+JPEG_QUALITY = 85
+
+# 配色方案
+COLORS = {
+    "primary": (255, 107, 53),  # 橙色 #FF6B35
+    "secondary": (150, 102, 255),  # 紫色 #9666FF
+    "dark": (18, 18, 18),  # 深色背景
+    "text": (255, 255, 255),  # 白色文字
+}
+
+
+def gradient_column(height: int) -> bytes:
+    """从深色到稍亮的竖直渐变，返回 1 x height 的 RGB 像素数据"""
+    dark, secondary = COLORS["dark"], COLORS["secondary"]
+    return bytes(
+        int(d + s * 0.1 * (y / height))
+        for y in range(height)
+        for d, s in zip(dark, secondary)
+    )
+
+
+@lru_cache(maxsize=32)
+def _background(width: int, height: int) -> Image.Image:
+    """渐变背景 + 装饰性几何图形（按尺寸缓存，调用方需 copy() 后再修改）"""
+    column = Image.frombytes("RGB", (1, height), gradient_column(height))
+    img = column.resize((width, height), Image.NEAREST)
+    draw = ImageDraw.Draw(img)
+
+    # 圆形
+    circle_size = min(width, height) // 4
+    draw.ellipse(
+        [(width // 4, height // 4), (width // 4 + circle_size, height // 4 + circle_size)],
+        outline=COLORS["primary"],
+        width=3
+    )
+    draw.ellipse(
+        [(width * 3 // 4 - circle_size, height * 3 // 4 - circle_size),
+         (width * 3 // 4, height * 3 // 4)],
+        outline=COLORS["secondary"],
+        width=3
+    )
+    return img
+
+
+def label_size(width: int, height: int) -> int:
+    """标签的字号"""
+    return max(1, min(width, height) // 15)
+
+
+def render_placeholder(width: int, height: int, label: str) -> Image.Image:
+    """渲染一张占位图片"""
+    img = _background(width, height).copy()
+    draw = ImageDraw.Draw(img)
+
+    # 标签太长时缩小字号，左右各留 5% 的边距
+    font, bbox = fonts.fit_font(label, label_size(width, height), width * 9 // 10)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+
+    # 居中显示文字（包围盒相对绘制原点有偏移）
+    text_x = (width - text_width) // 2 - bbox[0]
+    text_y = (height - text_height) // 2 - bbox[1]
+
+    # 添加文字阴影
+    draw.text((text_x + 2, text_y + 2), label, fill=(0, 0, 0, 128), font=font)
+    draw.text((text_x, text_y), label, fill=COLORS["text"], font=font)
+    return img
+
+
+def render_to_file(output_path: Path, width: int, height: int, label: str,
+                   quality: int = JPEG_QUALITY) -> None:
+    """渲染并原子写入 JPEG"""
+    asset = output_path.name
+    with trace.span("generate", asset=asset, provider="local"):
+        img = render_placeholder(width, height, label)
+    with trace.span("encode", asset=asset, format="jpeg") as span:
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=quality)
+        span.set(bytes=buf.tell())
+    with trace.span("write", asset=asset, bytes=buf.tell()):
+        with atomic_write(output_path) as f:
+            f.write(buf.getbuffer())
+
+
+def _render_job(job: RenderJob) -> Tuple[Optional[str], List[dict]]:
+    """进程池中执行的任务，异常转换为错误信息，连同 trace span 一起返回给父进程"""
+    with trace.tracer.capture() as spans:
+        try:
+            render_to_file(*job)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return error, spans
+
+
+def _init_worker(faces: dict, labels: List[Tuple[str, int]]) -> None:
+    """每个工作进程启动时接收父进程查找到的字体，并预先加载本批次需要的字体"""
+    fonts.preload(faces)
+    for label, size in labels:
+        fonts.font_for(label, size)
+
+
+def render_many(jobs: Iterable[RenderJob], processes: Optional[int] = None) -> Iterator[Tuple[RenderJob, Optional[str]]]:
+    """
+    批量渲染，按 jobs 的顺序产出 (job, 错误信息)，成功时错误信息为 None
+    processes 为 1 时在当前进程内执行，默认使用全部 CPU 核心
+    """
+    jobs = list(jobs)
+    processes = min(processes or os.cpu_count() or 1, len(jobs) or 1)
+    if processes <= 1:
+        for job in jobs:
+            error, spans = _render_job(job)
+            trace.tracer.ingest(spans)
+            yield job, error
+        return
+
+    # 同一类字体、同一字号只需加载一次；标签只用来区分拉丁 / CJK 字体
+    labels = {(fonts.needs_cjk(label), label_size(width, height)): label for _, width, height, label in jobs}
+    initargs = (fonts.faces(), [(label, size) for (_, size), label in sorted(labels.items())])
+    # 每个进程一次领取一批任务，减少进程间通信开销
+    chunksize = max(1, len(jobs) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=initargs) as pool:
+        for job, (error, spans) in zip(jobs, pool.map(_render_job, jobs, chunksize=chunksize)):
+            trace.tracer.ingest(spans)
+            yield job, error
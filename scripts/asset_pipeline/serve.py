@@ -0,0 +1,199 @@
+"""
+本地占位图服务
+用 render.render_placeholder 按需渲染占位图，代替 via.placeholder.com（需要联网、经常不可用、CI 中无法访问）。
+支持的路径:
+  /{宽}x{高}/{标签}.{jpg,webp,png}
+  /{宽}x{高}.{jpg,webp,png}                      标签为尺寸本身
+  /{宽}x{高}[.jpg]/666666/ffffff?text={标签}      placeholder.com 的格式（颜色参数忽略），
+                                                 设置 PLACEHOLDER_BASE 指向本服务即可直接使用
+编码后的字节保存在按总大小限制的 LRU 缓存中，命中时不再渲染和编码；
+同一张图片同时被多个请求访问时只渲染一次。响应带 ETag，If-None-Match 命中时返回 304
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8790
+DEFAULT_CACHE_MB = 64
+
+# 超过这个边长的请求直接拒绝，避免一个请求占满内存
+MAX_SIDE = 4096
+MAX_LABEL = 100
+
+CONTENT_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+EXTENSION_FORMATS = {"jpg": "jpeg", "jpeg": "jpeg", "webp": "webp", "png": "png"}
+ENCODE_OPTIONS = {
+    "jpeg": {"quality": 85},
+    "webp": {"quality": 80, "method": 4},
+    "png": {"compress_level": 6},
+}
+
+# 渲染结果只由参数决定，浏览器可以缓存一天（渲染样式改了之后 ETag 会变）
+CACHE_CONTROL = "public, max-age=86400"
+
+_SIZE = re.compile(r"^(\d{1,5})x(\d{1,5})(?:\.(\w+))?$")
+
+Key = Tuple[int, int, str, str]  # (宽, 高, 标签, 格式)
+
+
+class Rendered(NamedTuple):
+    body: bytes
+    etag: str
+    content_type: str
+
+
+def parse_path(target: str) -> Optional[Key]:
+    """把请求路径解析为 (宽, 高, 标签, 格式)，不认识的路径返回 None，参数超出范围时抛出 ValueError"""
+    parts = urlsplit(target)
+    segments = [unquote(s) for s in parts.path.split("/") if s]
+    if not segments:
+        return None
+    match = _SIZE.match(segments[0])
+    if not match:
+        return None
+    width, height = int(match.group(1)), int(match.group(2))
+    extension = match.group(3)
+    label = f"{width}x{height}"
+    text = parse_qs(parts.query).get("text")
+    if text:
+        label = text[0]
+    elif len(segments) == 2 and "." in segments[1]:
+        label, extension = segments[1].rsplit(".", 1)
+    elif len(segments) > 1:
+        return None
+
+    fmt = EXTENSION_FORMATS.get((extension or "jpg").lower())
+    if fmt is None:
+        raise ValueError(f"不支持的格式: {extension}")
+    if not (1 <= width <= MAX_SIDE and 1 <= height <= MAX_SIDE):
+        raise ValueError(f"尺寸超出范围（1-{MAX_SIDE}）")
+    if len(label) > MAX_LABEL:
+        raise ValueError(f"标签太长（最多 {MAX_LABEL} 个字符）")
+    return width, height, label, fmt
+
+
+def render_bytes(width: int, height: int, label: str, fmt: str) -> Rendered:
+    import io
+
+    from .render import render_placeholder
+
+    buf = io.BytesIO()
+    render_placeholder(width, height, label).save(buf, fmt.upper(), **ENCODE_OPTIONS[fmt])
+    body = buf.getvalue()
+    return Rendered(body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"', CONTENT_TYPES[fmt])
+
+
+class ByteCache:
+    """按编码后字节总数限制大小的 LRU 缓存，同一个键同时只渲染一次；线程安全"""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Key, Rendered]" = OrderedDict()
+        self._inflight: Dict[Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Key) -> Optional[Rendered]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def get(self, key: Key) -> Rendered:
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            render_lock = self._inflight.setdefault(key, threading.Lock())
+        with render_lock:
+            # 等锁期间其他请求可能已经渲染好了
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+            try:
+                entry = render_bytes(*key)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+            self._store(key, entry)
+            return entry
+
+    def _store(self, key: Key, entry: Rendered) -> None:
+        with self._lock:
+            self.misses += 1
+            if len(entry.body) > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.size += len(entry.body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.body)
+
+
+class PlaceholderServer(ThreadingHTTPServer):
+    """每个连接一个线程；渲染和编码主要在 Pillow 的 C 代码中进行"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], cache: Optional[ByteCache] = None):
+        super().__init__(address, PlaceholderHandler)
+        self.cache = cache or ByteCache()
+
+
+class PlaceholderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分两次写出，开着 Nagle 算法时保持连接的请求会多等一个延迟 ACK（约 40ms）
+    disable_nagle_algorithm = True
+    server: PlaceholderServer
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None,
+              include_body: bool = True) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:  # 304 没有响应体
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body and body:
+            self.wfile.write(body)
+
+    def _error(self, status: int, message: str, include_body: bool = True) -> None:
+        self._send(status, message.encode("utf-8"), {"Content-Type": "text/plain; charset=utf-8"}, include_body)
+
+    def do_GET(self, include_body: bool = True) -> None:
+        try:
+            key = parse_path(self.path)
+        except ValueError as e:
+            return self._error(400, str(e), include_body)
+        if key is None:
+            return self._error(404, "路径格式: /{宽}x{高}/{标签}.{jpg,webp,png}", include_body)
+
+        try:
+            entry = self.server.cache.get(key)
+        except Exception as e:
+            return self._error(500, f"渲染失败: {type(e).__name__}: {e}", include_body)
+        headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+        if entry.etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            return self._send(304, headers=headers)
+        self._send(200, entry.body, {**headers, "Content-Type": entry.content_type}, include_body)
+
+    def do_HEAD(self) -> None:
+        self.do_GET(include_body=False)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, cache_mb: int = DEFAULT_CACHE_MB) -> PlaceholderServer:
+    """创建服务（未开始处理请求），调用方负责 serve_forever() / shutdown()"""
+    return PlaceholderServer((host, port), ByteCache(cache_mb * 1024 * 1024))
@@ -0,0 +1,56 @@
+"""
+文件写入工具
+所有图片都先写入同目录下的临时文件，fsync 后再原子重命名到目标路径，
+进程中途被杀掉也不会在 public/images 留下半截文件
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Union
+
+PathLike = Union[str, Path]
+
+
+def fsync_dir(directory: PathLike) -> None:
+    """把目录项的变更（新建/重命名）刷到磁盘"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Windows 不支持打开目录
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def commit_file(tmp_path: PathLike, dest: PathLike) -> None:
+    """把已写完并 fsync 过的临时文件原子替换到目标路径"""
+    os.replace(tmp_path, dest)
+    fsync_dir(Path(dest).parent)
+
+
+@contextmanager
+def atomic_write(dest: PathLike) -> Iterator[BinaryIO]:
+    """
+    以二进制方式写入 dest：with 块正常结束时原子替换，出错时删除临时文件
+    用法: with atomic_write(path) as f: img.save(f, 'JPEG')
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{dest.name}.", suffix=".tmp", dir=dest.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        commit_file(tmp_path, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,113 @@
+"""
+测试公共设施
+- 把 scripts/ 加入 sys.path，测试以 asset_pipeline 包的形式导入流水线
+- 缓存目录指向临时目录，测试不会读写仓库里的 .cache/images
+- fake_server 在本机随机端口启动 http.server，按路径返回预设的响应，并记录收到的请求
+"""
+
+import io
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("ASSET_CACHE_DIR", tempfile.mkdtemp(prefix="asset-cache-"))
+
+from asset_pipeline.providers.base import FetchProvider  # noqa: E402
+
+
+def jpeg_bytes(width: int = 64, height: int = 48, color: str = "red") -> bytes:
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+class FakeServer:
+    """
+    routes 为 {路径: 处理函数}，处理函数接收 BaseHTTPRequestHandler 并自行写出响应；
+    requests 按顺序记录 (方法, 路径, 请求头)
+    """
+
+    def __init__(self):
+        self.routes: Dict[str, Callable[[BaseHTTPRequestHandler], None]] = {}
+        self.requests: List[tuple] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                server.requests.append((self.command, self.path, dict(self.headers)))
+                # 读完请求体，否则长连接上的下一个请求会从请求体中间开始解析
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                route = server.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                route(self)
+
+            do_GET = do_POST = _handle
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def url(self, path: str) -> str:
+        return self.base + path
+
+    def paths(self) -> List[str]:
+        return [path for _, path, _ in self.requests]
+
+
+def reply(handler: BaseHTTPRequestHandler, status: int, body: bytes = b"", **headers) -> None:
+    """写出完整响应；headers 的键用下划线代替连字符，例如 Retry_After="3" """
+    handler.send_response(status)
+    for name, value in headers.items():
+        handler.send_header(name.replace("_", "-"), value)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+class FakeProvider(FetchProvider):
+    """从 fake_server 的 /{name}/{文件名} 下载"""
+
+    def __init__(self, server: FakeServer, name: str):
+        self.server = server
+        self.name = self.title = name
+
+    def url(self, filename, config, attempt=0):
+        return self.server.url(f"/{self.name}/{filename}")
+
+
+@pytest.fixture
+def fake_server():
+    server = FakeServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录退避等待的秒数而不真正等待"""
+    from asset_pipeline import transport
+
+    recorded: List[float] = []
+    monkeypatch.setattr(transport.time, "sleep", recorded.append)
+    return recorded
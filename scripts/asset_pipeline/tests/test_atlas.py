@@ -0,0 +1,43 @@
+"""图集装箱：所有矩形互不重叠，且都在图集范围内"""
+
+import random
+
+import pytest
+
+from asset_pipeline.atlas import pack, skyline_pack
+
+
+def assert_no_overlap(placements, sizes, width, height):
+    boxes = [(p.x, p.y, p.x + w, p.y + h) for p, (w, h) in zip(placements, sizes)]
+    for x0, y0, x1, y1 in boxes:
+        assert 0 <= x0 and x1 <= width and 0 <= y0 and y1 <= height
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1], (a, b)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_pack_never_overlaps(seed):
+    rng = random.Random(seed)
+    sizes = [(rng.randint(8, 200), rng.randint(8, 200)) for _ in range(rng.randint(1, 40))]
+
+    placements, width, height = pack(sizes, max_width=1024)
+
+    assert len(placements) == len(sizes)
+    assert_no_overlap(placements, sizes, width, height)
+
+
+def test_skyline_fills_gaps_bottom_left():
+    sizes = [(60, 40), (40, 20), (40, 20)]
+
+    placements, height = skyline_pack(sizes, 100)
+
+    # 两个矮块叠放在高块右侧，不增加总高度
+    assert placements == [(0, 0), (60, 0), (60, 20)]
+    assert height == 40
+    assert_no_overlap(placements, sizes, 100, height)
+
+
+def test_pack_rejects_too_wide_images():
+    with pytest.raises(ValueError):
+        pack([(300, 10)], max_width=256)
@@ -0,0 +1,45 @@
+"""生成结果缓存：最近使用时间的保存和固定对象"""
+
+from asset_pipeline.cache import AssetCache
+
+
+def put(cache, tmp_path, key, size=100):
+    src = tmp_path / f"{key}.src"
+    src.write_bytes(b"x" * size)
+    cache.put(key, src)
+
+
+def test_get_touch_is_saved_on_close(tmp_path):
+    cache = AssetCache(tmp_path / "cache")
+    put(cache, tmp_path, "a")
+    before = cache.entries["a"]["last_used"]
+
+    with AssetCache(tmp_path / "cache") as reader:
+        assert reader.get("a") is not None
+    assert AssetCache(tmp_path / "cache").entries["a"]["last_used"] > before
+
+
+def test_touched_entry_survives_eviction_in_next_run(tmp_path):
+    with AssetCache(tmp_path / "cache", max_bytes=250) as cache:
+        put(cache, tmp_path, "a")
+        put(cache, tmp_path, "b")
+    with AssetCache(tmp_path / "cache", max_bytes=250) as cache:
+        cache.get("a")
+    with AssetCache(tmp_path / "cache", max_bytes=250) as cache:
+        put(cache, tmp_path, "c")
+        assert set(cache.entries) == {"a", "c"}
+
+
+def test_pinned_entries_are_not_evicted_until_close(tmp_path):
+    cache = AssetCache(tmp_path / "cache", max_bytes=250)
+    put(cache, tmp_path, "master")
+    cache.pin(["master"])
+    put(cache, tmp_path, "b")
+    put(cache, tmp_path, "c")
+
+    assert cache.get("master") is not None
+    assert "b" not in cache.entries
+
+    cache.close()
+    assert sum(entry["size"] for entry in cache.entries.values()) <= 250
+    assert AssetCache(tmp_path / "cache").entries.keys() == cache.entries.keys()
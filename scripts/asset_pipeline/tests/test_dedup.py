@@ -0,0 +1,57 @@
+"""重复图片检测：--fix 只替换从在线图库下载的清单图片"""
+
+from PIL import Image
+
+from asset_pipeline import cli, providers
+from asset_pipeline.dedup import DedupIndex
+from asset_pipeline.planner import BuildState
+
+
+def test_fix_refuses_other_directories(tmp_path, capsys):
+    assert cli.main(["dedup", str(tmp_path), "--fix"]) == 1
+    assert "--fix 只能用于" in capsys.readouterr().out
+
+
+def test_fix_only_refetches_downloaded_images(tmp_path, monkeypatch):
+    images = tmp_path / "images"
+    images.mkdir()
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        Image.new("RGB", (64, 48), "red").save(images / name)
+    state = BuildState()
+    state.record("b.jpg", "fetch", None, images / "b.jpg", provider="picsum")
+    state.record("c.jpg", "lovart", "recipe", images / "c.jpg")
+    state.save()
+
+    refetched = []
+
+    def fetch(filename, config, dest, log=print, attempt=0):
+        refetched.append(filename)
+        Image.new("RGB", (64, 48), "blue").save(dest)
+        return True
+
+    config = {"width": 64, "height": 48}
+    monkeypatch.setattr(cli, "IMAGES_DIR", images)
+    monkeypatch.setattr(cli, "load_manifest", lambda: {name: config for name in ("a.jpg", "b.jpg", "c.jpg")})
+    monkeypatch.setattr(providers.get("picsum"), "fetch", fetch)
+
+    assert cli.main(["dedup", str(images), "--fix"]) == 1  # c.jpg 仍与 a.jpg 重复
+    assert refetched == ["b.jpg"]
+    assert BuildState().entries["c.jpg"]["provider"] == "lovart"
+
+
+def test_index_keeps_entries_from_other_roots(tmp_path):
+    roots = [tmp_path / "one", tmp_path / "two"]
+    for root, color in zip(roots, ("red", "blue")):
+        root.mkdir()
+        Image.new("RGB", (64, 48), color).save(root / "a.jpg")
+    index = DedupIndex(tmp_path / "index.json")
+
+    first = index.update(roots[0], [roots[0] / "a.jpg"])
+    second = index.update(roots[1], [roots[1] / "a.jpg"])
+
+    # 两个目录中同名的文件各有一个条目，扫描第二个目录不会覆盖第一个
+    assert first != second
+    assert index.entries[first[0]]["sha256"] != index.entries[second[0]]["sha256"]
+    (roots[1] / "a.jpg").unlink()
+    index.update(roots[1], [])
+    assert list(index.entries) == first
@@ -0,0 +1,36 @@
+"""响应式衍生图：文件名不冲突、增量生成和清理"""
+
+from PIL import Image
+
+from asset_pipeline.derivatives import build_derivatives
+
+SETTINGS = {"widths": [16], "formats": ["jpeg"]}
+
+
+def build(images_dir, **kwargs):
+    return {name: status for name, status, _ in
+            build_derivatives(images_dir, settings=SETTINGS, processes=1, **kwargs)}
+
+
+def test_same_stem_different_extension_do_not_collide(tmp_path):
+    images = tmp_path / "public" / "images"
+    images.mkdir(parents=True)
+    Image.new("RGB", (32, 32), "red").save(images / "foo.jpg")
+    Image.new("RGB", (32, 32), "blue").save(images / "foo.png")
+
+    assert build(images) == {"foo.jpg": "built", "foo.png": "built"}
+    outputs = sorted(p.name for p in (images / "responsive").glob("foo-*"))
+    assert outputs == ["foo-jpg-16w.jpg", "foo-png-16w.jpg"]
+    assert Image.open(images / "responsive" / "foo-png-16w.jpg").getpixel((8, 8))[2] > 200
+
+
+def test_unchanged_masters_are_fresh_and_removed_masters_cleaned(tmp_path):
+    images = tmp_path / "public" / "images"
+    images.mkdir(parents=True)
+    Image.new("RGB", (32, 32)).save(images / "a.jpg")
+    build(images)
+
+    assert build(images) == {"a.jpg": "fresh"}
+    (images / "a.jpg").unlink()
+    assert build(images) == {"a.jpg": "removed"}
+    assert not (images / "responsive" / "a-jpg-16w.jpg").exists()
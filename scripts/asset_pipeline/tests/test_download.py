@@ -0,0 +1,119 @@
+"""transport.download：流式写入、.part 断点续传和重新下载"""
+
+import json
+
+import pytest
+import requests
+
+from asset_pipeline import transport
+
+from .conftest import jpeg_bytes, reply
+
+DATA = jpeg_bytes()
+ETAG = '"v1"'
+
+
+def ranged(handler, etag=ETAG):
+    """支持 Range / If-Range 的静态文件"""
+    start = 0
+    status = 200
+    headers = {"ETag": etag, "Content_Type": "image/jpeg"}
+    requested = handler.headers.get("Range")
+    if requested and handler.headers.get("If-Range") in (None, etag):
+        start = int(requested[len("bytes="):].rstrip("-"))
+        if start >= len(DATA):
+            reply(handler, 416, Content_Range=f"bytes */{len(DATA)}")
+            return
+        status = 206
+        headers["Content_Range"] = f"bytes {start}-{len(DATA) - 1}/{len(DATA)}"
+    reply(handler, status, DATA[start:], **headers)
+
+
+def leave_part(dest, url, size, validator=ETAG):
+    """模拟上次中断的下载留下的半截文件"""
+    part, meta = dest.with_name(dest.name + ".part"), dest.with_name(dest.name + ".part.json")
+    part.write_bytes(DATA[:size])
+    meta.write_text(json.dumps({"url": url, "validator": validator}))
+    return part, meta
+
+
+def test_download_writes_file_and_cleans_up(fake_server, tmp_path):
+    fake_server.routes["/a.jpg"] = ranged
+    dest = tmp_path / "a.jpg"
+
+    response = transport.download(fake_server.url("/a.jpg"), dest)
+
+    assert response.status_code == 200
+    assert dest.read_bytes() == DATA
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.jpg"]
+
+
+def test_download_resumes_from_part_file(fake_server, tmp_path):
+    fake_server.routes["/a.jpg"] = ranged
+    dest = tmp_path / "a.jpg"
+    part, meta = leave_part(dest, fake_server.url("/a.jpg"), 100)
+
+    response = transport.download(fake_server.url("/a.jpg"), dest)
+
+    assert response.status_code == 206
+    headers = fake_server.requests[0][2]
+    assert headers["Range"] == "bytes=100-" and headers["If-Range"] == ETAG
+    assert dest.read_bytes() == DATA
+    assert not part.exists() and not meta.exists()
+
+
+def test_download_restarts_when_file_changed(fake_server, tmp_path):
+    # If-Range 不匹配时服务端返回完整的 200，半截文件作废
+    fake_server.routes["/a.jpg"] = lambda handler: ranged(handler, etag='"v2"')
+    dest = tmp_path / "a.jpg"
+    leave_part(dest, fake_server.url("/a.jpg"), 100)
+
+    assert transport.download(fake_server.url("/a.jpg"), dest).status_code == 200
+    assert dest.read_bytes() == DATA
+
+
+def test_download_restarts_after_416(fake_server, tmp_path):
+    fake_server.routes["/a.jpg"] = ranged
+    dest = tmp_path / "a.jpg"
+    part, _ = leave_part(dest, fake_server.url("/a.jpg"), len(DATA))
+    part.write_bytes(DATA + b"stale")
+
+    assert transport.download(fake_server.url("/a.jpg"), dest).status_code == 200
+    assert dest.read_bytes() == DATA
+    assert [h.get("Range") for _, _, h in fake_server.requests] == [f"bytes={len(DATA) + 5}-", None]
+
+
+def test_truncated_download_keeps_part_for_resume(fake_server, tmp_path):
+    def truncated(handler):
+        handler.send_response(200)
+        handler.send_header("ETag", ETAG)
+        handler.send_header("Content-Length", str(len(DATA)))
+        handler.end_headers()
+        handler.wfile.write(DATA[:200])
+        handler.close_connection = True
+
+    fake_server.routes["/a.jpg"] = truncated
+    dest = tmp_path / "a.jpg"
+
+    with pytest.raises(requests.RequestException):
+        transport.download(fake_server.url("/a.jpg"), dest, chunk_size=64, retries=0)
+    assert not dest.exists()
+    received = dest.with_name("a.jpg.part").read_bytes()
+    assert received and DATA.startswith(received)
+    assert transport.resumable(dest)
+
+    fake_server.routes["/a.jpg"] = ranged
+    transport.download(fake_server.url("/a.jpg"), dest)
+    assert fake_server.requests[-1][2]["Range"] == f"bytes={len(received)}-"
+    assert dest.read_bytes() == DATA
+
+
+def test_part_without_validator_is_not_resumed(fake_server, tmp_path):
+    fake_server.routes["/a.jpg"] = ranged
+    dest = tmp_path / "a.jpg"
+    dest.with_name("a.jpg.part").write_bytes(b"junk")
+
+    assert not transport.resumable(dest)
+    transport.download(fake_server.url("/a.jpg"), dest)
+    assert "Range" not in fake_server.requests[0][2]
+    assert dest.read_bytes() == DATA
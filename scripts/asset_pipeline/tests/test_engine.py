@@ -0,0 +1,60 @@
+"""并发下载引擎：结果按提交顺序产出，每个主机的并发不超过上限"""
+
+import threading
+
+from asset_pipeline import transport
+from asset_pipeline.fetch import HostLimiter, run_ordered
+
+from .conftest import reply
+
+
+class Tracker:
+    """记录服务器同时处理中的请求数的峰值"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def route(self, delay: float):
+        def handle(handler):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            threading.Event().wait(delay)
+            with self.lock:
+                self.active -= 1
+            reply(handler, 200, handler.path.encode())
+
+        return handle
+
+
+def test_run_ordered_yields_in_submission_order(fake_server):
+    tracker = Tracker()
+    paths = [f"/img/{i}" for i in range(6)]
+    for i, path in enumerate(paths):
+        # 越靠前的请求越慢，完成顺序与提交顺序相反
+        fake_server.routes[path] = tracker.route(0.02 * (len(paths) - i))
+
+    results = list(run_ordered(paths, lambda path: transport.get(fake_server.url(path)).text, concurrency=6))
+
+    assert results == [(path, path) for path in paths]
+    assert tracker.peak > 1
+
+
+def test_host_limiter_caps_concurrent_requests_per_host(fake_server):
+    tracker = Tracker()
+    paths = [f"/img/{i}" for i in range(8)]
+    for path in paths:
+        fake_server.routes[path] = tracker.route(0.05)
+    limiter = HostLimiter(limits={}, default=2)
+
+    def worker(path):
+        url = fake_server.url(path)
+        with limiter.slot(url):
+            return transport.get(url).status_code
+
+    results = list(run_ordered(paths, worker, concurrency=8))
+
+    assert [status for _, status in results] == [200] * len(paths)
+    assert tracker.peak == 2
@@ -0,0 +1,81 @@
+"""下载来源：HTTP 200 但不是清单要求的图片时视为失败"""
+
+import io
+import threading
+
+from PIL import Image
+
+from .conftest import FakeProvider, jpeg_bytes, reply
+
+CONFIG = {"width": 64, "height": 48}
+DATA = jpeg_bytes(**CONFIG)
+
+
+def serve(handler, body=DATA, content_type="image/jpeg"):
+    reply(handler, 200, body, Content_Type=content_type, ETag='"v1"')
+
+
+def test_fetch_rejects_html_error_page(fake_server, tmp_path):
+    fake_server.routes["/web/a.jpg"] = lambda h: serve(h, b"<html>rate limited</html>", "text/html")
+    dest = tmp_path / "a.jpg"
+    logs = []
+
+    assert not FakeProvider(fake_server, "web").fetch("a.jpg", CONFIG, dest, log=logs.append)
+    assert not dest.exists()
+    assert "不是图片" in logs[-1]
+
+
+def test_fetch_rejects_wrong_format(fake_server, tmp_path):
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 48)).save(buf, "PNG")
+    fake_server.routes["/web/a.jpg"] = lambda h: serve(h, buf.getvalue(), "image/png")
+    dest = tmp_path / "a.jpg"
+    logs = []
+
+    assert not FakeProvider(fake_server, "web").fetch("a.jpg", CONFIG, dest, log=logs.append)
+    assert not dest.exists()
+    assert "格式不符" in logs[-1]
+
+
+def test_fetch_rejects_wrong_size(fake_server, tmp_path):
+    fake_server.routes["/web/a.jpg"] = lambda h: serve(h, jpeg_bytes(32, 32))
+    logs = []
+
+    assert not FakeProvider(fake_server, "web").fetch("a.jpg", CONFIG, tmp_path / "a.jpg", log=logs.append)
+    assert "尺寸不符" in logs[-1]
+
+
+def test_fetch_rejects_http_errors(fake_server, tmp_path, sleeps):
+    fake_server.routes["/web/a.jpg"] = lambda h: reply(h, 503)
+    logs = []
+
+    assert not FakeProvider(fake_server, "web").fetch("a.jpg", CONFIG, tmp_path / "a.jpg", log=logs.append)
+    assert "HTTP 503" in logs[-1]
+
+
+def test_fetch_saves_valid_image(fake_server, tmp_path):
+    fake_server.routes["/web/a.jpg"] = serve
+    dest = tmp_path / "a.jpg"
+
+    assert FakeProvider(fake_server, "web").fetch("a.jpg", CONFIG, dest, log=lambda _: None)
+    assert dest.read_bytes() == DATA
+
+
+def test_placeholder_requests_target_format(monkeypatch, tmp_path):
+    from asset_pipeline import providers
+    from asset_pipeline.providers import web
+    from asset_pipeline.serve import serve as placeholder_server
+
+    server = placeholder_server(port=0)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    try:
+        host, port = server.server_address[:2]
+        monkeypatch.setattr(web, "PLACEHOLDER_BASE", f"http://{host}:{port}")
+        provider = providers.get("placeholder")
+        config = {**CONFIG, "label": "封面"}
+        assert "/64x48.jpg/" in provider.url("a.jpg", config)
+        for name in ("a.jpg", "b.png"):
+            assert provider.fetch(name, config, tmp_path / name, log=lambda _: None), name
+    finally:
+        server.shutdown()
+        server.server_close()
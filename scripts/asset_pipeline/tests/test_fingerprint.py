@@ -0,0 +1,55 @@
+"""内容指纹：地址映射指向内容相同的副本，旧指纹在保留期之后删除"""
+
+import json
+
+import pytest
+
+from asset_pipeline import fingerprint
+
+DAY = 86400
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.setattr(fingerprint, "STATE_PATH", tmp_path / "state.json")
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "a.jpg").write_bytes(b"first")
+    (images / "b.png").write_bytes(b"second")
+    return images, tmp_path / "image-manifest.json"
+
+
+def build(images, map_path, now):
+    return list(fingerprint.build_fingerprints(images, map_path=map_path, settings={"retention_days": 7}, now=now))
+
+
+def resolve(images, map_path):
+    """按地址映射读回每个逻辑文件名对应的内容"""
+    mapping = json.loads(map_path.read_text())
+    return {name: (images / url[len("/images/"):]).read_bytes() for name, url in mapping.items()}
+
+
+def test_manifest_round_trip(site):
+    images, map_path = site
+
+    assert sorted(status for _, status in build(images, map_path, now=0)) == ["built", "built"]
+    assert resolve(images, map_path) == {"a.jpg": b"first", "b.png": b"second"}
+
+    mapping = map_path.read_text()
+    assert [status for _, status in build(images, map_path, now=1)] == ["fresh", "fresh"]
+    assert map_path.read_text() == mapping
+
+
+def test_superseded_fingerprints_expire_after_retention(site):
+    images, map_path = site
+    build(images, map_path, now=0)
+    old = json.loads(map_path.read_text())["a.jpg"].rsplit("/", 1)[1]
+
+    (images / "a.jpg").write_bytes(b"changed")
+    build(images, map_path, now=DAY)
+    assert resolve(images, map_path)["a.jpg"] == b"changed"
+    assert (images / "hashed" / old).exists()
+
+    assert (old, "expired") not in build(images, map_path, now=7 * DAY)
+    assert (old, "expired") in build(images, map_path, now=8 * DAY)
+    assert not (images / "hashed" / old).exists()
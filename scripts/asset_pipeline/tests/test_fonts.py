@@ -0,0 +1,36 @@
+"""标签字体：CJK 检测、环境变量优先、字体对象复用、长标签缩小字号"""
+
+from asset_pipeline import fonts
+
+
+def test_needs_cjk():
+    assert fonts.needs_cjk("产品封面")
+    assert fonts.needs_cjk("Hello，世界")
+    assert fonts.needs_cjk("한국어")
+    assert not fonts.needs_cjk("Hero Banner 1920x1080")
+
+
+def test_env_var_takes_precedence(monkeypatch, tmp_path):
+    font = tmp_path / "Custom.ttf"
+    font.write_bytes(b"")
+    monkeypatch.setenv(fonts.FONT_ENV, str(font))
+
+    assert fonts.resolve(fonts.LATIN) == str(font)
+
+
+def test_fonts_are_cached_and_fallback_without_file():
+    assert fonts.get_font(None, 24) is fonts.get_font(None, 24)
+    # 字体文件损坏时退回 Pillow 自带字体
+    assert fonts.get_font("/nonexistent/font.ttf", 24) is not None
+
+
+def test_fit_font_shrinks_long_labels(monkeypatch):
+    monkeypatch.setattr(fonts, "_faces", {fonts.LATIN: None, fonts.CJK: None})
+    label = "A very long placeholder label that will not fit"
+
+    _, natural = fonts.fit_font(label, 48, 10_000)
+    _, fitted = fonts.fit_font(label, 48, 200)
+
+    assert natural[2] - natural[0] > 200
+    # 按比例缩小字号，字形取整可能多出几个像素
+    assert fitted[2] - fitted[0] <= 210
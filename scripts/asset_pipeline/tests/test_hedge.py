@@ -0,0 +1,64 @@
+"""对冲下载：失败时换下一个来源，从各来源的 .part 文件续传"""
+
+import json
+from pathlib import Path
+
+from asset_pipeline import transport
+from asset_pipeline.hedge import HedgePolicy, LatencyStats, fetch_hedged
+
+from .conftest import FakeProvider, jpeg_bytes, reply
+
+CONFIG = {"width": 64, "height": 48}
+DATA = jpeg_bytes(**CONFIG)
+
+
+def serve(handler, body=DATA, content_type="image/jpeg"):
+    reply(handler, 200, body, Content_Type=content_type, ETag='"v1"')
+
+
+def policy(tmp_path, after=5.0):
+    return HedgePolicy(LatencyStats(tmp_path / "latency.json"), fixed=after)
+
+
+def test_hedged_fetch_falls_back_after_non_image(fake_server, tmp_path):
+    fake_server.routes["/first/a.jpg"] = lambda h: serve(h, b"<html></html>", "text/html")
+    fake_server.routes["/second/a.jpg"] = serve
+    chain = [FakeProvider(fake_server, "first"), FakeProvider(fake_server, "second")]
+    dest = tmp_path / "a.jpg"
+
+    assert fetch_hedged(chain, "a.jpg", CONFIG, dest, policy(tmp_path), log=lambda _: None) == "second"
+    assert dest.read_bytes() == DATA
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.jpg"]
+
+
+def test_hedged_fetch_returns_none_when_all_fail(fake_server, tmp_path):
+    fake_server.routes["/first/a.jpg"] = lambda h: serve(h, b"not an image", "text/plain")
+    chain = [FakeProvider(fake_server, "first")]
+
+    assert fetch_hedged(chain, "a.jpg", CONFIG, tmp_path / "a.jpg", policy(tmp_path), log=lambda _: None) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_hedged_fetch_resumes_part_file(fake_server, tmp_path):
+    def ranged(handler):
+        start = int(handler.headers["Range"][len("bytes="):].rstrip("-")) if handler.headers.get("Range") else 0
+        headers = {"ETag": '"v1"', "Content_Type": "image/jpeg"}
+        if start:
+            headers["Content_Range"] = f"bytes {start}-{len(DATA) - 1}/{len(DATA)}"
+        reply(handler, 206 if start else 200, DATA[start:], **headers)
+
+    fake_server.routes["/first/a.jpg"] = ranged
+    fake_server.routes["/second/a.jpg"] = ranged
+    chain = [FakeProvider(fake_server, "first"), FakeProvider(fake_server, "second")]
+    dest = tmp_path / "a.jpg"
+    # 上次运行中 second 的下载被中断
+    staging = tmp_path / "a.jpg.second.part"
+    Path(f"{staging}.part").write_bytes(DATA[:100])
+    Path(f"{staging}.part.json").write_text(json.dumps({"url": fake_server.url("/second/a.jpg"), "validator": '"v1"'}))
+    assert transport.resumable(staging)
+
+    assert fetch_hedged(chain, "a.jpg", CONFIG, dest, policy(tmp_path), log=lambda _: None) == "second"
+    method, path, headers = fake_server.requests[0]
+    assert path == "/second/a.jpg" and headers["Range"] == "bytes=100-"
+    assert dest.read_bytes() == DATA
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.jpg"]
@@ -0,0 +1,74 @@
+"""运行日志：重新运行时接管未完成的任务，已完成的不会重复提交"""
+
+import json
+
+from asset_pipeline.journal import (COMPLETED, DOWNLOADED, FAILED, PLANNED, SUBMITTED, VERIFIED, RunJournal,
+                                    idempotency_key)
+from asset_pipeline.lovart import Job, LovartClient, LovartScheduler
+
+from .conftest import jpeg_bytes, reply
+
+DATA = jpeg_bytes()
+
+
+def test_plan_keeps_unfinished_and_restarts_finished(tmp_path):
+    journal = RunJournal(tmp_path / "journal.sqlite")
+    journal.plan("a", "lovart", "a.jpg")
+    journal.mark("a", SUBMITTED, task_id="t1")
+    journal.plan("b", "lovart", "b.jpg")
+    journal.mark("b", VERIFIED)
+    journal.plan("c", "lovart", "c.jpg")
+    journal.mark("c", FAILED, error="boom")
+
+    assert journal.plan("a", "lovart", "a.jpg")["state"] == SUBMITTED
+    assert [entry["key"] for entry in journal.unfinished("lovart")] == ["a"]
+
+    restarted = journal.plan("b", "lovart", "b.jpg")
+    assert (restarted["state"], restarted["attempt"]) == (PLANNED, 1)
+    assert journal.plan("c", "lovart", "c.jpg")["error"] is None
+    journal.close()
+
+
+def test_journal_survives_reopen(tmp_path):
+    path = tmp_path / "journal.sqlite"
+    journal = RunJournal(path)
+    journal.plan("a", "lovart", "a.jpg")
+    journal.mark("a", COMPLETED, url="https://cdn/a.jpg")
+    journal.close()
+
+    entry = RunJournal(path).get("a")
+    assert (entry["state"], entry["url"]) == (COMPLETED, "https://cdn/a.jpg")
+
+
+def test_resume_skips_completed_items(fake_server, tmp_path):
+    journal = RunJournal(tmp_path / "journal.sqlite")
+    for key in ("submitted", "completed", "new"):
+        journal.plan(key, "lovart", f"{key}.jpg")
+    journal.mark("submitted", SUBMITTED, task_id="t1")
+    journal.mark("completed", COMPLETED, url=fake_server.url("/cdn/completed.jpg"))
+
+    def serve_image(handler):
+        reply(handler, 200, DATA, Content_Type="image/jpeg")
+
+    fake_server.routes["/v1/images/generations"] = lambda h: reply(
+        h, 200, json.dumps({"url": fake_server.url("/cdn/new.jpg")}).encode(), Content_Type="application/json")
+    fake_server.routes["/v1/tasks/t1"] = lambda h: reply(
+        h, 200, json.dumps({"status": "completed", "url": fake_server.url("/cdn/submitted.jpg")}).encode(),
+        Content_Type="application/json")
+    for name in ("submitted", "completed", "new"):
+        fake_server.routes[f"/cdn/{name}.jpg"] = serve_image
+
+    jobs = [Job(f"{key}.jpg", key, 64, 48, key=key, idempotency_key=idempotency_key(key, 0), interval=0.01)
+            for key in ("submitted", "completed", "new")]
+    scheduler = LovartScheduler(LovartClient(fake_server.url("/v1"), "test-key"), tmp_path,
+                                rate_limit=0, log=lambda _: None, journal=journal)
+
+    results = scheduler.run(jobs)
+
+    assert results == {"submitted.jpg": None, "completed.jpg": None, "new.jpg": None}
+    # 只有新任务被提交；上次已提交的只轮询，已完成的直接下载
+    posts = [headers for method, _, headers in fake_server.requests if method == "POST"]
+    assert [headers["Idempotency-Key"] for headers in posts] == ["new-0"]
+    assert "/v1/tasks/t1" in fake_server.paths()
+    assert all(journal.get(key)["state"] == DOWNLOADED for key in ("submitted", "completed", "new"))
+    journal.close()
@@ -0,0 +1,108 @@
+"""Lovart：异步提交、统一轮询、429 退避、失败任务和并发上限"""
+
+import json
+import threading
+
+from asset_pipeline.lovart import Job, LovartClient, LovartScheduler
+
+from .conftest import jpeg_bytes, reply
+
+DATA = jpeg_bytes()
+
+
+def json_reply(handler, status, data, **headers):
+    reply(handler, status, json.dumps(data).encode(), Content_Type="application/json", **headers)
+
+
+def make_scheduler(server, images_dir, **kwargs):
+    client = LovartClient(server.url("/v1"), "test-key")
+    return LovartScheduler(client, images_dir, rate_limit=0, log=lambda _: None, **kwargs)
+
+
+def make_job(filename):
+    # 轮询间隔缩短到 10ms，测试不必等待默认的 1 秒
+    return Job(filename, f"prompt for {filename}", 64, 48, interval=0.01)
+
+
+def test_submit_then_poll_until_completed(fake_server, tmp_path):
+    polls = []
+
+    def task(handler):
+        polls.append(handler.path)
+        if len(polls) < 3:
+            json_reply(handler, 200, {"status": "processing"})
+        else:
+            json_reply(handler, 200, {"status": "completed", "data": [{"url": fake_server.url("/cdn/a.jpg")}]})
+
+    fake_server.routes["/v1/images/generations"] = lambda h: json_reply(h, 202, {"task_id": "t1"})
+    fake_server.routes["/v1/tasks/t1"] = task
+    fake_server.routes["/cdn/a.jpg"] = lambda h: reply(h, 200, DATA, Content_Type="image/jpeg")
+
+    results = make_scheduler(fake_server, tmp_path).run([make_job("a.jpg")])
+
+    assert results == {"a.jpg": None}
+    assert len(polls) == 3
+    assert (tmp_path / "a.jpg").read_bytes() == DATA
+    method, _, headers = fake_server.requests[0]
+    assert method == "POST" and headers["Authorization"] == "Bearer test-key"
+
+
+def test_submit_honours_retry_after(fake_server, tmp_path, sleeps):
+    attempts = []
+
+    def submit(handler):
+        attempts.append(handler.path)
+        if len(attempts) == 1:
+            json_reply(handler, 429, {"error": "rate limited"}, Retry_After="5")
+        else:
+            json_reply(handler, 200, {"url": fake_server.url("/cdn/a.jpg")})
+
+    fake_server.routes["/v1/images/generations"] = submit
+    fake_server.routes["/cdn/a.jpg"] = lambda h: reply(h, 200, DATA, Content_Type="image/jpeg")
+
+    results = make_scheduler(fake_server, tmp_path).run([make_job("a.jpg")])
+
+    assert results == {"a.jpg": None}
+    assert len(attempts) == 2
+    assert 5.0 in sleeps
+    assert (tmp_path / "a.jpg").exists()
+
+
+def test_failed_task_is_reported_without_download(fake_server, tmp_path):
+    fake_server.routes["/v1/images/generations"] = lambda h: json_reply(h, 202, {"id": "t1"})
+    fake_server.routes["/v1/tasks/t1"] = lambda h: json_reply(h, 200, {"status": "failed"})
+
+    results = make_scheduler(fake_server, tmp_path).run([make_job("a.jpg")])
+
+    assert results == {"a.jpg": "任务失败"}
+    assert not (tmp_path / "a.jpg").exists()
+    assert not any(path.startswith("/cdn/") for path in fake_server.paths())
+
+
+def test_submits_respect_concurrency_cap(fake_server, tmp_path):
+    lock = threading.Lock()
+    release = threading.Event()
+    active = [0]
+    peak = [0]
+
+    def submit(handler):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            if active[0] >= 2:
+                release.set()
+        # 等到至少两个请求同时在途，超过上限的请求会在这段时间内到达
+        release.wait(timeout=2)
+        threading.Event().wait(0.05)
+        with lock:
+            active[0] -= 1
+        json_reply(handler, 200, {"url": fake_server.url("/cdn/image.jpg")})
+
+    fake_server.routes["/v1/images/generations"] = submit
+    fake_server.routes["/cdn/image.jpg"] = lambda h: reply(h, 200, DATA, Content_Type="image/jpeg")
+    jobs = [make_job(f"{i}.jpg") for i in range(6)]
+
+    results = make_scheduler(fake_server, tmp_path, concurrency=2).run(jobs)
+
+    assert all(error is None for error in results.values())
+    assert peak[0] == 2
@@ -0,0 +1,51 @@
+"""清单读取：按来源覆盖字段、缺少字段时报错"""
+
+import json
+
+import pytest
+
+from asset_pipeline.manifest import ManifestError, load_manifest, load_settings
+
+ENTRY = {"width": 800, "height": 600, "description": "封面", "label": "Cover", "search": "city", "prompt": "city at night"}
+
+
+def write(tmp_path, data):
+    path = tmp_path / "assets.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_provider_fields_override_entry(tmp_path):
+    path = write(tmp_path, {"assets": {"a.jpg": {**ENTRY, "providers": {"dalle": {"prompt": "neon city"}}}}})
+
+    assert load_manifest(path=path)["a.jpg"]["prompt"] == "city at night"
+    config = load_manifest("dalle", path=path)["a.jpg"]
+    assert config["prompt"] == "neon city"
+    assert "providers" not in config
+    assert load_manifest("picsum", path=path)["a.jpg"]["prompt"] == "city at night"
+
+
+def test_missing_fields_are_reported(tmp_path):
+    path = write(tmp_path, {"assets": {"a.jpg": {"width": 800, "height": 600}}})
+
+    with pytest.raises(ManifestError, match="a.jpg 缺少字段"):
+        load_manifest(path=path)
+
+
+def test_unreadable_manifest(tmp_path):
+    path = tmp_path / "assets.json"
+    path.write_text("{", encoding="utf-8")
+
+    with pytest.raises(ManifestError):
+        load_manifest(path=path)
+
+
+def test_settings_default_to_empty(tmp_path):
+    path = write(tmp_path, {"assets": {}, "fetch": {"hedge_default": 1.5}})
+
+    assert load_settings("fetch", path=path) == {"hedge_default": 1.5}
+    assert load_settings("responsive", path=path) == {}
+
+
+def test_repository_manifest_is_valid():
+    assert load_manifest()
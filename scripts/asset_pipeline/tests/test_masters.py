@@ -0,0 +1,38 @@
+"""AI 母版：按宽高比选受支持的尺寸，裁切框对准细节，派生图尺寸与清单一致"""
+
+from PIL import Image, ImageDraw
+
+from asset_pipeline.masters import crop_box, derive, master_size
+
+DALLE3 = [(1024, 1024), (1792, 1024), (1024, 1792)]
+
+
+def test_master_size_matches_aspect_ratio():
+    assert master_size([(1600, 900), (1200, 675)], DALLE3) == (1792, 1024)
+    assert master_size([(400, 600)], DALLE3) == (1024, 1792)
+    assert master_size([(300, 300), (640, 600)], DALLE3) == (1024, 1024)
+    # 没有尺寸限制时直接使用面积最大的请求尺寸
+    assert master_size([(300, 200), (1200, 800)], []) == (1200, 800)
+
+
+def test_crop_box_follows_detail():
+    img = Image.new("RGB", (400, 100), "white")
+    draw = ImageDraw.Draw(img)
+    for x in range(310, 390, 6):
+        draw.line([(x, 10), (x, 90)], fill="black", width=2)
+
+    left, top, right, bottom = crop_box(img, 100, 100)
+
+    assert (top, bottom) == (0.0, 100.0)
+    assert right - left == 100.0
+    assert left >= 250  # 窗口滑向右侧有条纹的区域
+
+
+def test_derive_writes_requested_size(tmp_path):
+    master = tmp_path / "master.png"
+    Image.new("RGB", (1792, 1024), "navy").save(master)
+
+    derive(master, tmp_path / "card.jpg", 320, 240)
+
+    with Image.open(tmp_path / "card.jpg") as out:
+        assert (out.format, out.size) == ("JPEG", (320, 240))
@@ -0,0 +1,50 @@
+"""重新压缩：SSIM 的取值符合预期，二分查找得到满足阈值的最低质量"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+from asset_pipeline.optimize import encode_jpeg, optimize_file, search_jpeg_quality, ssim
+
+SETTINGS = {"ssim": 0.95, "min_quality": 40, "max_quality": 92}
+
+
+def photo(width: int = 128, height: int = 96) -> Image.Image:
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 2, y * 2, (x + y)], axis=-1).astype(np.float64)
+    noise = rng.normal(0, 12, base.shape)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8))
+
+
+def test_ssim_bounds():
+    img = photo()
+    assert ssim(img, img) == 1.0
+    assert ssim(img, Image.new("RGB", img.size, "gray")) < 0.5
+    with Image.open(io.BytesIO(encode_jpeg(img, 40))) as low, Image.open(io.BytesIO(encode_jpeg(img, 90))) as high:
+        assert ssim(img, low) < ssim(img, high) < 1.0
+
+
+def test_search_returns_lowest_quality_above_threshold():
+    img = photo()
+
+    data, quality, score = search_jpeg_quality(img, 0.95, 40, 92)
+
+    assert score >= 0.95
+    if quality > 40:
+        with Image.open(io.BytesIO(encode_jpeg(img, quality - 1))) as lower:
+            assert ssim(img, lower) < 0.95
+
+
+def test_optimize_file_shrinks_and_strips_metadata(tmp_path):
+    path = tmp_path / "a.jpg"
+    exif = Image.Exif()
+    exif[0x010E] = "x" * 4000  # ImageDescription
+    photo().save(path, "JPEG", quality=100, exif=exif)
+
+    result = optimize_file(path, SETTINGS)
+
+    assert result.status == "optimized" and result.after < result.before
+    with Image.open(io.BytesIO(result.data)) as out:
+        assert "exif" not in out.info
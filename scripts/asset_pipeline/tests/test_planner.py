@@ -0,0 +1,87 @@
+"""增量构建计划：清单与磁盘、构建状态的对比"""
+
+import os
+
+from asset_pipeline import planner
+from asset_pipeline.planner import MISSING, RECIPE_CHANGED, BuildState, plan
+
+
+def recipe_of(config):
+    return f"{config['prompt']}-{config['width']}x{config['height']}"
+
+
+def make_assets(**prompts):
+    return {f"{name}.jpg": {"width": 64, "height": 48, "prompt": prompt} for name, prompt in prompts.items()}
+
+
+def test_missing_files_are_planned(tmp_path):
+    state = BuildState(tmp_path / "state.json")
+    work = plan(make_assets(a="sunset", b="forest"), "dalle", recipe_of, tmp_path, state)
+
+    assert [(item.filename, item.reason) for item in work] == [("a.jpg", MISSING), ("b.jpg", MISSING)]
+    assert work[0].recipe == "sunset-64x48"
+
+
+def test_owned_file_with_changed_recipe_is_replanned(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"old")
+    state = BuildState(tmp_path / "state.json")
+    state.record("a.jpg", "dalle", "sunset-64x48", tmp_path / "a.jpg")
+
+    assert plan(make_assets(a="sunset"), "dalle", recipe_of, tmp_path, state) == []
+    work = plan(make_assets(a="sunrise"), "dalle", recipe_of, tmp_path, state)
+    assert [(item.filename, item.reason) for item in work] == [("a.jpg", RECIPE_CHANGED)]
+
+
+def test_files_owned_by_other_scripts_are_kept(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"stock photo")
+    state = BuildState(tmp_path / "state.json")
+    state.record("a.jpg", "fetch", None, tmp_path / "a.jpg")
+
+    assert plan(make_assets(a="sunrise"), "dalle", recipe_of, tmp_path, state) == []
+
+
+def test_unknown_files_are_registered_without_owner(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"hand made")
+    state = BuildState(tmp_path / "state.json")
+
+    assert plan(make_assets(a="sunset"), "dalle", recipe_of, tmp_path, state) == []
+    assert state.entries["a.jpg"]["owner"] is None
+    # 状态已保存，下次运行仍然认得这个文件
+    assert BuildState(tmp_path / "state.json").entries["a.jpg"]["owner"] is None
+
+
+def test_manually_replaced_file_loses_owner(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"generated")
+    state = BuildState(tmp_path / "state.json")
+    state.record("a.jpg", "dalle", "sunset-64x48", path)
+
+    path.write_bytes(b"replaced by hand")
+    assert plan(make_assets(a="sunrise"), "dalle", recipe_of, tmp_path, state) == []
+    assert state.entries["a.jpg"]["owner"] is None
+
+
+def test_unchanged_files_are_not_rehashed(tmp_path, monkeypatch):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"generated")
+    state = BuildState(tmp_path / "state.json")
+    state.record("a.jpg", "dalle", "sunset-64x48", path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("不应重新计算哈希")
+
+    monkeypatch.setattr(planner, "file_sha256", fail)
+    assert plan(make_assets(a="sunset"), "dalle", recipe_of, tmp_path, state) == []
+
+
+def test_touched_file_with_same_content_keeps_owner(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"generated")
+    state = BuildState(tmp_path / "state.json")
+    state.record("a.jpg", "dalle", "sunset-64x48", path)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    work = plan(make_assets(a="sunrise"), "dalle", recipe_of, tmp_path, state)
+    assert [item.reason for item in work] == [RECIPE_CHANGED]
+    assert state.entries["a.jpg"]["mtime_ns"] == path.stat().st_mtime_ns
@@ -0,0 +1,62 @@
+"""模板预览队列：领取与租约回收、衍生图尺寸、处理结果写入 done/ 或 failed/"""
+
+import json
+import os
+import time
+
+from PIL import Image
+
+from asset_pipeline import previews
+
+SETTINGS = {**previews.DEFAULT_SETTINGS, "formats": ["jpeg"]}
+
+
+def enqueue(spool, job_id, image=None):
+    (spool / "files").mkdir(parents=True, exist_ok=True)
+    (spool / "new").mkdir(parents=True, exist_ok=True)
+    source = f"files/{job_id}.jpg"
+    if image is not None:
+        image.save(spool / source, "JPEG")
+    (spool / "new" / f"{job_id}.json").write_text(json.dumps({"id": job_id, "source": source}))
+
+
+def test_claim_and_recover(tmp_path):
+    for job_id in ("a", "b", "c"):
+        enqueue(tmp_path, job_id)
+
+    assert [job["id"] for job in previews.claim(tmp_path, limit=2)] == ["a", "b"]
+    assert previews.claim(tmp_path, limit=2)[0]["id"] == "c"
+    assert previews.recover(tmp_path, lease=600) == []
+
+    stale = time.time() - 3600
+    os.utime(tmp_path / "cur" / "a.json", (stale, stale))
+    assert previews.recover(tmp_path, lease=600) == ["a"]
+    assert (tmp_path / "new" / "a.json").exists()
+
+
+def test_process_preview_sizes(tmp_path):
+    source = tmp_path / "upload.jpg"
+    Image.new("RGB", (2000, 1000), "teal").save(source, "JPEG")
+
+    result = previews.process_preview(source, SETTINGS, tmp_path / "out")
+
+    assert (result["width"], result["height"]) == (2000, 1000)
+    assert [(v["width"], v["height"]) for v in result["sources"]["jpeg"]] == [(640, 320), (1280, 640)]
+    with Image.open(tmp_path / "out" / "upload" / "thumb.jpg") as thumb:
+        assert thumb.size == (480, 360)
+    assert result["sources"]["jpeg"][0]["src"] == f"{previews.URL_PREFIX}/upload/640w.jpg"
+
+
+def test_process_queue_moves_jobs_to_done_and_failed(tmp_path):
+    spool, output = tmp_path / "spool", tmp_path / "out"
+    enqueue(spool, "good", Image.new("RGB", (800, 600), "red"))
+    enqueue(spool, "missing")
+
+    results = {record["id"]: error for record, error in
+               previews.process_queue(spool, output, SETTINGS, processes=1)}
+
+    assert results["good"] is None and results["missing"]
+    assert json.loads((spool / "done" / "good.json").read_text())["thumbnail"]["width"] == 480
+    assert (spool / "failed" / "missing.json").exists()
+    assert not (spool / "files" / "good.jpg").exists()
+    assert not list((spool / "cur").iterdir())
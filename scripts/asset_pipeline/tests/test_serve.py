@@ -0,0 +1,61 @@
+"""本地占位图服务：路径解析、按字节数淘汰的 LRU 缓存、同一张图只渲染一次"""
+
+import threading
+
+import pytest
+
+from asset_pipeline import serve
+from asset_pipeline.serve import ByteCache, Rendered, parse_path
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """用固定 100 字节的响应代替真正的渲染，记录每次渲染的键"""
+    calls = []
+
+    def fake_render(width, height, label, fmt):
+        calls.append((width, height, label, fmt))
+        threading.Event().wait(0.02)
+        return Rendered(b"x" * 100, f'"{width}x{height}"', "image/jpeg")
+
+    monkeypatch.setattr(serve, "render_bytes", fake_render)
+    return calls
+
+
+def test_parse_path():
+    assert parse_path("/640x480") == (640, 480, "640x480", "jpeg")
+    assert parse_path("/640x480.webp?text=封面") == (640, 480, "封面", "webp")
+    assert parse_path("/64x48/hero.png") == (64, 48, "hero", "png")
+    assert parse_path("/favicon.ico") is None
+    with pytest.raises(ValueError):
+        parse_path("/64x48.bmp")
+    with pytest.raises(ValueError):
+        parse_path("/0x48")
+
+
+def test_cache_evicts_least_recently_used_by_bytes(renders):
+    cache = ByteCache(max_bytes=250)
+    a, b, c = [(n, n, "label", "jpeg") for n in (1, 2, 3)]
+
+    cache.get(a)
+    cache.get(b)
+    cache.get(a)  # a 变成最近使用
+    cache.get(c)  # 超过 250 字节，淘汰最久未用的 b
+
+    assert cache.size == 200
+    cache.get(a)
+    cache.get(b)
+    assert renders == [a, b, c, b]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_concurrent_requests_render_once(renders):
+    cache = ByteCache()
+    key = (64, 48, "label", "jpeg")
+    threads = [threading.Thread(target=cache.get, args=(key,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert renders == [key]
@@ -0,0 +1,75 @@
+"""transport：429/5xx 重试和 Retry-After"""
+
+import time
+from email.utils import formatdate
+
+from asset_pipeline import transport
+
+from .conftest import reply
+
+
+def sequence(*responses):
+    """按顺序返回 responses 中的 (状态码, 响应头)，用完后一直返回最后一个"""
+    remaining = list(responses)
+
+    def route(handler):
+        status, headers = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        reply(handler, status, b"ok" if status == 200 else b"", **headers)
+
+    return route
+
+
+def test_retries_server_errors_with_backoff(fake_server, sleeps):
+    fake_server.routes["/img"] = sequence((503, {}), (502, {}), (200, {}))
+
+    response = transport.get(fake_server.url("/img"))
+
+    assert response.status_code == 200
+    assert len(fake_server.requests) == 3
+    assert len(sleeps) == 2
+    assert all(0 <= delay <= transport.BACKOFF_BASE * 2 ** i for i, delay in enumerate(sleeps))
+
+
+def test_honours_retry_after_seconds(fake_server, sleeps):
+    fake_server.routes["/img"] = sequence((429, {"Retry_After": "7"}), (200, {}))
+
+    assert transport.get(fake_server.url("/img")).status_code == 200
+    assert sleeps == [7.0]
+
+
+def test_honours_retry_after_http_date(fake_server, sleeps):
+    fake_server.routes["/img"] = sequence((503, {"Retry_After": formatdate(time.time() + 30, usegmt=True)}), (200, {}))
+
+    assert transport.get(fake_server.url("/img")).status_code == 200
+    assert len(sleeps) == 1 and 25 <= sleeps[0] <= 30
+
+
+def test_retry_after_is_capped(fake_server, sleeps):
+    fake_server.routes["/img"] = sequence((429, {"Retry_After": "86400"}), (200, {}))
+
+    transport.get(fake_server.url("/img"))
+    assert sleeps == [transport.RETRY_AFTER_MAX]
+
+
+def test_returns_last_response_when_retries_exhausted(fake_server, sleeps):
+    fake_server.routes["/img"] = sequence((503, {}))
+
+    response = transport.get(fake_server.url("/img"), retries=2)
+
+    assert response.status_code == 503
+    assert len(fake_server.requests) == 3
+
+
+def test_does_not_retry_client_errors(fake_server, sleeps):
+    fake_server.routes["/img"] = sequence((404, {}))
+
+    assert transport.get(fake_server.url("/img")).status_code == 404
+    assert len(fake_server.requests) == 1 and sleeps == []
+
+
+def test_post_only_retries_unprocessed_statuses(fake_server, sleeps):
+    # 500 时服务端可能已经受理了生成任务，重试会重复提交
+    fake_server.routes["/jobs"] = sequence((500, {}), (200, {}))
+
+    assert transport.post(fake_server.url("/jobs")).status_code == 500
+    assert len(fake_server.requests) == 1
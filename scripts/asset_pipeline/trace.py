@@ -0,0 +1,315 @@
+"""
+按图片记录各阶段耗时（span）
+阶段: plan / fetch / generate / poll / wait / decode / encode / write
+每个 span 记录耗时以及可选的字节数、HTTP 状态码、重试次数和实际来源；
+transport 等底层模块通过 annotate() / add() 把信息写到当前线程正在进行的 span 上。
+脚本用 `with trace.run("脚本名"):` 包住 main()，结束时写出 JSONL 明细、
+Prometheus textfile 指标，并打印汇总表
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .cache import CACHE_DIR
+from .storage import atomic_write
+
+# JSONL 明细目录（每个脚本一个文件，每次运行覆盖）
+TRACE_DIR = Path(os.getenv("ASSET_TRACE_DIR") or CACHE_DIR / "traces")
+# Prometheus textfile 目录，可以指向 node_exporter 的 --collector.textfile.directory
+METRICS_DIR = Path(os.getenv("ASSET_METRICS_DIR") or CACHE_DIR / "metrics")
+
+METRIC_PREFIX = "asset_pipeline"
+
+
+class Span:
+    """一段计时；attrs 中的值会原样写入 JSONL"""
+
+    __slots__ = ("id", "parent", "stage", "asset", "start", "duration", "attrs", "error", "_t0")
+
+    def __init__(self, stage: str, asset: Optional[str], parent: Optional[str], attrs: dict):
+        self.id = f"{os.getpid():x}-{next(_ids)}"
+        self.parent = parent
+        self.stage = stage
+        self.asset = asset
+        self.start = time.time()
+        self.duration = 0.0
+        self.attrs = attrs
+        self.error: Optional[str] = None
+        self._t0 = time.perf_counter()
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, **counts) -> None:
+        for key, value in counts.items():
+            self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        record = {
+            "id": self.id,
+            "parent": self.parent,
+            "stage": self.stage,
+            "asset": self.asset,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            **self.attrs,
+        }
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+_ids = itertools.count(1)
+
+
+class Tracer:
+    """收集本进程的所有 span；线程安全，每个线程维护自己的 span 栈"""
+
+    def __init__(self):
+        self.spans: List[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> Optional[Span]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, stage: str, asset: Optional[str] = None, **attrs) -> Iterator[Span]:
+        """计时一段代码；asset 未指定时沿用外层 span 的 asset，异常会记录后继续抛出"""
+        parent = self.current()
+        if asset is None and parent is not None:
+            asset = parent.asset
+        span = Span(stage, asset, parent.id if parent else None, attrs)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            span.duration = time.perf_counter() - span._t0
+            self._finish(span.to_dict())
+
+    def record(self, stage: str, duration: float, asset: Optional[str] = None,
+               start: Optional[float] = None, **attrs) -> None:
+        """记录一段在别处计时的 span（例如从提交到完成的等待时间），start 默认为现在减去 duration"""
+        span = Span(stage, asset, None, attrs)
+        span.duration = duration
+        span.start = time.time() - duration if start is None else start
+        self._finish(span.to_dict())
+
+    def _finish(self, record: dict) -> None:
+        capture = getattr(self._local, "capture", None)
+        if capture is not None:
+            capture.append(record)
+            return
+        with self._lock:
+            self.spans.append(record)
+
+    @contextmanager
+    def capture(self) -> Iterator[List[dict]]:
+        """
+        把当前线程在 with 块内结束的 span 收集到列表中而不是全局记录，
+        用于进程池的工作进程把 span 连同结果一起返回给父进程
+        """
+        previous = getattr(self._local, "capture", None)
+        spans: List[dict] = []
+        self._local.capture = spans
+        try:
+            yield spans
+        finally:
+            self._local.capture = previous
+
+    def ingest(self, records: Iterable[dict]) -> None:
+        """合并 capture() 收集到的 span"""
+        with self._lock:
+            self.spans.extend(records)
+
+    def reset(self) -> List[dict]:
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+
+# 进程内共享的 tracer
+tracer = Tracer()
+span = tracer.span
+record = tracer.record
+
+
+def annotate(**attrs) -> None:
+    """设置当前线程正在进行的 span 的属性（没有 span 时忽略）"""
+    current = tracer.current()
+    if current is not None:
+        current.set(**attrs)
+
+
+def add(**counts) -> None:
+    """累加当前线程正在进行的 span 的计数（字节数、重试次数）"""
+    current = tracer.current()
+    if current is not None:
+        current.add(**counts)
+
+
+# ---------------------------------------------------------------- 汇总与输出
+
+
+def failed(s: dict) -> bool:
+    """抛出异常或最终 HTTP 状态码为错误的 span 算作失败；被主动取消的对冲请求不算"""
+    if s.get("cancelled"):
+        return False
+    return bool(s.get("error")) or s.get("status", 0) >= 400
+
+
+def _percentile(values: List[float], q: float) -> float:
+    import statistics
+
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def summarize(spans: List[dict]) -> Dict[str, dict]:
+    """按阶段汇总: 次数、总耗时、p50/p95/最长、字节数、重试次数、失败次数、来源分布"""
+    by_stage: Dict[str, List[dict]] = defaultdict(list)
+    for s in spans:
+        by_stage[s["stage"]].append(s)
+    summary = {}
+    for stage, items in by_stage.items():
+        durations = sorted(s["duration"] for s in items)
+        providers: Dict[str, int] = defaultdict(int)
+        for s in items:
+            if s.get("provider"):
+                providers[s["provider"]] += 1
+        summary[stage] = {
+            "count": len(items),
+            "total": sum(durations),
+            "p50": _percentile(durations, 50),
+            "p95": _percentile(durations, 95),
+            "max": durations[-1],
+            "bytes": sum(s.get("bytes", 0) for s in items),
+            "retries": sum(s.get("retries", 0) for s in items),
+            "errors": sum(1 for s in items if failed(s)),
+            "providers": dict(providers),
+        }
+    return summary
+
+
+def _format_bytes(n: int) -> str:
+    if n >= 1024 * 1024:
+        return f"{n / 1024 / 1024:.1f}MB"
+    if n >= 1024:
+        return f"{n / 1024:.0f}KB"
+    return f"{n}B" if n else "-"
+
+
+def _rjust(text: str, width: int) -> str:
+    """按终端显示宽度右对齐（中文字符占两列）"""
+    cells = sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+    return " " * max(width - cells, 0) + text
+
+
+def format_summary(summary: Dict[str, dict], wall: float) -> str:
+    header = ["阶段", "次数", "总耗时", "p50", "p95", "最长", "字节", "重试", "失败"]
+    widths = [10, 6, 10, 9, 9, 9, 10, 6, 6]
+    lines = [
+        "阶段" + " " * 6 + "".join(_rjust(h, w) for h, w in zip(header[1:], widths[1:])) + "  来源",
+    ]
+    for stage, s in sorted(summary.items(), key=lambda kv: -kv[1]["total"]):
+        providers = ", ".join(f"{p}×{n}" for p, n in sorted(s["providers"].items()))
+        lines.append(
+            f"{stage:<10}{s['count']:>6}{s['total']:>9.2f}s{s['p50']:>8.2f}s{s['p95']:>8.2f}s{s['max']:>8.2f}s"
+            f"{_format_bytes(s['bytes']):>10}{s['retries']:>6}{s['errors']:>6}  {providers}"
+        )
+    lines.append(f"墙钟时间 {wall:.2f}s（并发执行时各阶段总耗时之和可能超过墙钟时间）")
+    return "\n".join(lines)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def prometheus_text(script: str, spans: List[dict], wall: float, finished_at: float) -> str:
+    """按 (阶段, 来源) 汇总为 Prometheus textfile 格式；每次运行覆盖，因此都是 gauge"""
+    groups: Dict[tuple, dict] = defaultdict(lambda: {"count": 0, "seconds": 0.0, "bytes": 0, "retries": 0, "errors": 0})
+    for s in spans:
+        g = groups[(s["stage"], s.get("provider") or "")]
+        g["count"] += 1
+        g["seconds"] += s["duration"]
+        g["bytes"] += s.get("bytes", 0)
+        g["retries"] += s.get("retries", 0)
+        g["errors"] += 1 if failed(s) else 0
+
+    metrics = [
+        ("spans", "count", "Number of spans per stage in the last run."),
+        ("seconds", "seconds", "Total time spent per stage in the last run."),
+        ("bytes", "bytes", "Bytes transferred or written per stage in the last run."),
+        ("retries", "retries", "HTTP retries per stage in the last run."),
+        ("errors", "errors", "Failed spans per stage in the last run."),
+    ]
+    script_label = f'script="{_label(script)}"'
+    out = []
+    for suffix, key, help_text in metrics:
+        name = f"{METRIC_PREFIX}_stage_{suffix}"
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} gauge")
+        for (stage, provider), g in sorted(groups.items()):
+            out.append(f'{name}{{{script_label},stage="{_label(stage)}",provider="{_label(provider)}"}} {g[key]}')
+    for name, value, help_text in (
+        (f"{METRIC_PREFIX}_run_duration_seconds", wall, "Wall time of the last run."),
+        (f"{METRIC_PREFIX}_run_timestamp_seconds", finished_at, "Unix time the last run finished."),
+    ):
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} gauge")
+        out.append(f"{name}{{{script_label}}} {value}")
+    return "\n".join(out) + "\n"
+
+
+def write_outputs(script: str, spans: List[dict], wall: float, run_id: str) -> None:
+    """写出 JSONL 明细和 Prometheus textfile（都是原子替换）"""
+    TRACE_DIR.mkdir(parents=True, exist_ok=True)
+    with atomic_write(TRACE_DIR / f"{script}.jsonl") as f:
+        for s in spans:
+            f.write((json.dumps({"run": run_id, "script": script, **s}, ensure_ascii=False) + "\n").encode("utf-8"))
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    with atomic_write(METRICS_DIR / f"{script}.prom") as f:
+        f.write(prometheus_text(script, spans, wall, time.time()).encode("utf-8"))
+
+
+@contextmanager
+def run(script: str, print_summary: bool = True) -> Iterator[Tracer]:
+    """包住脚本的 main()，无论正常结束、sys.exit 还是异常都会写出结果"""
+    tracer.reset()
+    run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    t0 = time.perf_counter()
+    try:
+        yield tracer
+    finally:
+        wall = time.perf_counter() - t0
+        spans = sorted(tracer.reset(), key=lambda s: s["start"])
+        try:
+            write_outputs(script, spans, wall, run_id)
+        except OSError as e:
+            print(f"⚠️  写入耗时记录失败: {e}")
+        if print_summary and spans:
+            print("\n耗时统计")
+            print("-" * 60)
+            print(format_summary(summarize(spans), wall))
+            print(f"明细: {TRACE_DIR / (script + '.jsonl')}")
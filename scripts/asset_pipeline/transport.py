@@ -0,0 +1,275 @@
+"""
+共享 HTTP 传输层
+所有图片脚本共用一个带连接池的 requests.Session（keep-alive），
+并对 429/5xx 和网络错误做指数退避重试（带随机抖动，遵守 Retry-After）
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import trace
+from .storage import commit_file
+
+# 连接池大小：每个主机保持的空闲连接数，应不小于下载并发数
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 16
+
+# 重试配置
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # 第 n 次重试最多等待 BACKOFF_BASE * 2**n 秒
+BACKOFF_MAX = 30.0
+RETRY_AFTER_MAX = 120.0
+
+# 可重试的状态码；POST 默认只重试明确表示"未处理"的状态码，避免重复提交生成任务
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+POST_RETRY_STATUSES = frozenset({429, 503})
+
+USER_AGENT = "my-portfolio-asset-scripts/1.0"
+
+# 流式下载每次读取的块大小
+CHUNK_SIZE = 64 * 1024
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """返回进程内共享的 Session，首次调用时创建"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                max_retries=0,  # 重试由 request() 统一处理
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回需要等待的秒数"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(delay, 0.0), RETRY_AFTER_MAX)
+
+
+def backoff_delay(attempt: int) -> float:
+    """第 attempt 次重试前的等待时间（full jitter）"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    retries: int = MAX_RETRIES,
+    retry_statuses: Optional[Iterable[int]] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    发送请求，遇到网络错误或可重试状态码时退避重试
+    重试耗尽后返回最后一次响应（或抛出最后一次网络异常），由调用方判断状态码
+    状态码和重试次数会记录到当前的 trace span 上
+    """
+    if retry_statuses is None:
+        retry_statuses = POST_RETRY_STATUSES if method.upper() == "POST" else RETRY_STATUSES
+    retry_statuses = frozenset(retry_statuses)
+    # POST 读超时时服务端可能已经受理，只对连接阶段的错误重试
+    retry_errors = (requests.ConnectionError,) if method.upper() == "POST" else (requests.ConnectionError, requests.Timeout)
+    session = get_session()
+
+    attempt = 0
+    while True:
+        try:
+            response = session.request(method, url, **kwargs)
+        except retry_errors:
+            if attempt >= retries:
+                trace.add(retries=attempt)
+                raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        if response.status_code not in retry_statuses or attempt >= retries:
+            trace.add(retries=attempt)
+            trace.annotate(status=response.status_code)
+            return response
+
+        delay = _retry_after(response)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        # 释放连接回连接池后再等待
+        response.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+class IncompleteDownloadError(requests.RequestException):
+    """下载的字节数与服务端声明的长度不一致（已保留 .part 文件供续传）"""
+
+
+class DownloadCancelled(requests.RequestException):
+    """调用方通过 cancel 事件取消了下载（例如对冲请求中另一个来源已先完成）"""
+
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+def _part_paths(dest: Path):
+    part = dest.with_name(dest.name + ".part")
+    return part, dest.with_name(dest.name + ".part.json")
+
+
+def _load_resume_state(part: Path, meta: Path) -> Optional[dict]:
+    """读取续传信息；只有带校验器（ETag/Last-Modified）的半截文件才能安全续传"""
+    if not part.exists() or not meta.exists():
+        return None
+    try:
+        state = json.loads(meta.read_text())
+    except (OSError, ValueError):
+        return None
+    if not state.get("url") or not state.get("validator"):
+        return None
+    state["offset"] = part.stat().st_size
+    return state
+
+
+def resumable(dest: Union[str, Path]) -> bool:
+    """dest 是否有可以续传的半截文件"""
+    state = _load_resume_state(*_part_paths(Path(dest)))
+    return bool(state and state["offset"] > 0)
+
+
+def _discard(*paths: Path) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _without_range(headers: dict) -> dict:
+    return {k: v for k, v in headers.items() if k not in ("Range", "If-Range")}
+
+
+def _check_cancel(cancel: Optional[threading.Event], dest: Path) -> None:
+    if cancel is not None and cancel.is_set():
+        raise DownloadCancelled(f"{dest.name}: 下载已取消")
+
+
+def download(
+    url: str,
+    dest: Union[str, Path],
+    *,
+    chunk_size: int = CHUNK_SIZE,
+    resume: bool = True,
+    cancel: Optional[threading.Event] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    流式下载 url 到 dest，内存占用与图片大小无关
+    数据先写入 dest.part，校验长度并 fsync 后原子重命名为 dest；
+    中断后再次调用会用 Range + If-Range 从断点续传
+    返回（已关闭的）响应，非 2xx 时不写入任何文件，由调用方判断状态码
+    cancel 被设置后，在收到响应头或下一个数据块时抛出 DownloadCancelled，不会写入 dest
+    """
+    dest = Path(dest)
+    part, meta = _part_paths(dest)
+    headers = dict(kwargs.pop("headers", None) or {})
+
+    state = _load_resume_state(part, meta) if resume else None
+    if state and state["offset"] > 0:
+        # 续传时直接请求上次重定向后的最终地址，避免随机图片服务返回另一张图
+        request_url = state["url"]
+        headers["Range"] = f"bytes={state['offset']}-"
+        headers["If-Range"] = state["validator"]
+    else:
+        request_url = url
+        state = None
+
+    response = request("GET", request_url, stream=True, headers=headers, **kwargs)
+    with response:
+        _check_cancel(cancel, dest)
+        if response.status_code == 416 and state:
+            # 半截文件已无效（比如服务端文件变短了），从头下载
+            _discard(part, meta)
+            return download(url, dest, chunk_size=chunk_size, resume=False, cancel=cancel,
+                            headers=_without_range(headers), **kwargs)
+        if not response.ok:
+            return response
+
+        offset = 0
+        expected = None
+        if response.status_code == 206 and state:
+            match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+            if match and int(match.group(1)) == state["offset"]:
+                offset = state["offset"]
+                if match.group(3) != "*":
+                    expected = int(match.group(3))
+        if offset == 0 and response.status_code == 206:
+            # 服务端返回的范围与请求不符，无法拼接
+            _discard(part, meta)
+            return download(url, dest, chunk_size=chunk_size, resume=False, cancel=cancel,
+                            headers=_without_range(headers), **kwargs)
+
+        encoding = response.headers.get("Content-Encoding", "identity").lower()
+        if expected is None and encoding == "identity" and response.headers.get("Content-Length"):
+            expected = offset + int(response.headers["Content-Length"])
+
+        # If-Range 只接受强校验器，弱 ETag 退回到 Last-Modified
+        etag = response.headers.get("ETag")
+        validator = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified")
+        if offset == 0:
+            _discard(meta)
+            if validator and encoding == "identity":
+                meta.write_text(json.dumps({"url": response.url, "validator": validator}))
+
+        with open(part, "ab" if offset else "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                _check_cancel(cancel, dest)
+                f.write(chunk)
+            written = f.tell()
+            trace.add(bytes=written - offset)
+            with trace.span("write", bytes=written):
+                f.flush()
+                os.fsync(f.fileno())
+
+        if expected is not None and written != expected:
+            raise IncompleteDownloadError(
+                f"{dest.name}: 期望 {expected} 字节，实际收到 {written} 字节", response=response
+            )
+
+        commit_file(part, dest)
+        _discard(meta)
+        return response
@@ -0,0 +1,220 @@
+"""
+图片完整性校验
+下载脚本以前把任何 HTTP 200 都当作成功：HTML 错误页、PNG 内容或中途断开的下载都会以 .jpg
+留在 public/images，之后"已存在就跳过"让它永远不会被替换。这里并发检查每个文件：
+- 按文件头（magic bytes）识别真实格式，与扩展名对比
+- 只解析文件头读取尺寸（不解码像素），与清单对比
+- 检查格式的结束标记 / 长度字段，发现被截断的文件
+不依赖 Pillow，每个文件只读几 KB，整个目录的校验在毫秒级完成，可以在每次构建时运行。
+有问题的文件移到隔离目录，下次 fetch / generate / render 会把它当作缺失重新获取
+"""
+
+import os
+import shutil
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from .cache import CACHE_DIR
+
+QUARANTINE_DIR = CACHE_DIR / "quarantine"
+
+DEFAULT_JOBS = 8
+
+# 扩展名对应的格式
+EXPECTED_FORMATS = {
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+    ".png": "PNG",
+    ".gif": "GIF",
+    ".webp": "WEBP",
+    ".avif": "AVIF",
+}
+
+# JPEG 结束标记之后允许的填充字节数（部分编码器会在末尾补零）
+_JPEG_TAIL = 64
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_END = b"IEND\xaeB`\x82"
+
+# 不带长度字段的 JPEG 标记
+_JPEG_STANDALONE = {0x01, *range(0xD0, 0xD8)}
+# 帧头（SOF）标记，其中记录了图片尺寸；C4 / C8 / CC 编号相同但不是帧头
+_JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class Probe(NamedTuple):
+    """只读文件头得到的信息；无法识别时 format 为 None"""
+
+    format: Optional[str]
+    width: int = 0
+    height: int = 0
+    complete: bool = False
+
+
+def sniff(head: bytes) -> Optional[str]:
+    """按文件开头的几个字节识别格式"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if head.startswith(_PNG_SIGNATURE):
+        return "PNG"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "GIF"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    if head[4:12] in (b"ftypavif", b"ftypavis"):
+        return "AVIF"
+    return None
+
+
+def _tail(f: BinaryIO, size: int, n: int) -> bytes:
+    f.seek(max(0, size - n))
+    return f.read(n)
+
+
+def _probe_jpeg(f: BinaryIO, size: int) -> Probe:
+    """顺着标记段的长度字段跳到帧头读取尺寸，不读取中间的 EXIF / ICC 数据"""
+    width = height = 0
+    pos = 2
+    while pos + 4 <= size:
+        f.seek(pos)
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            break
+        marker = header[1]
+        if marker == 0xFF:  # 填充字节
+            pos += 1
+            continue
+        if marker in _JPEG_STANDALONE:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):  # 图片结束 / 扫描数据开始，帧头一定已经出现过
+            break
+        length = struct.unpack(">H", header[2:])[0]
+        if marker in _JPEG_SOF:
+            sof = f.read(5)
+            if len(sof) == 5:
+                height, width = struct.unpack(">HH", sof[1:5])
+            break
+        pos += 2 + length
+    complete = b"\xff\xd9" in _tail(f, size, _JPEG_TAIL)
+    return Probe("JPEG", width, height, complete)
+
+
+def _probe_png(f: BinaryIO, size: int) -> Probe:
+    f.seek(8)
+    ihdr = f.read(16)
+    width, height = struct.unpack(">II", ihdr[8:16]) if ihdr[4:8] == b"IHDR" else (0, 0)
+    return Probe("PNG", width, height, _tail(f, size, 8) == _PNG_END)
+
+
+def _probe_gif(f: BinaryIO, size: int) -> Probe:
+    f.seek(6)
+    width, height = struct.unpack("<HH", f.read(4))
+    return Probe("GIF", width, height, _tail(f, size, 1) == b"\x3b")
+
+
+def _probe_webp(f: BinaryIO, size: int) -> Probe:
+    f.seek(4)
+    riff_size = struct.unpack("<I", f.read(4))[0]
+    f.seek(12)
+    chunk = f.read(30)
+    fourcc = chunk[:4]
+    width = height = 0
+    if fourcc == b"VP8 " and chunk[11:14] == b"\x9d\x01\x2a":
+        w, h = struct.unpack("<HH", chunk[14:18])
+        width, height = w & 0x3FFF, h & 0x3FFF
+    elif fourcc == b"VP8L" and chunk[8:9] == b"\x2f":
+        bits = int.from_bytes(chunk[9:13], "little")
+        width, height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    elif fourcc == b"VP8X":
+        width = int.from_bytes(chunk[12:15], "little") + 1
+        height = int.from_bytes(chunk[15:18], "little") + 1
+    # RIFF 头记录了文件总长度，截断的文件比它短
+    return Probe("WEBP", width, height, size >= riff_size + 8)
+
+
+def _probe_avif(f: BinaryIO, size: int) -> Probe:
+    """AVIF 的尺寸在 meta/iprp/ispe 里，深层解析不划算；只检查顶层 box 的长度是否完整"""
+    pos = 0
+    width = height = 0
+    while pos + 8 <= size:
+        f.seek(pos)
+        box_size, box_type = struct.unpack(">I4s", f.read(8))
+        if box_size == 1:
+            box_size = struct.unpack(">Q", f.read(8))[0]
+        elif box_size == 0:
+            box_size = size - pos
+        if box_type == b"meta":
+            f.seek(pos)
+            meta = f.read(min(box_size, 4096))
+            i = meta.find(b"ispe")
+            if i >= 0 and len(meta) >= i + 16:
+                width, height = struct.unpack(">II", meta[i + 8:i + 16])
+        if box_size < 8:
+            break
+        pos += box_size
+    return Probe("AVIF", width, height, pos == size)
+
+
+_PROBES = {
+    "JPEG": _probe_jpeg,
+    "PNG": _probe_png,
+    "GIF": _probe_gif,
+    "WEBP": _probe_webp,
+    "AVIF": _probe_avif,
+}
+
+
+def probe(path: Path) -> Probe:
+    """识别格式、读取尺寸并检查是否完整；文件太短或头部损坏时尺寸为 0"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        fmt = sniff(f.read(32))
+        if fmt is None:
+            return Probe(None)
+        try:
+            return _PROBES[fmt](f, size)
+        except struct.error:
+            return Probe(fmt)
+
+
+def check(path: Path, config: dict, filename: Optional[str] = None) -> Optional[str]:
+    """
+    检查图片是否与清单一致，返回问题描述，没有问题时返回 None
+    filename 用于判断期望的格式，默认取 path 的文件名（下载到临时文件时需要传入）
+    """
+    try:
+        result = probe(path)
+    except OSError as e:
+        return f"无法读取: {e}"
+    expected = EXPECTED_FORMATS.get(Path(filename or path.name).suffix.lower())
+    if result.format is None:
+        return "不是图片（可能是错误页面）"
+    if expected and result.format != expected:
+        return f"格式不符: 内容是 {result.format}，扩展名要求 {expected}"
+    if not result.width or not result.height:
+        return "文件头损坏，无法读取尺寸"
+    if not result.complete:
+        return "文件不完整（下载被截断）"
+    if (result.width, result.height) != (config["width"], config["height"]):
+        return f"尺寸不符: {result.width}x{result.height}，清单要求 {config['width']}x{config['height']}"
+    return None
+
+
+def verify_images(assets: Dict[str, dict], images_dir: Path,
+                  jobs: int = DEFAULT_JOBS) -> Iterator[Tuple[str, Optional[str]]]:
+    """并发校验清单中已存在的图片，按清单顺序产出 (文件名, 问题)；缺失的文件跳过"""
+    present = [(filename, config) for filename, config in assets.items() if (images_dir / filename).exists()]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        yield from zip((filename for filename, _ in present),
+                       pool.map(lambda item: check(images_dir / item[0], item[1]), present))
+
+
+def quarantine(path: Path, directory: Path = QUARANTINE_DIR) -> Path:
+    """把有问题的文件移到隔离目录（保留以便排查），返回新路径；同名的旧文件被覆盖"""
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / path.name
+    shutil.move(str(path), str(target))
+    return target
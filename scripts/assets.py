@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+图片资源命令行（统一入口）
+  python3 scripts/assets.py status             查看每张图片的状态
+  python3 scripts/assets.py plan               列出需要处理的图片
+  python3 scripts/assets.py fetch              从在线图库下载（无需 API 密钥）
+  python3 scripts/assets.py generate --provider openai|lovart
+  python3 scripts/assets.py render             本地渲染占位图
+  python3 scripts/assets.py optimize           重新压缩并检查体积预算
+每个子命令的参数见 --help
+"""
+
+import sys
+
+from asset_pipeline.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
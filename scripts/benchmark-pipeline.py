@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+图片流水线基准测试
+micro: 按清单中的每种尺寸渲染占位图、按不同质量编码 JPEG
+macro: 在临时目录中对着本地假服务器（注入延迟和错误）完整运行下载和占位图脚本
+结果追加到 .cache/images/bench-history.json；--compare 与历史中最近的结果对比，退化超过阈值时以 1 退出
+需要: pip install pillow requests
+等同于: python3 scripts/assets.py bench
+"""
+
+import sys
+
+from asset_pipeline.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["bench", *sys.argv[1:]]))
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+检测重复图片
+计算每张图片的 SHA-256 和感知哈希，找出字节相同或视觉上几乎相同的图片；
+--fix 会用不同的 Picsum 种子重新下载清单中发生冲突的图片
+需要: pip install pillow numpy requests
+等同于: python3 scripts/assets.py dedup
+"""
+
+import sys
+
+from asset_pipeline.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["dedup", *sys.argv[1:]]))
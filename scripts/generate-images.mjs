@@ -28,7 +28,9 @@ const imageRequirements = {
   'product-course.jpg': { width: 1600, height: 900, description: '产品 - 设计课程' },
 };
 
-// 使用placeholder.com API生成图片
+// 使用placeholder.com API生成图片；设置 PLACEHOLDER_BASE 可改用本地占位图服务（python3 scripts/assets.py serve）
+const placeholderBase = process.env.PLACEHOLDER_BASE || 'https://via.placeholder.com';
+
 async function generateImage(filename, config) {
   const filepath = path.join(imagesDir, filename);
   
@@ -39,7 +41,7 @@ async function generateImage(filename, config) {
   }
 
   try {
-    const url = `https://via.placeholder.com/${config.width}x${config.height}.jpg/666666/ffffff?text=${encodeURIComponent(config.description)}`;
+    const url = `${placeholderBase}/${config.width}x${config.height}.jpg/666666/ffffff?text=${encodeURIComponent(config.description)}`;
     const response = await fetch(url);
     
     if (response.ok) {
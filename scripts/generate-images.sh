@@ -3,6 +3,8 @@
 # 图片生成脚本 - 使用placeholder服务临时生成图片
 
 IMAGES_DIR="public/images"
+# 设置 PLACEHOLDER_BASE 可改用本地占位图服务（python3 scripts/assets.py serve）
+PLACEHOLDER_BASE="${PLACEHOLDER_BASE:-https://via.placeholder.com}"
 mkdir -p "$IMAGES_DIR"
 
 echo "开始生成缺失的图片..."
@@ -17,7 +19,7 @@ generate_image() {
     
     if [ ! -f "$IMAGES_DIR/$filename" ]; then
         echo "生成: $filename - $description"
-        curl -s "https://via.placeholder.com/${width}x${height}.jpg" -o "$IMAGES_DIR/$filename"
+        curl -sf "${PLACEHOLDER_BASE}/${width}x${height}.jpg" -o "$IMAGES_DIR/$filename"
         if [ $? -eq 0 ]; then
             echo "✓ 已生成: $filename"
         else
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+生成图片占位信息
+为 public/images 中的每张图片计算宽高、主色、BlurHash 和内联的极小预览图，
+写入 public/images/lqip.json，前端可以在原图加载前立即渲染占位并预留布局
+需要: pip install pillow numpy
+等同于: python3 scripts/assets.py lqip
+"""
+
+import sys
+
+from asset_pipeline.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["lqip", *sys.argv[1:]]))
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+生成响应式衍生图
+为 public/images 中的每张图片生成多种宽度的 AVIF / WebP / 渐进式 JPEG，
+并写出 public/images/responsive/manifest.json 供前端拼接 srcset
+需要: pip install pillow
+等同于: python3 scripts/assets.py responsive
+"""
+
+import sys
+
+from asset_pipeline.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["responsive", *sys.argv[1:]]))
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+重新压缩 public/images 中的图片并检查体积预算
+需要: pip install pillow numpy
+等同于: python3 scripts/assets.py optimize
+"""
+
+import sys
+
+from asset_pipeline.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["optimize", *sys.argv[1:]]))